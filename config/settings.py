@@ -31,12 +31,15 @@ INSTALLED_APPS = [
     'django_filters',
     'corsheaders',
     'rest_framework_simplejwt',
+    'django_celery_beat',
 
     'task_tracker',
     'users',
 ]
 
 MIDDLEWARE = [
+    'task_tracker.profiling.QueryProfilingMiddleware',
+    'task_tracker.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +72,10 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': (
+        'task_tracker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
@@ -107,6 +114,85 @@ DATABASES = {
     }
 }
 
+# Cache
+# Redis используется, если задан REDIS_URL; без него (например, в тестах) — локальный кеш процесса
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+TASK_TRACKER_CACHE_ENABLED = os.getenv("TASK_TRACKER_CACHE_ENABLED", "True") == "True"
+TASK_TRACKER_CACHE_TIMEOUT = int(os.getenv("TASK_TRACKER_CACHE_TIMEOUT", 300))
+
+# Task events (SSE)
+# Без Redis события доставляются только клиентам того же процесса
+
+TASK_TRACKER_EVENT_BROKER = os.getenv(
+    "TASK_TRACKER_EVENT_BROKER",
+    "task_tracker.events.RedisBroker" if REDIS_URL else "task_tracker.events.InProcessBroker",
+)
+TASK_TRACKER_EVENTS_HEARTBEAT = int(os.getenv("TASK_TRACKER_EVENTS_HEARTBEAT", 15))
+
+# Celery
+# Без брокера (локальный запуск, тесты) задачи выполняются сразу в процессе (eager mode)
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL)
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", str(not CELERY_BROKER_URL)) == "True"
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+
+# Снимки рейтинга занятых сотрудников и важных задач: пересчёт по расписанию и с задержкой после записей
+
+TASK_TRACKER_SNAPSHOTS_ENABLED = os.getenv("TASK_TRACKER_SNAPSHOTS_ENABLED", "True") == "True"
+TASK_TRACKER_SNAPSHOT_DEBOUNCE = int(os.getenv("TASK_TRACKER_SNAPSHOT_DEBOUNCE", 10))
+TASK_TRACKER_SNAPSHOT_INTERVAL = int(os.getenv("TASK_TRACKER_SNAPSHOT_INTERVAL", 300))
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-snapshots": {
+        "task": "task_tracker.tasks.refresh_snapshots",
+        "schedule": TASK_TRACKER_SNAPSHOT_INTERVAL,
+    },
+}
+
+# Delta sync
+# Отставание high-water mark от текущего времени (запас на незакоммиченные транзакции), срок хранения tombstones
+# и размер страницы изменений (по умолчанию и наибольший для параметра page_size)
+
+TASK_TRACKER_SYNC_LAG_SECONDS = int(os.getenv("TASK_TRACKER_SYNC_LAG_SECONDS", 5))
+TASK_TRACKER_SYNC_TOMBSTONE_DAYS = int(os.getenv("TASK_TRACKER_SYNC_TOMBSTONE_DAYS", 30))
+TASK_TRACKER_SYNC_PAGE_SIZE = int(os.getenv("TASK_TRACKER_SYNC_PAGE_SIZE", 1000))
+TASK_TRACKER_SYNC_MAX_PAGE_SIZE = int(os.getenv("TASK_TRACKER_SYNC_MAX_PAGE_SIZE", 5000))
+
+# SQL profiling
+# Заголовки Server-Timing / X-DB-Queries на каждом ответе, JSON-лог запросов дольше порога в миллисекундах
+
+TASK_TRACKER_SQL_PROFILING = os.getenv("TASK_TRACKER_SQL_PROFILING", "True") == "True"
+TASK_TRACKER_SQL_PROFILING_SLOW_MS = int(os.getenv("TASK_TRACKER_SQL_PROFILING_SLOW_MS", 500))
+
+# Metrics
+# Эндпоинт /metrics в формате Prometheus. При нескольких воркерах gunicorn нужен общий для них каталог,
+# иначе каждый воркер отдаёт только свои значения
+
+TASK_TRACKER_METRICS_ENABLED = os.getenv("TASK_TRACKER_METRICS_ENABLED", "True") == "True"
+TASK_TRACKER_METRICS_DIR = os.getenv("TASK_TRACKER_METRICS_DIR") or None
+
+# JSON rendering
+# Кодировщик ответов API: auto (orjson, если установлен, иначе stdlib json), orjson или json
+
+TASK_TRACKER_JSON_BACKEND = os.getenv("TASK_TRACKER_JSON_BACKEND", "auto")
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -0,0 +1,300 @@
+"""
+Замеры всех эндпоинтов task_tracker внутри процесса (тестовый клиент Django, без сети и сервера):
+задержки p50/p95/p99, число SQL-запросов и пик выделенной памяти на запрос. Данные готовятся заранее
+командой seed_data. Пишущие запросы выполняются в транзакции, которая откатывается, поэтому база
+после прогона не меняется и каждый запрос видит одни и те же данные.
+
+Отчёт в JSON сравнивается с отчётом другого коммита функцией compare: рост числа запросов считается
+регрессией всегда, рост задержки p95 и памяти — если превышает порог.
+benchmark_json_rendering отдельно сравнивает рендеринг большого списка задач кодировщиками JSON,
+benchmark_list_serializers — пропускную способность списков задач и сотрудников (строк в секунду)
+row-сериализаторов и сериализаторов DRF.
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import urls
+from .benchmark import percentile
+from .cache import invalidate_all
+from .explain import sample_parameters
+from .models import Employee, Task
+from .profiling import profile_queries
+from .renderers import JSON_BACKENDS, get_json_backend, orjson
+from .row_serializers import EmployeeRowSerializer, TaskRowSerializer
+from .serializers import EmployeeSerializer, TaskSerializer
+from .statuses import TaskStatus
+from .views import prefetch_active_tasks
+
+# Эндпоинты, ответ которых не заканчивается сам
+SKIPPED_ENDPOINTS = {'task-events': 'server-sent events stream'}
+# Изменения меньше этих значений считаются шумом измерений
+MIN_LATENCY_DELTA_MS = 1.0
+MIN_MEMORY_DELTA_KB = 64
+
+
+def endpoint_names(patterns=None):
+    """Имена всех URL task_tracker, включая маршруты router."""
+    names = []
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names.extend(endpoint_names(pattern.url_patterns))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.append(pattern.name)
+    return names
+
+
+def benchmark_parameters():
+    parameters = sample_parameters()
+    parameters['task_id'] = parameters['parent_id'] or Task.objects.values_list('id', flat=True).first() or 0
+    parameters['task_ids'] = list(Task.objects.order_by('id').values_list('id', flat=True)[:10])
+    parameters['future'] = (date.today() + timedelta(days=30)).isoformat()
+    # Не раньше горизонта журнала удалений, иначе sync отвечает 410
+    parameters['since'] = (timezone.now() - timedelta(minutes=5)).isoformat()
+    return parameters
+
+
+def endpoint_requests(p):
+    """
+    Запрос к каждому эндпоинту: {имя URL: (метод, kwargs URL, параметры строки запроса, тело JSON)}.
+    Эндпоинты, которых здесь нет, запрашиваются GET без параметров.
+    """
+    task = {'pk': p['task_id']}
+    employee = {'pk': p['employee_id']}
+    new_task = {'name': 'Benchmark task', 'deadline': p['future'], 'status': TaskStatus.NEW.value}
+    return {
+        'employee-create': ('post', {}, {}, {'full_name': 'Benchmark Employee', 'position': 'Developer'}),
+        'employee-export': ('get', {}, {'output': 'ndjson'}, None),
+        'employee-detail': ('get', employee, {}, None),
+        'employee-update': ('put', employee, {}, {'full_name': 'Benchmark Employee', 'position': 'Developer'}),
+        'employee-delete': ('delete', employee, {}, None),
+        'task-create': ('post', {}, {}, new_task),
+        'task-auto-assign': ('post', {}, {}, {'dry_run': True}),
+        'task-bulk': ('post', {}, {}, [new_task] * 10),
+        # Выгрузка всей таблицы задач на засеянной базе занимает минуты, поэтому по одному сотруднику
+        'task-export': ('get', {}, {'assignee': p['employee_id']}, None),
+        'task-suggest-assignees': ('post', {}, {}, {'tasks': p['task_ids']}),
+        'task-detail': ('get', task, {}, None),
+        'task-tree': ('get', task, {}, None),
+        'task-update': ('put', task, {}, new_task),
+        'task-delete': ('delete', task, {}, None),
+        'sync': ('get', {}, {'since': p['since']}, None),
+        'async-employee-detail': ('get', employee, {}, None),
+        'async-task-detail': ('get', task, {}, None),
+    }
+
+
+def _perform(client, method, path, body):
+    if method == 'get':
+        response = client.get(path)
+    elif body is None:
+        response = getattr(client, method)(path)
+    else:
+        response = getattr(client, method)(path, json.dumps(body), content_type='application/json')
+    # Потоковый ответ формируется при чтении, поэтому тоже входит в замер
+    response.getvalue()
+    return response
+
+
+def _request(client, method, path, body, cold_cache):
+    if cold_cache:
+        invalidate_all()
+    if method == 'get':
+        return _perform(client, method, path, body)
+    with transaction.atomic():
+        response = _perform(client, method, path, body)
+        transaction.set_rollback(True)
+    return response
+
+
+def run_endpoint(client, method, path, body, iterations=50, warmup=3, memory_samples=5, cold_cache=True):
+    for _ in range(warmup):
+        _request(client, method, path, body, cold_cache)
+
+    latencies, queries, statuses = [], [], {}
+    for _ in range(iterations):
+        with profile_queries() as profile:
+            started = time.perf_counter()
+            response = _request(client, method, path, body, cold_cache)
+            latencies.append(time.perf_counter() - started)
+        queries.append(profile.count)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    # Память отдельным проходом: tracemalloc замедляет выполнение в разы и исказил бы задержки
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(memory_samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            _request(client, method, path, body, cold_cache)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'method': method.upper(),
+        'path': path,
+        'requests': iterations,
+        'errors': sum(count for code, count in statuses.items() if code >= 400),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'max_ms': _ms(max(latencies, default=None)),
+        'queries': round(statistics.median(queries)) if queries else None,
+        'queries_max': max(queries, default=None),
+        'memory_peak_kb': round(statistics.median(peaks) / 1024, 1) if peaks else None,
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def run_suite(endpoints=None, iterations=50, warmup=3, memory_samples=5, cold_cache=True, label='', log=None):
+    """
+    Замеряет эндпоинты (по умолчанию все, кроме SKIPPED_ENDPOINTS) и возвращает отчёт.
+    cold_cache сбрасывает кэш ответов перед каждым запросом, чтобы замерялись представления, а не кэш.
+    """
+    names = [name for name in endpoint_names() if name not in SKIPPED_ENDPOINTS]
+    if endpoints:
+        unknown = set(endpoints) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        names = [name for name in names if name in endpoints]
+
+    requests = endpoint_requests(benchmark_parameters())
+    client = Client()
+    results = {}
+    # Тестовый клиент обращается к хосту testserver; лог медленных запросов замерам не нужен
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                           TASK_TRACKER_SQL_PROFILING_SLOW_MS=float('inf')):
+        for name in names:
+            method, kwargs, query, body = requests.get(name, ('get', {}, {}, None))
+            path = reverse(f'{urls.app_name}:{name}', kwargs=kwargs)
+            if query:
+                path = f'{path}?{urlencode(query)}'
+            results[name] = run_endpoint(client, method, path, body, iterations, warmup, memory_samples, cold_cache)
+            if log:
+                result = results[name]
+                log(f"{name}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+                    f"{result['queries']} queries, {result['memory_peak_kb']} KB")
+
+    return {
+        'label': label,
+        'created_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'employees': Employee.objects.count(),
+        'tasks': Task.objects.count(),
+        'iterations': iterations,
+        'cold_cache': cold_cache,
+        'skipped': SKIPPED_ENDPOINTS,
+        'endpoints': results,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Регрессии current относительно baseline: [{'endpoint', 'metric', 'baseline', 'current'}].
+    Сравниваются только эндпоинты, которые есть в обоих отчётах.
+    """
+    regressions = []
+    for name, result in current['endpoints'].items():
+        base = baseline['endpoints'].get(name)
+        if base is None:
+            continue
+        checks = [
+            ('queries', 0, 0),
+            ('p95_ms', threshold, MIN_LATENCY_DELTA_MS),
+            ('memory_peak_kb', threshold, MIN_MEMORY_DELTA_KB),
+        ]
+        for metric, ratio, min_delta in checks:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + ratio) and new - old > min_delta:
+                regressions.append({'endpoint': name, 'metric': metric, 'baseline': old, 'current': new})
+        if result['errors'] > base['errors']:
+            regressions.append({'endpoint': name, 'metric': 'errors', 'baseline': base['errors'],
+                                'current': result['errors']})
+    return regressions
+
+
+def benchmark_json_rendering(count=50000, repeat=5):
+    """
+    Время рендеринга списка из count задач (формат /tasks/) JSONRenderer из DRF и каждым доступным
+    кодировщиком FastJSONRenderer: {имя: {'ms', 'bytes', 'speedup'}}. Задачи берутся из базы.
+    """
+    rows = list(TaskRowSerializer.get_rows(Task.objects.order_by('id'))[:count])
+    data = TaskRowSerializer(rows).data
+    renderers = {'drf': JSONRenderer().render}
+    for name, dumps in JSON_BACKENDS.items():
+        if name != 'orjson' or orjson is not None:
+            renderers[name] = dumps
+
+    results = {}
+    for name, render in renderers.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = render(data)
+            timings.append(time.perf_counter() - started)
+        results[name] = {'ms': _ms(min(timings)), 'bytes': len(content)}
+    for result in results.values():
+        result['speedup'] = round(results['drf']['ms'] / result['ms'], 2)
+    return {'tasks': len(rows), 'renderers': results}
+
+
+def _best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark_list_serializers(count=1000, repeat=5):
+    """
+    Строк в секунду для страницы из count задач и count сотрудников: чтение из базы, сериализация
+    и рендеринг, как в list эндпоинтов. 'drf' — TaskSerializer/EmployeeSerializer с prefetch_related,
+    'rows' — row-сериализаторы. {'tasks'|'employees': {'rows', 'drf', 'rows_serializer', 'speedup'}}.
+    """
+    render = get_json_backend()
+    tasks = Task.objects.order_by('id')
+    employees = Employee.objects.order_by('id')
+    cases = {
+        'tasks': (
+            lambda: TaskSerializer(tasks.prefetch_related(
+                Prefetch('sub_tasks', queryset=Task.objects.order_by('id')))[:count], many=True).data,
+            lambda: TaskRowSerializer(list(TaskRowSerializer.get_rows(tasks)[:count])).data,
+        ),
+        'employees': (
+            lambda: EmployeeSerializer(employees.prefetch_related(prefetch_active_tasks())[:count], many=True).data,
+            lambda: EmployeeRowSerializer(list(EmployeeRowSerializer.get_rows(employees)[:count])).data,
+        ),
+    }
+    results = {}
+    for name, (drf, rows) in cases.items():
+        rendered = len(rows())
+        drf_seconds = _best_time(lambda: render(drf()), repeat)
+        rows_seconds = _best_time(lambda: render(rows()), repeat)
+        results[name] = {
+            'rows': rendered,
+            'drf': {'ms': _ms(drf_seconds), 'rows_per_sec': round(rendered / drf_seconds)},
+            'rows_serializer': {'ms': _ms(rows_seconds), 'rows_per_sec': round(rendered / rows_seconds)},
+            'speedup': round(drf_seconds / rows_seconds, 2),
+        }
+    return results
@@ -0,0 +1,163 @@
+"""
+Подбор исполнителей задач. Оценка сотрудника (меньше — лучше) складывается из числа активных задач,
+давления сроков (насколько близок его самый ранний активный срок) и бонуса за связь с задачей —
+если сотрудник ведёт её подзадачи или соседние задачи того же родителя.
+
+Оценки без бонуса хранятся в куче: top-k для задачи — k извлечений, O(k log n). При пакетном подборе
+назначенный сотрудник получает новую оценку (ленивое обновление: устаревшие записи кучи пропускаются),
+поэтому следующие задачи пакета распределяются с учётом уже сделанных назначений.
+"""
+import heapq
+from collections import defaultdict, namedtuple
+
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Employee, Task
+
+
+class Candidate:
+    __slots__ = ('id', 'full_name', 'active_count', 'earliest_deadline')
+
+    def __init__(self, id, full_name, active_count=0, earliest_deadline=None):
+        self.id = id
+        self.full_name = full_name
+        self.active_count = active_count
+        self.earliest_deadline = earliest_deadline
+
+
+class AssignmentEngine:
+    LOAD_WEIGHT = 1.0
+    DEADLINE_WEIGHT = 2.0
+    # Срок дальше горизонта не создаёт давления, просроченный — максимальное давление
+    DEADLINE_HORIZON_DAYS = 14
+    RELATED_BONUS = 1.5
+    # Кандидаты с оценкой хуже лучшей больше чем на MAX_SCORE_GAP не предлагаются, если не связаны с задачей
+    MAX_SCORE_GAP = 2.0
+
+    def __init__(self, candidates, today=None):
+        self.today = today or timezone.now().date()
+        self.candidates = {candidate.id: candidate for candidate in candidates}
+        self._versions = dict.fromkeys(self.candidates, 0)
+        self._heap = [(self.score(candidate), candidate.id, 0) for candidate in self.candidates.values()]
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def from_db(cls, today=None):
+        # Нагрузка и ближайший срок всех сотрудников одним запросом из EmployeeWorkload
+        rows = Employee.objects.annotate(
+            active_count=Coalesce('workload__active_count', 0),
+            earliest_deadline=F('workload__earliest_active_deadline'),
+        ).values_list('id', 'full_name', 'active_count', 'earliest_deadline').order_by('id')
+        return cls([Candidate(*row) for row in rows], today)
+
+    def deadline_pressure(self, candidate):
+        if candidate.earliest_deadline is None:
+            return 0.0
+        days_left = (candidate.earliest_deadline - self.today).days
+        return min(1.0, max(0.0, (self.DEADLINE_HORIZON_DAYS - days_left) / self.DEADLINE_HORIZON_DAYS))
+
+    def score(self, candidate, related=False):
+        score = self.LOAD_WEIGHT * candidate.active_count + self.DEADLINE_WEIGHT * self.deadline_pressure(candidate)
+        return score - self.RELATED_BONUS if related else score
+
+    def _peek(self, k):
+        # k лучших актуальных записей кучи; устаревшие удаляются, актуальные возвращаются обратно
+        entries = []
+        while self._heap and len(entries) < k:
+            entry = heapq.heappop(self._heap)
+            if entry[2] == self._versions[entry[1]]:
+                entries.append(entry)
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        return entries
+
+    def top_k(self, k, related_ids=()):
+        """Возвращает до k пар (кандидат, оценка), лучшие первыми."""
+        scores = {employee_id: score for score, employee_id, _ in self._peek(k)}
+        # Бонус только улучшает оценку, поэтому связанных достаточно досчитать отдельно
+        for employee_id in related_ids:
+            if employee_id in self.candidates:
+                scores[employee_id] = self.score(self.candidates[employee_id], related=True)
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]))[:k]
+        return [(self.candidates[employee_id], score) for employee_id, score in ranked]
+
+    def potential_employees(self, k, related_ids=()):
+        ranked = self.top_k(k, related_ids)
+        if not ranked:
+            return []
+        limit = ranked[0][1] + self.MAX_SCORE_GAP
+        return [candidate for candidate, score in ranked if score <= limit or candidate.id in related_ids]
+
+    def assign(self, employee_id, deadline=None):
+        """Учитывает назначение задачи сотруднику в оценках следующих подборов."""
+        candidate = self.candidates[employee_id]
+        candidate.active_count += 1
+        if deadline is not None and (candidate.earliest_deadline is None or deadline < candidate.earliest_deadline):
+            candidate.earliest_deadline = deadline
+        self._versions[employee_id] += 1
+        heapq.heappush(self._heap, (self.score(candidate), employee_id, self._versions[employee_id]))
+
+    def suggest(self, tasks, related=None, k=3):
+        """
+        Подбирает исполнителей для пачки задач с балансировкой: задачи обрабатываются от ближайшего срока,
+        лучший кандидат каждой задачи сразу получает её в нагрузку. Возвращает {id задачи: [(кандидат, оценка)]}.
+        """
+        related = related or {}
+        suggestions = {}
+        for task in sorted(tasks, key=lambda task: (task.deadline, task.pk)):
+            ranked = self.top_k(k, related.get(task.pk, ()))
+            if ranked:
+                self.assign(ranked[0][0].id, task.deadline)
+            suggestions[task.pk] = ranked
+        return suggestions
+
+
+def task_related_assignees(task):
+    """Исполнители подзадач и соседних задач по предзагруженным sub_tasks и parent_task.sub_tasks."""
+    related = {sub_task.assignee_id for sub_task in task.sub_tasks.all()}
+    if task.parent_task_id is not None:
+        related |= {sibling.assignee_id for sibling in task.parent_task.sub_tasks.all() if sibling.pk != task.pk}
+    return related - {None}
+
+
+def _group_related(tasks, rows):
+    by_parent = defaultdict(list)
+    for task_id, parent_id, assignee_id in rows:
+        by_parent[parent_id].append((task_id, assignee_id))
+    related = {}
+    for task in tasks:
+        assignees = {assignee_id for _, assignee_id in by_parent.get(task.pk, ())}
+        assignees |= {assignee_id for task_id, assignee_id in by_parent.get(task.parent_task_id, ())
+                      if task_id != task.pk}
+        if assignees:
+            related[task.pk] = assignees
+    return related
+
+
+def load_related_assignees(tasks, task_queryset=None):
+    """
+    То же для пачки задач одним запросом: {id задачи: множество id исполнителей}.
+    Для больших пачек передаётся task_queryset, из которого они выбраны, — id подставляются подзапросом.
+    """
+    if task_queryset is not None:
+        task_ids, parent_ids = task_queryset.values('id'), task_queryset.values('parent_task_id')
+    else:
+        task_ids = {task.pk for task in tasks}
+        parent_ids = {task.parent_task_id for task in tasks} - {None}
+    rows = Task.objects.filter(
+        Q(parent_task_id__in=task_ids) | Q(parent_task_id__in=parent_ids), assignee__isnull=False
+    ).values_list('id', 'parent_task_id', 'assignee_id')
+    return _group_related(tasks, rows)
+
+
+class TaskRef(namedtuple('TaskRef', ['pk', 'deadline', 'parent_task_id'])):
+    """Лёгкая замена экземпляра Task для подбора по большим выборкам."""
+    __slots__ = ()
+
+
+def suggest_assignees(tasks, k=3):
+    """Пакетный подбор исполнителей для задач из базы: два запроса независимо от размера пачки."""
+    tasks = list(tasks)
+    return AssignmentEngine.from_db().suggest(tasks, load_related_assignees(tasks), k)
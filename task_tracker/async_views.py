@@ -0,0 +1,155 @@
+"""
+Асинхронные варианты read-эндпоинтов для развёртывания под ASGI (uvicorn config.asgi:application).
+Данные читаются асинхронным API ORM (afirst, async-итерация QuerySet с prefetch_related), поэтому
+ожидание базы не занимает воркер. Сериализаторы и формат ответов те же, что у синхронных эндпоинтов;
+кеш ответов и ETag здесь не применяются.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .filters import TaskFilter
+from .metrics import time_serializer
+from .models import Employee, Snapshot, Task
+from .paginators import EmployeeKeysetPagination, TaskKeysetPagination
+from .renderers import FastJSONRenderer
+from .row_serializers import EmployeeRowSerializer, TaskRowSerializer
+from .serializers import BusyEmployeeRankingSerializer, BusyEmployeeSerializer, EmployeeSerializer, \
+    TaskSerializer
+from .snapshots import BUSY_EMPLOYEES, busy_employees_queryset, refresh_snapshot, snapshot_age, snapshots_enabled
+from .views import prefetch_active_tasks, prefetch_all_tasks
+
+
+class AsyncReadView(View):
+    serializer_class = None
+    renderer = FastJSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        # Request из DRF нужен пагинаторам и сериализаторам (query_params, build_absolute_uri)
+        self.request = Request(request)
+        try:
+            data = await self.get_data(self.request, *args, **kwargs)
+        except APIException as exc:
+            return self.render({'detail': exc.detail} if isinstance(exc.detail, str) else exc.detail,
+                               exc.status_code)
+        return self.render(data)
+
+    async def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), content_type='application/json', status=status)
+
+    def serialize(self, instance, many=False):
+        serializer = self.serializer_class(instance, many=many, context={'request': self.request, 'view': self})
+        return time_serializer(serializer, self.request).data
+
+
+class AsyncListView(AsyncReadView):
+    pagination_class = None
+    # Если задан, список строится row-сериализатором из values_list (см. task_tracker.row_serializers)
+    row_serializer_class = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def filter_queryset(self, queryset):
+        return queryset
+
+    async def serialize_list(self, objects):
+        if self.row_serializer_class is None:
+            return self.serialize(objects, many=True)
+        # Связанные задачи row-сериализатор читает отдельным запросом
+        serializer = time_serializer(self.row_serializer_class(objects), self.request)
+        return await sync_to_async(lambda: serializer.data)()
+
+    async def get_data(self, request, *args, **kwargs):
+        queryset = await self.filter_queryset(self.get_queryset())
+        if self.row_serializer_class is not None:
+            queryset = self.row_serializer_class.get_rows(queryset)
+        if self.pagination_class is None:
+            return await self.serialize_list([obj async for obj in queryset])
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        return paginator.get_paginated_response(await self.serialize_list(page)).data
+
+
+class AsyncDetailView(AsyncReadView):
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def get_data(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        instance = await queryset.filter(pk=kwargs['pk']).afirst()
+        if instance is None:
+            # То же сообщение, что у get_object_or_404 в синхронных представлениях
+            raise NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+        return self.serialize(instance)
+
+
+class AsyncTaskListView(AsyncListView):
+    serializer_class = TaskSerializer
+    row_serializer_class = TaskRowSerializer
+    pagination_class = TaskKeysetPagination
+
+    def get_queryset(self):
+        return Task.objects.prefetch_related('sub_tasks').order_by('id')
+
+    async def filter_queryset(self, queryset):
+        paginator = self.pagination_class
+        non_filter_params = {api_settings.URL_FORMAT_OVERRIDE, paginator.cursor_query_param,
+                             paginator.page_size_query_param, paginator.ordering_query_param}
+        invalid_filters = set(self.request.query_params) - non_filter_params - set(TaskFilter.base_filters)
+        if invalid_filters:
+            raise ValidationError(f"Фильтрация по полю(-ям) {', '.join(invalid_filters)} невозможна.")
+
+        filterset = TaskFilter(self.request.query_params, queryset=queryset, request=self.request)
+        # Валидация фильтров по id (assignee, parent_task) обращается к базе
+        if not await sync_to_async(filterset.is_valid)():
+            raise ValidationError(filterset.errors)
+        return filterset.qs
+
+
+class AsyncTaskDetailView(AsyncDetailView):
+    serializer_class = TaskSerializer
+
+    def get_queryset(self):
+        return Task.objects.prefetch_related('sub_tasks')
+
+
+class AsyncEmployeeListView(AsyncListView):
+    serializer_class = EmployeeSerializer
+    row_serializer_class = EmployeeRowSerializer
+    pagination_class = EmployeeKeysetPagination
+
+    def get_queryset(self):
+        return Employee.objects.prefetch_related(prefetch_active_tasks())
+
+
+class AsyncEmployeeDetailView(AsyncDetailView):
+    serializer_class = BusyEmployeeSerializer
+
+    def get_queryset(self):
+        return Employee.objects.prefetch_related(prefetch_all_tasks())
+
+
+class AsyncBusyEmployeesView(AsyncListView):
+    serializer_class = BusyEmployeeRankingSerializer
+
+    def get_queryset(self):
+        return busy_employees_queryset()
+
+    async def get(self, request, *args, **kwargs):
+        if not snapshots_enabled():
+            return await super().get(request, *args, **kwargs)
+        # Как и синхронный эндпоинт, отдаём снимок рейтинга
+        snapshot = await Snapshot.objects.filter(key=BUSY_EMPLOYEES).afirst()
+        if snapshot is None:
+            snapshot = await sync_to_async(refresh_snapshot)(BUSY_EMPLOYEES)
+        response = self.render(snapshot.data)
+        response['X-Snapshot-Age'] = snapshot_age(snapshot)
+        return response
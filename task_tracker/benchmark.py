@@ -0,0 +1,114 @@
+"""
+Нагрузочное тестирование HTTP-эндпоинтов: заданное число постоянных (keep-alive) соединений
+отправляет GET-запросы, пока не будет выполнено нужное количество, и собирает задержки.
+Клиент HTTP/1.1 минимальный (Content-Length и chunked), чтобы не добавлять зависимостей.
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name:
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection') != 'close'
+
+
+class HttpLoad:
+    def __init__(self, url, concurrency=500, total=10000, timeout=30):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        self.concurrency = concurrency
+        self.total = total
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+        self._remaining = total
+
+    def _request_bytes(self):
+        return (f'GET {self.target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                f'Accept: application/json\r\nConnection: keep-alive\r\n\r\n').encode()
+
+    async def _worker(self):
+        request = self._request_bytes()
+        reader = writer = None
+        while self._remaining > 0:
+            self._remaining -= 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await asyncio.wait_for(_read_response(reader), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                self.errors += 1
+                if writer is not None:
+                    writer.close()
+                reader = writer = None
+                continue
+            self.latencies.append(time.perf_counter() - started)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status >= 400:
+                self.errors += 1
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    async def run(self):
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        duration = time.perf_counter() - started
+        return {
+            'url': self.url,
+            'concurrency': self.concurrency,
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'duration_s': round(duration, 3),
+            'requests_per_s': round(len(self.latencies) / duration, 1) if duration else None,
+            'p50_ms': _ms(percentile(self.latencies, 50)),
+            'p90_ms': _ms(percentile(self.latencies, 90)),
+            'p99_ms': _ms(percentile(self.latencies, 99)),
+            'max_ms': _ms(max(self.latencies, default=None)),
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def run_http_load(url, concurrency=500, total=10000, timeout=30):
+    return asyncio.run(HttpLoad(url, concurrency, total, timeout).run())
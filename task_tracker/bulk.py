@@ -0,0 +1,293 @@
+"""
+Массовое создание, изменение и удаление задач. Валидация выполняется по всей пачке сразу:
+родители, исполнители и изменяемые задачи загружаются одним запросом каждый, запись идёт через
+bulk_create/bulk_update в одной транзакции. Ошибки возвращаются списком, по одному элементу на задачу.
+"""
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from . import events, snapshots
+from .assignment import AssignmentEngine, TaskRef, load_related_assignees
+from .cache import invalidate_all
+from .hierarchy import build_path, path_depth, path_to_ids
+from .models import DeletionLog, Employee, EmployeeWorkload, Task
+from .serializers import TaskBulkItemSerializer
+from .signals import batch_operation
+from .statuses import TaskStatus
+
+BATCH_SIZE = 1000
+
+
+def _validate_items(items, partial):
+    # Проверка полей каждого элемента без обращений к базе
+    data, errors = [], []
+    for item in items:
+        serializer = TaskBulkItemSerializer(data=item, partial=partial)
+        if serializer.is_valid():
+            data.append(serializer.validated_data)
+            errors.append({})
+        else:
+            data.append(None)
+            errors.append(dict(serializer.errors))
+    return data, errors
+
+
+def _creates_cycle(task_id, parent_id, new_parents, parents):
+    """
+    Проверяет, станет ли задача предком самой себя с учётом переносов внутри пачки.
+    new_parents — новые родители переносимых задач, parents — загруженные задачи с актуальным path.
+    """
+    seen = set()
+    while parent_id in parents and parent_id not in seen:
+        seen.add(parent_id)
+        # Идём вверх по текущему пути до ближайшего предка, который тоже переносится в этой пачке
+        for ancestor_id in reversed(path_to_ids(parents[parent_id].path)):
+            if ancestor_id == task_id:
+                return True
+            if ancestor_id in new_parents:
+                parent_id = new_parents[ancestor_id]
+                break
+        else:
+            return False
+    return False
+
+
+def _check_references(data, errors, existing=None):
+    """Проверка родителей и исполнителей всей пачки тремя запросами максимум."""
+    existing = existing or {}
+    parent_ids, assignee_ids = set(), set()
+    for item in data:
+        if item is None:
+            continue
+        task = existing.get(item.get('id'))
+        parent_id = item['parent_task_id'] if 'parent_task_id' in item else getattr(task, 'parent_task_id', None)
+        if parent_id is not None:
+            parent_ids.add(parent_id)
+        if item.get('assignee_id') is not None:
+            assignee_ids.add(item['assignee_id'])
+
+    parents = Task.objects.only('id', 'deadline', 'path', 'depth').in_bulk(parent_ids)
+    employees = set(Employee.objects.filter(id__in=assignee_ids).values_list('id', flat=True))
+    new_parents = {
+        item['id']: item['parent_task_id'] for item in data
+        if item is not None and 'id' in item and 'parent_task_id' in item
+    }
+    # Сроки родителей сравниваем с учётом их изменения в этой же пачке
+    deadlines = {task_id: parent.deadline for task_id, parent in parents.items()}
+    deadlines.update(
+        (item['id'], item['deadline']) for item in data
+        if item is not None and item.get('id') in existing and 'deadline' in item
+    )
+
+    for item, item_errors in zip(data, errors):
+        if item is None:
+            continue
+        task = existing.get(item.get('id'))
+        parent_id = item['parent_task_id'] if 'parent_task_id' in item else getattr(task, 'parent_task_id', None)
+        deadline = item['deadline'] if 'deadline' in item else getattr(task, 'deadline', None)
+        if item.get('assignee_id') is not None and item['assignee_id'] not in employees:
+            item_errors.setdefault('assignee', []).append('Employee does not exist.')
+        if parent_id is None:
+            continue
+        if parent_id not in parents:
+            item_errors.setdefault('parent_task', []).append('Parent task does not exist.')
+            continue
+        if deadline > deadlines[parent_id]:
+            item_errors.setdefault('deadline', []).append(
+                'Task deadline cannot be earlier than parent task deadline.')
+        if (task is not None and 'parent_task_id' in item
+                and _creates_cycle(task.pk, parent_id, new_parents, parents)):
+            item_errors.setdefault('parent_task', []).append('Task cannot be its own ancestor.')
+    return parents
+
+
+def bulk_create_tasks(items):
+    """Создаёт задачи пачкой. Возвращает (задачи, ошибки); при ошибках ничего не записывается."""
+    data, errors = _validate_items(items, partial=False)
+    parents = _check_references(data, errors)
+    if any(errors):
+        return None, errors
+
+    tasks = [Task(**{field: value for field, value in item.items() if field != 'id'}) for item in data]
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+        # Пути можно посчитать только после вставки, когда известны id
+        for task in tasks:
+            parent = parents.get(task.parent_task_id)
+            task.path = build_path(parent.path if parent else None, task.pk)
+            task.depth = path_depth(task.path)
+        Task.objects.bulk_update(tasks, ['path', 'depth'], batch_size=BATCH_SIZE)
+        EmployeeWorkload.refresh_for({task.assignee_id for task in tasks} - {None})
+        invalidate_all()
+        snapshots.schedule_refresh()
+        events.publish([event for task in tasks for event in events.build_task_events(task, created=True)])
+    return tasks, errors
+
+
+def bulk_update_tasks(items):
+    """Частично обновляет задачи пачкой по id. Возвращает (задачи, ошибки)."""
+    data, errors = _validate_items(items, partial=True)
+    ids = [item['id'] for item in data if item is not None and 'id' in item]
+    existing = Task.objects.in_bulk(ids)
+    for item, item_errors in zip(data, errors):
+        if item is None:
+            continue
+        if 'id' not in item:
+            item_errors.setdefault('id', []).append('This field is required.')
+        elif item['id'] not in existing:
+            item_errors.setdefault('id', []).append('Task does not exist.')
+    valid = [item if item is not None and item.get('id') in existing else None for item in data]
+    _check_references(valid, errors, existing)
+    if any(errors):
+        return None, errors
+
+    fields = {'updated_at'}
+    employee_ids = set()
+    moved = []
+    now = timezone.now()
+    for item in data:
+        task = existing[item['id']]
+        employee_ids.add(task.assignee_id)
+        if 'parent_task_id' in item and item['parent_task_id'] != task.parent_task_id:
+            moved.append(task)
+        for field, value in item.items():
+            if field != 'id':
+                setattr(task, field, value)
+                fields.add(field)
+        task.updated_at = now
+        employee_ids.add(task.assignee_id)
+
+    tasks = [existing[item['id']] for item in data]
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, sorted(fields), batch_size=BATCH_SIZE)
+        for task in moved:
+            _move_subtree(task)
+        EmployeeWorkload.refresh_for(employee_ids - {None})
+        invalidate_all()
+        snapshots.schedule_refresh()
+        # В _loaded_values задач остались значения до изменения
+        events.publish([event for task in tasks for event in events.build_task_events(task, task._loaded_values)])
+    return tasks, errors
+
+
+def _move_subtree(task):
+    # Путь задачи и родителя читаем заново: предыдущие переносы пачки могли их изменить
+    task.refresh_from_db(fields=['path', 'depth'])
+    parent_path = None
+    if task.parent_task_id is not None:
+        parent_path = Task.objects.values_list('path', flat=True).get(pk=task.parent_task_id)
+    new_path = build_path(parent_path, task.pk)
+    if new_path == task.path:
+        return
+    new_depth = path_depth(new_path)
+    Task.objects.filter(path__startswith=task.path).update(
+        path=Concat(Value(new_path), Substr('path', len(task.path) + 1)),
+        depth=F('depth') + (new_depth - task.depth),
+    )
+    task.path, task.depth = new_path, new_depth
+
+
+def _detach_descendants(ids):
+    """
+    Прямые подзадачи удаляемых задач становятся корнями, пути всех их потомков перестраиваются.
+    Потомки читаются по уровням через parent_task (запрос на уровень дерева, а не на поддерево),
+    пути записываются через bulk_update.
+    """
+    deleted = set(ids)
+    level = list(Task.objects.filter(parent_task_id__in=deleted).exclude(id__in=deleted)
+                 .only('id', 'parent_task', 'path', 'depth'))
+    # Сдвигаем updated_at, чтобы изменились ETag подзадач и они попали в /sync/
+    Task.objects.filter(id__in=[task.pk for task in level]).update(parent_task=None, updated_at=timezone.now())
+    descendants, paths = [], {}
+    while level:
+        for task in level:
+            # У прямых подзадач родителя в paths нет, их путь начинается с корня
+            task.path = build_path(paths.get(task.parent_task_id), task.pk)
+            task.depth = path_depth(task.path)
+            paths[task.pk] = task.path
+        descendants.extend(level)
+        level = list(Task.objects.filter(parent_task_id__in=[task.pk for task in level]).exclude(id__in=deleted)
+                     .only('id', 'parent_task', 'path', 'depth'))
+    Task.objects.bulk_update(descendants, ['path', 'depth'], batch_size=BATCH_SIZE)
+
+
+def bulk_delete_tasks(ids):
+    """
+    Удаляет задачи пачкой. Возвращает количество удалённых задач.
+    Обработчики сигналов удаления по строкам пропускаются (batch_operation): журнал удалений, кеш, события
+    и снимки обновляются один раз на пачку. Число запросов растёт с глубиной дерева и числом пачек
+    по BATCH_SIZE, а не с числом задач.
+    """
+    with transaction.atomic():
+        tasks = list(Task.objects.filter(id__in=ids))
+        if not tasks:
+            return 0
+        ids = [task.pk for task in tasks]
+        _detach_descendants(ids)
+        # Collector по-прежнему обрабатывает ссылки на задачи, обработчики сигналов по строкам пропускаются
+        with batch_operation():
+            Task.objects.filter(id__in=ids).delete()
+        DeletionLog.objects.bulk_create([DeletionLog(model=Task._meta.model_name, object_id=task_id)
+                                         for task_id in ids], batch_size=BATCH_SIZE)
+        EmployeeWorkload.refresh_for({task.assignee_id for task in tasks} - {None})
+        invalidate_all()
+        snapshots.schedule_refresh()
+        events.publish([events.build_deleted_event(task) for task in tasks])
+    return len(ids)
+
+
+def get_unassigned_tasks():
+    # Завершённые задачи без исполнителя не распределяются
+    return Task.objects.filter(assignee__isnull=True).exclude(status=TaskStatus.COMPLETED)
+
+
+def _write_assignments(items, now):
+    """
+    Записывает пары (id задачи, id сотрудника) одним UPDATE ... FROM (VALUES ...) на пачку: число запросов
+    не зависит от числа сотрудников. bulk_update с CASE на больших пачках заметно медленнее, так как каждое
+    выражение CASE перебирает все id пачки, поэтому он остаётся только для баз без UPDATE ... FROM.
+    """
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        Task.objects.bulk_update([Task(id=task_id, assignee_id=employee_id, updated_at=now)
+                                  for task_id, employee_id in items], ['assignee', 'updated_at'])
+        return
+    quote = connection.ops.quote_name
+    table = quote(Task._meta.db_table)
+    assignee = quote(Task._meta.get_field('assignee').column)
+    # Столбцы VALUES без псевдонимов называются column1, column2 и в PostgreSQL, и в SQLite
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET {assignee} = v.column2, {quote("updated_at")} = %s '
+            f'FROM (VALUES {", ".join(["(%s, %s)"] * len(items))}) AS v WHERE {table}.{quote("id")} = v.column1',
+            [connection.ops.adapt_datetimefield_value(now), *(value for item in items for value in item)]
+        )
+
+
+def auto_assign(dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Распределяет все незавершённые задачи без исполнителя по сотрудникам жадным подбором с балансировкой
+    и записывает результат в одной транзакции. Возвращает {id задачи: id сотрудника}.
+    События push-канала по каждой задаче не публикуются: изменения видны клиентам через /sync/.
+    """
+    with transaction.atomic():
+        # Блокируем распределяемые задачи, чтобы параллельное назначение не было перезаписано
+        queryset = get_unassigned_tasks().select_for_update()
+        tasks = [TaskRef(*row) for row in queryset.values_list('id', 'deadline', 'parent_task_id')]
+        if not tasks:
+            return {}
+        engine = AssignmentEngine.from_db()
+        suggestions = engine.suggest(tasks, load_related_assignees(tasks, get_unassigned_tasks()), k=1)
+        assignments = {task_id: ranked[0][0].id for task_id, ranked in suggestions.items() if ranked}
+        if dry_run or not assignments:
+            return assignments
+
+        items = list(assignments.items())
+        now = timezone.now()
+        for start in range(0, len(items), batch_size):
+            _write_assignments(items[start:start + batch_size], now)
+        EmployeeWorkload.refresh_for(set(assignments.values()))
+        invalidate_all()
+        snapshots.schedule_refresh()
+    return assignments
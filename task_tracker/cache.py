@@ -0,0 +1,104 @@
+"""
+Кеш ответов read-эндпоинтов с инвалидацией через поколения (generation keys).
+
+Ключ ответа включает текущие номера поколений областей, от которых зависят данные:
+ALL_SCOPE входит во все ключи и сбрасывается массовыми операциями, LISTS_SCOPE — в ключи списков
+и сбрасывается любой записью, области отдельных задач и сотрудников — в ключи детальных эндпоинтов.
+Инвалидация — это инкремент номера поколения: старые записи просто перестают читаться и истекают по TTL.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+KEY_PREFIX = 'task_tracker'
+ALL_SCOPE = 'all'
+LISTS_SCOPE = 'lists'
+
+
+def task_scope(task_id):
+    return f'task:{task_id}'
+
+
+def employee_scope(employee_id):
+    return f'employee:{employee_id}'
+
+
+def _generation_key(scope):
+    return f'{KEY_PREFIX}:gen:{scope}'
+
+
+def get_generations(scopes):
+    keys = [_generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Начальное значение от времени: если ключ поколения вытеснен, старые ответы не оживут
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump(*scopes):
+    for scope in set(scopes):
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*scopes):
+    # Сбрасываем сразу и ещё раз после коммита: ответ, закешированный до коммита, не переживёт его
+    bump(*scopes)
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def cache_enabled():
+    return getattr(settings, 'TASK_TRACKER_CACHE_ENABLED', True)
+
+
+def invalidate_all():
+    # Для массовых операций, которые пишут в обход сигналов моделей
+    invalidate(ALL_SCOPE, LISTS_SCOPE)
+
+
+class CachedResponseMixin:
+    """
+    Кеширует данные успешных GET-ответов list/retrieve. Области задаются в get_cache_scopes;
+    по умолчанию ответ зависит от всех списков.
+    """
+    cache_timeout = None
+
+    def get_cache_scopes(self):
+        return [LISTS_SCOPE]
+
+    def get_cache_key(self, request):
+        scopes = [ALL_SCOPE] + list(self.get_cache_scopes())
+        generations = '.'.join(str(generation) for generation in get_generations(scopes))
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f'{KEY_PREFIX}:response:{type(self).__name__}:{generations}:{path}'
+
+    def get_cache_timeout(self):
+        return self.cache_timeout or getattr(settings, 'TASK_TRACKER_CACHE_TIMEOUT', 300)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not cache_enabled():
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
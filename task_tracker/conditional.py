@@ -0,0 +1,74 @@
+"""
+Условные GET-запросы: ETag и Last-Modified считаются по Max('updated_at') и количеству строк
+наборов данных, от которых зависит ответ. При совпадении If-None-Match / If-Modified-Since
+возвращается 304 без запуска сериализаторов.
+"""
+import datetime
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .cache import CachedResponseMixin, cache_enabled
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag и Last-Modified к GET-ответам list/retrieve. Наборы данных, от которых зависит ответ,
+    задаются в get_etag_querysets. Детальные эндпоинты отдают сильный ETag, списки — слабый (weak_etag = True).
+    Должен стоять в MRO перед CachedResponseMixin: тогда состояние кешируется под ключом ответа
+    и повторная проверка не обращается к базе.
+    """
+    weak_etag = False
+
+    def get_etag_querysets(self):
+        raise NotImplementedError
+
+    def compute_conditional_state(self, request):
+        parts = [request.get_full_path()]
+        last_modified = None
+        for queryset in self.get_etag_querysets():
+            stats = queryset.order_by().aggregate(last=Max('updated_at'), count=Count('pk'))
+            parts.append(f"{stats['last'].isoformat() if stats['last'] else ''}:{stats['count']}")
+            if stats['last'] and (last_modified is None or stats['last'] > last_modified):
+                last_modified = stats['last']
+
+        etag = quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+        if self.weak_etag:
+            etag = f'W/{etag}'
+        if last_modified is not None:
+            if not timezone.is_aware(last_modified):
+                last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+            last_modified = int(last_modified.timestamp())
+        return etag, last_modified
+
+    def get_conditional_state(self, request):
+        if not isinstance(self, CachedResponseMixin) or not cache_enabled():
+            return self.compute_conditional_state(request)
+        # Ключ ответа включает поколения областей, поэтому состояние сбрасывается вместе с ответом
+        key = f'{self.get_cache_key(request)}:conditional'
+        state = cache.get(key)
+        if state is None:
+            state = self.compute_conditional_state(request)
+            cache.set(key, state, self.get_cache_timeout())
+        return state
+
+    def get_conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_state(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional(super().retrieve, request, *args, **kwargs)
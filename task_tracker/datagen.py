@@ -0,0 +1,125 @@
+"""
+Синтетические данные для проверки планов запросов и нагрузочных замеров: сотрудники и задачи
+с иерархией ограниченной глубины и распределением статусов, близким к рабочему. Id назначаются заранее,
+поэтому path и depth известны до вставки, а задачи пишутся многострочными INSERT без экземпляров модели.
+"""
+import random
+from datetime import date, timedelta
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .hierarchy import build_path
+from .models import Employee, EmployeeWorkload, Task
+from .statuses import TaskStatus, status_code
+
+STATUS_WEIGHTS = {
+    TaskStatus.COMPLETED: 45,
+    TaskStatus.IN_PROGRESS: 20,
+    TaskStatus.NEW: 25,
+    TaskStatus.NOT_STARTED: 10,
+}
+POSITIONS = ['Developer', 'Senior Developer', 'QA Engineer', 'Analyst', 'Designer', 'Manager']
+# Доля задач без исполнителя и доля подзадач
+UNASSIGNED_SHARE = 0.1
+SUB_TASK_SHARE = 0.6
+MAX_DEPTH = 5
+# Родитель выбирается среди последних PARENT_WINDOW задач, чтобы не держать в памяти все задачи
+PARENT_WINDOW = 10000
+
+TASK_COLUMNS = ['id', 'name', 'parent_task_id', 'assignee_id', 'deadline', 'status', 'path', 'depth',
+                'additional_info', 'created_at', 'updated_at']
+
+
+def _next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def _insert(model, columns, rows):
+    """
+    Вставляет строки многострочными INSERT без создания экземпляров модели: для миллионов задач
+    bulk_create тратит основное время на pre_save и подготовку значений каждого поля.
+    """
+    fields = [model._meta.get_field(column.removesuffix('_id')) for column in columns]
+    per_statement = connection.ops.bulk_batch_size(fields, rows)
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(column) for column in columns)
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            cursor.execute(f'INSERT INTO {table} ({names}) VALUES {", ".join([placeholders] * len(chunk))}',
+                           [value for row in chunk for value in row])
+
+
+def _reset_sequences(models):
+    # Id заданы явно, поэтому в PostgreSQL сдвигаем последовательности за последний id
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def generate_tasks(count, first_id, employee_ids, rng, today, now=None):
+    """
+    Генерирует строки задач в порядке TASK_COLUMNS с id first_id, first_id + 1, ...
+    Значения уже приведены к формату базы: даты через connection.ops.adapt_*, статус — кодом.
+    """
+    statuses, weights = [status_code(status) for status in STATUS_WEIGHTS], list(STATUS_WEIGHTS.values())
+    timestamp = connection.ops.adapt_datetimefield_value(now or timezone.now())
+    # Возможные родители: (id, path, depth, deadline)
+    parents = []
+    for task_id in range(first_id, first_id + count):
+        parent = None
+        if parents and rng.random() < SUB_TASK_SHARE:
+            parent = rng.choice(parents)
+            if parent[2] >= MAX_DEPTH:
+                parent = None
+        if parent is not None:
+            # Срок подзадачи не позже срока родителя
+            deadline = parent[3] - timedelta(days=rng.randint(0, 10))
+            path, depth = build_path(parent[1], task_id), parent[2] + 1
+        else:
+            deadline = today + timedelta(days=rng.randint(-30, 180))
+            path, depth = build_path(None, task_id), 0
+        assignee_id = None if not employee_ids or rng.random() < UNASSIGNED_SHARE else rng.choice(employee_ids)
+
+        if len(parents) < PARENT_WINDOW:
+            parents.append((task_id, path, depth, deadline))
+        else:
+            parents[rng.randrange(PARENT_WINDOW)] = (task_id, path, depth, deadline)
+        yield (task_id, f'Task {task_id}', parent[0] if parent else None, assignee_id,
+               connection.ops.adapt_datefield_value(deadline), rng.choices(statuses, weights)[0], path, depth,
+               '', timestamp, timestamp)
+
+
+def seed(employees, tasks, batch_size=5000, random_seed=None, today=None):
+    """
+    Добавляет employees сотрудников и tasks задач и пересобирает нагрузку.
+    Исполнители выбираются среди всех сотрудников базы. Возвращает (id первой задачи, id последней).
+    """
+    rng = random.Random(random_seed)
+    today = today or date.today()
+    with transaction.atomic():
+        first_employee = _next_id(Employee)
+        Employee.objects.bulk_create(
+            [Employee(id=employee_id, full_name=f'Employee {employee_id}', position=rng.choice(POSITIONS))
+             for employee_id in range(first_employee, first_employee + employees)],
+            batch_size=batch_size,
+        )
+        employee_ids = list(Employee.objects.values_list('id', flat=True))
+
+        first_task = _next_id(Task)
+        batch = []
+        for row in generate_tasks(tasks, first_task, employee_ids, rng, today):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _insert(Task, TASK_COLUMNS, batch)
+                batch = []
+        if batch:
+            _insert(Task, TASK_COLUMNS, batch)
+
+        _reset_sequences([Employee, Task])
+        EmployeeWorkload.rebuild(batch_size=batch_size)
+    return first_task, first_task + tasks - 1
@@ -0,0 +1,217 @@
+"""
+Push-канал событий задач (server-sent events). Сигналы Task и массовые операции после коммита
+публикуют события в брокер, ASGI-представление держит соединение клиента и отдаёт подходящие события.
+
+Брокер задаётся настройкой TASK_TRACKER_EVENT_BROKER. InProcessBroker доставляет события только
+подписчикам того же процесса; при нескольких воркерах или отдельных процессах для записи используется
+RedisBroker (Redis pub/sub). Пропущенные за время переподключения изменения клиент забирает через /sync/.
+"""
+import asyncio
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+TASK_CREATED = 'task.created'
+TASK_UPDATED = 'task.updated'
+TASK_STATUS_CHANGED = 'task.status_changed'
+TASK_REASSIGNED = 'task.reassigned'
+TASK_DELETED = 'task.deleted'
+
+# Поля, прежние значения которых передаются в событии (для фильтрации по старому исполнителю или родителю)
+TRACKED_FIELDS = {
+    'status': 'status',
+    'assignee': 'assignee_id',
+    'parent_task': 'parent_task_id',
+}
+
+
+def _iso(value):
+    # Значение может быть ещё строкой, если задача создана с deadline='YYYY-MM-DD'
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def task_payload(task):
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'status': task.status,
+        'assignee': task.assignee_id,
+        'parent_task': task.parent_task_id,
+        'deadline': _iso(task.deadline),
+        'updated_at': _iso(task.updated_at),
+    }
+
+
+def build_task_events(task, previous=None, created=False):
+    """
+    События сохранения задачи. previous — значения полей до сохранения (Task._loaded_values).
+    Смена статуса и смена исполнителя дают отдельные события, остальные изменения — task.updated.
+    """
+    payload = task_payload(task)
+    if created:
+        return [{'type': TASK_CREATED, 'task': payload}]
+    previous = previous or {}
+    changed = {
+        field: previous[attname] for field, attname in TRACKED_FIELDS.items()
+        if attname in previous and previous[attname] != getattr(task, attname)
+    }
+    events = []
+    if 'status' in changed:
+        events.append({'type': TASK_STATUS_CHANGED, 'task': payload, 'previous': changed})
+    if 'assignee' in changed:
+        events.append({'type': TASK_REASSIGNED, 'task': payload, 'previous': changed})
+    if not events:
+        events.append({'type': TASK_UPDATED, 'task': payload, 'previous': changed})
+    return events
+
+
+def build_deleted_event(task):
+    return {'type': TASK_DELETED, 'task': task_payload(task)}
+
+
+def event_matches(event, assignee=None, parent_task=None):
+    # Событие видят и новый, и прежний исполнитель (родитель)
+    task, previous = event['task'], event.get('previous', {})
+    if assignee is not None and assignee not in (task['assignee'], previous.get('assignee')):
+        return False
+    if parent_task is not None and parent_task not in (task['parent_task'], previous.get('parent_task')):
+        return False
+    return True
+
+
+def publish(events):
+    """Публикует события после коммита текущей транзакции; ошибка брокера не ломает запись."""
+    if not events:
+        return
+    transaction.on_commit(lambda: get_broker().publish_many(events), robust=True)
+
+
+class _InProcessSubscription:
+
+    def __init__(self, broker, queue_size):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, event):
+        # Вызывается из потока публикации: передаём событие в цикл подписчика
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            # Медленный клиент теряет самые старые события, а не блокирует публикацию
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self):
+        self.broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self)
+
+
+class InProcessBroker:
+    queue_size = 1000
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish_many(self, events):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for event in events:
+                try:
+                    subscription.put(event)
+                except RuntimeError:
+                    # Цикл подписчика уже закрыт
+                    self._remove(subscription)
+                    break
+
+    def subscribe(self):
+        return _InProcessSubscription(self, self.queue_size)
+
+
+class _RedisSubscription:
+
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+
+    async def get(self, timeout=None):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+    async def __aenter__(self):
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(self.url)
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(self.channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    channel = 'task_tracker:events'
+
+    def __init__(self, url=None):
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    def publish_many(self, events):
+        with self.client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.publish(self.channel, json.dumps(event))
+            pipe.execute()
+
+    def subscribe(self):
+        return _RedisSubscription(self.url, self.channel)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.TASK_TRACKER_EVENT_BROKER)()
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_task_events(assignee=None, parent_task=None, heartbeat=None):
+    """Поток SSE для одного клиента: подходящие события и комментарии-heartbeat в паузах."""
+    heartbeat = heartbeat or getattr(settings, 'TASK_TRACKER_EVENTS_HEARTBEAT', 15)
+    async with get_broker().subscribe() as subscription:
+        # Первая строка подтверждает подписку и задаёт интервал переподключения
+        yield 'retry: 3000\n: connected\n\n'
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ': keepalive\n\n'
+            elif event_matches(event, assignee, parent_task):
+                yield format_sse(event)
@@ -0,0 +1,89 @@
+"""
+Планы горячих запросов. HOT_QUERIES — запросы представлений и сериализаторов, которые выполняются
+на каждый запрос списков и записей; ни один из них не должен читать таблицу задач полным просмотром.
+
+Тесты и explain_queries --force-index запрещают в PostgreSQL полный просмотр и доказывают только, что
+подходящий индекс есть. Требование к объёму данных проверяет explain_queries --no-force после
+seed_data --tasks 1000000: планировщик работает без подсказок, на статистике из ANALYZE, и команда
+завершается ошибкой на любом Seq Scan, в том числе в important_tasks_queryset.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .bulk import get_unassigned_tasks
+from .models import Employee, EmployeeWorkload, Task
+from .snapshots import important_tasks_queryset
+from .statuses import ACTIVE_STATUSES
+
+# Объём таблицы задач, на котором проверка без подсказок планировщику имеет смысл
+PRODUCTION_TASKS = 1_000_000
+
+# Строки плана с полным просмотром таблицы: "SCAN <таблица>" без индекса в SQLite, "Seq Scan on" в PostgreSQL
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT)\S+$', re.MULTILINE),
+    'postgresql': re.compile(r'\bSeq Scan on \S+'),
+}
+
+
+def sample_parameters():
+    """Параметры запросов из текущих данных: сотрудники с задачами, задача с подзадачами, типичный срок."""
+    employee_ids = list(Task.objects.filter(assignee__isnull=False).order_by()
+                        .values_list('assignee_id', flat=True).distinct()[:20])
+    dates = Task.objects.aggregate(first=Min('deadline'), last=Max('updated_at'))
+    return {
+        'employee_id': employee_ids[0] if employee_ids else 0,
+        'employee_ids': employee_ids,
+        'parent_id': Task.objects.filter(parent_task__isnull=False).values_list('parent_task_id', flat=True)
+        .first() or 0,
+        'deadline': dates['first'] or timezone.now().date(),
+        'since': (dates['last'] or timezone.now()) - timedelta(minutes=5),
+    }
+
+
+HOT_QUERIES = {
+    # EmployeeSerializer.get_tasks и предзагрузка активных задач в списках сотрудников
+    'employee_active_tasks': lambda p: Task.objects.filter(assignee_id=p['employee_id'], status__in=ACTIVE_STATUSES),
+    'active_tasks_prefetch': lambda p: Task.objects.filter(status__in=ACTIVE_STATUSES,
+                                                           assignee_id__in=p['employee_ids']),
+    'employee_tasks': lambda p: Task.objects.filter(assignee_id=p['employee_id']),
+    # Пересчёт EmployeeWorkload при каждой записи задачи
+    'workload_aggregate': lambda p: EmployeeWorkload._aggregate(Task.objects.filter(
+        assignee_id__in=p['employee_ids'])),
+    'important_tasks': lambda p: important_tasks_queryset(),
+    'unassigned_tasks': lambda p: get_unassigned_tasks(),
+    'sub_tasks': lambda p: Task.objects.filter(parent_task_id=p['parent_id']),
+    'deadline_filter': lambda p: Task.objects.filter(deadline=p['deadline']),
+    'sync_tasks': lambda p: Task.objects.filter(updated_at__gt=p['since']).order_by('updated_at', 'id'),
+    'sync_employees': lambda p: Employee.objects.filter(updated_at__gt=p['since']).order_by('updated_at', 'id'),
+}
+
+
+def full_scans(plan, vendor=None):
+    return FULL_SCAN_PATTERNS[vendor or connection.vendor].findall(plan)
+
+
+def explain(queryset, force_index=False):
+    """
+    Возвращает план запроса. С force_index в PostgreSQL полный просмотр запрещается на время запроса:
+    на маленьких таблицах он дешевле индекса, и так проверяется, что подходящий индекс вообще есть.
+    """
+    if not force_index or connection.vendor != 'postgresql':
+        return queryset.explain()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def explain_hot_queries(force_index=False):
+    """Возвращает {имя запроса: (план, строки с полным просмотром)} для всех HOT_QUERIES."""
+    parameters = sample_parameters()
+    plans = {}
+    for name, build in HOT_QUERIES.items():
+        plan = explain(build(parameters), force_index)
+        plans[name] = (plan, full_scans(plan))
+    return plans
@@ -0,0 +1,94 @@
+"""
+Потоковая выгрузка задач и сотрудников в NDJSON и CSV. Строки читаются серверным курсором
+(QuerySet.iterator) кортежами values_list и сразу превращаются в текст, поэтому память процесса
+не зависит от размера таблицы. Под ASGI ответ получает асинхронный итератор aiter_export: синхронный
+Django вычитал бы целиком до отправки первого байта.
+"""
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
+
+from .models import Employee
+
+TASK_EXPORT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'parent_task': 'parent_task_id',
+    'assignee': 'assignee_id',
+    'deadline': 'deadline',
+    'status': 'status',
+    'additional_info': 'additional_info',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+EMPLOYEE_EXPORT_FIELDS = {
+    'id': 'id',
+    'full_name': 'full_name',
+    'position': 'position',
+    'additional_info': 'additional_info',
+    'active_task_count': 'active_task_count',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    # Псевдо-файл для csv.writer: возвращает записанную строку вместо буферизации
+    def write(self, value):
+        return value
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_rows(queryset, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    return queryset.prefetch_related(None).values_list(*fields.values()).iterator(chunk_size=chunk_size)
+
+
+def iter_ndjson(rows, fields):
+    header = list(fields)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + '\n'
+
+
+def iter_csv(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(list(fields))
+    for row in rows:
+        yield writer.writerow([_to_text(value) for value in row])
+
+
+def iter_export(queryset, fields, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = iter_rows(queryset, fields, chunk_size)
+    if export_format == 'csv':
+        return iter_csv(rows, fields)
+    return iter_ndjson(rows, fields)
+
+
+async def aiter_export(queryset, fields, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Курсор читается в потоке ORM; за один переход забираем chunk_size строк одним куском ответа
+    lines = iter_export(queryset, fields, export_format, chunk_size)
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, chunk_size)), thread_sensitive=True)
+    while chunk := await next_chunk():
+        yield chunk
+
+
+def get_employee_export_queryset():
+    return Employee.objects.annotate(
+        active_task_count=Coalesce('workload__active_count', 0)
+    ).order_by('id')
@@ -0,0 +1,19 @@
+from django_filters import rest_framework as filters
+
+from .models import Task
+
+
+class TaskFilter(filters.FilterSet):
+    """
+    Фильтры списка задач. Используются в TaskListAPIView, в потоковой выгрузке и в команде export_data.
+    """
+    sub_tasks = filters.BooleanFilter(method='filter_sub_tasks')
+    has_parent = filters.BooleanFilter(field_name='parent_task', lookup_expr='isnull', exclude=True)
+
+    class Meta:
+        model = Task
+        fields = ['assignee', 'status', 'parent_task', 'deadline']
+
+    def filter_sub_tasks(self, queryset, name, value):
+        # Фильтрация по наличию подзадач
+        return queryset.filter(sub_tasks__isnull=not value).distinct()
@@ -0,0 +1,101 @@
+"""
+Материализованный путь задач: Task.path хранит id всех предков и самой задачи в виде "/1/5/12/",
+Task.depth — глубину (у корня 0). Путь позволяет одним индексированным запросом получить предков
+(id из пути), потомков (path LIKE '/1/5/%') и обнаружить цикл без обхода цепочки parent_task.
+"""
+from collections import defaultdict, deque
+
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat
+
+PATH_SEPARATOR = '/'
+
+
+def build_path(parent_path, task_id):
+    return f'{parent_path or PATH_SEPARATOR}{task_id}{PATH_SEPARATOR}'
+
+
+def path_to_ids(path):
+    return [int(task_id) for task_id in path.strip(PATH_SEPARATOR).split(PATH_SEPARATOR) if task_id]
+
+
+def path_depth(path):
+    return len(path_to_ids(path)) - 1
+
+
+def path_contains(path, task_id):
+    return f'{PATH_SEPARATOR}{task_id}{PATH_SEPARATOR}' in (path or '')
+
+
+def rebuild_task_paths(task_model, batch_size=1000):
+    """
+    Пересчитывает path и depth всех задач по parent_task. Циклы (например, задача,
+    указанная родителем самой себе) разрываются: у одной задачи цикла parent_task сбрасывается в NULL.
+    Принимает класс модели, чтобы использоваться и из миграций. Возвращает (количество задач, id разорванных).
+    """
+    parents = dict(task_model.objects.values_list('id', 'parent_task_id').iterator(chunk_size=batch_size))
+    children = defaultdict(list)
+    roots = []
+    for task_id, parent_id in parents.items():
+        if parent_id is None or parent_id not in parents:
+            roots.append(task_id)
+        else:
+            children[parent_id].append(task_id)
+
+    paths = {}
+    broken = []
+
+    def walk(root_id):
+        paths[root_id] = build_path(None, root_id)
+        queue = deque([root_id])
+        while queue:
+            task_id = queue.popleft()
+            for child_id in children[task_id]:
+                if child_id not in paths:
+                    paths[child_id] = build_path(paths[task_id], child_id)
+                    queue.append(child_id)
+
+    for root_id in roots:
+        walk(root_id)
+
+    # Оставшиеся задачи лежат на цикле или под ним: идём вверх до повторения и разрываем цикл
+    for task_id in parents:
+        if task_id in paths:
+            continue
+        seen = set()
+        while task_id not in seen:
+            seen.add(task_id)
+            task_id = parents[task_id]
+        if task_id not in paths:
+            broken.append(task_id)
+            walk(task_id)
+
+    if broken:
+        task_model.objects.filter(id__in=broken).update(parent_task=None)
+    task_model.objects.bulk_update(
+        [task_model(id=task_id, path=path, depth=path_depth(path)) for task_id, path in paths.items()],
+        ['path', 'depth'],
+        batch_size=batch_size,
+    )
+    return len(paths), broken
+
+
+def fill_empty_paths(task_model):
+    """
+    Строит path и depth задач с пустым путём (только что загруженных), не трогая остальные.
+    Запрос на уровень дерева: корни получают "/id/", задачи с родителем, чей путь уже построен, —
+    путь родителя и свой id. Возвращает id задач, путь которых построить не удалось: цикл parent_task
+    или родитель без пути.
+    """
+    pending = task_model.objects.filter(path='')
+    pending.filter(parent_task__isnull=True).update(
+        path=Concat(Value(PATH_SEPARATOR), Cast('id', CharField()), Value(PATH_SEPARATOR)),
+        depth=0,
+    )
+    parent = task_model.objects.filter(pk=OuterRef('parent_task_id'))
+    while pending.filter(parent_task__path__gt='').update(
+            path=Concat(Subquery(parent.values('path')), Cast('id', CharField()), Value(PATH_SEPARATOR),
+                        output_field=CharField()),
+            depth=Subquery(parent.values('depth')) + 1):
+        pass
+    return list(pending.values_list('id', flat=True))
@@ -0,0 +1,200 @@
+"""
+Потоковый импорт сотрудников и задач из дампов (формат фикстур Django: JSON-массив или NDJSON,
+а также плоские строки выгрузки export_data). Файл читается по частям, строки пишутся пачками:
+на PostgreSQL через COPY, на остальных базах через bulk_create. Ссылки parent_task проставляются
+вторым проходом, поэтому порядок задач в файле не мешает загрузке. Пути и нагрузка пересчитываются
+только для загруженных задач и их исполнителей; цикл parent_task в файле — ошибка импорта.
+"""
+import csv
+import io
+import json
+from array import array
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .cache import invalidate_all
+from .hierarchy import fill_empty_paths
+from .models import Employee, EmployeeWorkload, Task
+from .snapshots import schedule_refresh
+from .statuses import status_code
+
+READ_CHUNK_SIZE = 1 << 16
+
+MODEL_LABELS = {
+    'task_tracker.employee': Employee,
+    'task_tracker.task': Task,
+}
+
+IMPORT_FIELDS = {
+    Employee: ['id', 'full_name', 'position', 'additional_info', 'created_at', 'updated_at'],
+    Task: ['id', 'name', 'assignee_id', 'deadline', 'status', 'additional_info', 'created_at', 'updated_at',
+           'path', 'depth'],
+}
+
+
+def iter_json_objects(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Последовательно отдаёт объекты из JSON-массива верхнего уровня или из NDJSON,
+    не загружая файл целиком: объекты декодируются из буфера по мере чтения.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+    while True:
+        # Пропускаем разделители между объектами: пробелы, переводы строк, запятые и скобки массива
+        while position < len(buffer):
+            char = buffer[position]
+            if char.isspace() or char in ',]':
+                position += 1
+            elif char == '[' and not started:
+                started = True
+                position += 1
+            else:
+                break
+
+        if position < len(buffer):
+            started = True
+            try:
+                obj, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                position = end
+                continue
+        elif eof:
+            return
+
+        # Объект не поместился в буфер: отбрасываем прочитанное и дочитываем следующий кусок
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def normalize(obj, default_model=None):
+    """Возвращает (модель, значения полей) для объекта фикстуры или плоской строки выгрузки."""
+    if 'model' in obj:
+        model = MODEL_LABELS.get(obj['model'])
+        if model is None:
+            raise ValueError(f"Unsupported model: {obj['model']}")
+        values = dict(obj.get('fields', {}), id=obj['pk'])
+    else:
+        if default_model is None:
+            raise ValueError('Rows without "model" require the --model option.')
+        model, values = default_model, dict(obj)
+    if model is Task:
+        values['assignee_id'] = values.pop('assignee', None)
+        values['parent_task_id'] = values.pop('parent_task', None)
+        # В файле статус строкой, в COPY нужен код колонки
+        values['status'] = status_code(values.get('status'))
+        # Пути пересчитываются после загрузки, в COPY колонки должны быть заполнены
+        values['path'], values['depth'] = '', 0
+    return model, values
+
+
+class Importer:
+    def __init__(self, batch_size=5000, use_copy=None):
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.batches = {Employee: [], Task: []}
+        self.counts = {Employee: 0, Task: 0}
+        # Ссылки на родителей храним компактно: два массива int64 вместо списка кортежей
+        self.link_ids = array('q')
+        self.link_parents = array('q')
+        # Сотрудники, нагрузку которых нужно пересчитать: загруженные и исполнители загруженных задач
+        self.employee_ids = set()
+
+    def run(self, objects, default_model=None):
+        with transaction.atomic():
+            for obj in objects:
+                model, values = normalize(obj, default_model)
+                if model is Employee:
+                    self.employee_ids.add(int(values['id']))
+                elif values.get('assignee_id') is not None:
+                    self.employee_ids.add(int(values['assignee_id']))
+                if model is Task and values.get('parent_task_id') is not None:
+                    self.link_ids.append(int(values['id']))
+                    self.link_parents.append(int(values['parent_task_id']))
+                self.batches[model].append(values)
+                if len(self.batches[model]) >= self.batch_size:
+                    self._flush(model)
+            self._flush(Employee)
+            self._flush(Task)
+            self._link_parents()
+            self._reset_sequences()
+            broken = fill_empty_paths(Task)
+            if broken:
+                ids = ', '.join(str(task_id) for task_id in sorted(broken)[:20])
+                raise ValueError(f'parent_task links of {len(broken)} tasks form a cycle or point to a task '
+                                 f'without a path: {ids}')
+            employee_ids = sorted(self.employee_ids)
+            for start in range(0, len(employee_ids), self.batch_size):
+                EmployeeWorkload.refresh_for(employee_ids[start:start + self.batch_size])
+            invalidate_all()
+            schedule_refresh()
+        return self.counts
+
+    def _flush(self, model):
+        rows = self.batches[model]
+        if not rows:
+            return
+        fields = IMPORT_FIELDS[model]
+        if self.use_copy:
+            self._copy(model._meta.db_table, fields, ([row.get(field) for field in fields] for row in rows))
+        else:
+            model.objects.bulk_create([model(**{field: row.get(field) for field in fields}) for row in rows],
+                                      batch_size=self.batch_size)
+        self.counts[model] += len(rows)
+        self.batches[model] = []
+
+    def _copy(self, table, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['\\N' if value is None else value for value in row])
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(table)} ({', '.join(quote(column) for column in columns)}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+
+    def _link_parents(self):
+        # Второй проход: parent_task проставляется, когда все задачи уже в базе
+        if not self.link_ids:
+            return
+        if self.use_copy:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'CREATE TEMPORARY TABLE import_task_parent (id bigint, parent_id bigint) ON COMMIT DROP'
+                )
+            self._copy('import_task_parent', ['id', 'parent_id'], zip(self.link_ids, self.link_parents))
+            table = connection.ops.quote_name(Task._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} t SET parent_task_id = l.parent_id FROM import_task_parent l WHERE t.id = l.id'
+                )
+            return
+        for start in range(0, len(self.link_ids), self.batch_size):
+            tasks = [
+                Task(id=task_id, parent_task_id=parent_id)
+                for task_id, parent_id in zip(self.link_ids[start:start + self.batch_size],
+                                              self.link_parents[start:start + self.batch_size])
+            ]
+            Task.objects.bulk_update(tasks, ['parent_task'], batch_size=self.batch_size)
+
+    def _reset_sequences(self):
+        # Id взяты из файла, поэтому последовательности нужно передвинуть за максимальный id
+        statements = connection.ops.sequence_reset_sql(no_style(), [Employee, Task])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
@@ -0,0 +1,34 @@
+import json
+from collections import Counter
+
+from django.core.management import BaseCommand
+
+from task_tracker.bulk import BATCH_SIZE, auto_assign
+
+
+class Command(BaseCommand):
+    help = ('Распределяет незавершённые задачи без исполнителя по сотрудникам с учётом текущей нагрузки. '
+            'С --dry-run только выводит план.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Не записывать назначения')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--output', help='Файл для плана назначений в NDJSON ({"task": id, "assignee": id})')
+
+    def handle(self, *args, **options):
+        assignments = auto_assign(dry_run=options['dry_run'], batch_size=options['batch_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                for task_id, employee_id in assignments.items():
+                    output.write(json.dumps({'task': task_id, 'assignee': employee_id}) + '\n')
+        elif options['verbosity'] > 1:
+            for task_id, employee_id in assignments.items():
+                self.stdout.write(f"{task_id} -> {employee_id}")
+
+        for employee_id, count in sorted(Counter(assignments.values()).items()):
+            self.stdout.write(f"Employee {employee_id}: {count} tasks")
+        verb = 'Would assign' if options['dry_run'] else 'Assigned'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(assignments)} tasks to {len(set(assignments.values()))} employees."
+        ))
@@ -0,0 +1,59 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from task_tracker.api_benchmark import compare, run_suite
+
+
+class Command(BaseCommand):
+    help = ('Замеряет все эндпоинты task_tracker внутри процесса на текущей базе (данные — seed_data): '
+            'задержки p50/p95/p99, SQL-запросы и память на запрос. С --baseline сравнивает с прошлым отчётом '
+            'и завершается ошибкой при регрессиях.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Имя URL без пространства имён, например task-list; можно повторять')
+        parser.add_argument('--iterations', type=int, default=50, help='Число замеряемых запросов на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--memory-samples', type=int, default=5, help='Число запросов для замера памяти')
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Не сбрасывать кэш ответов перед запросами')
+        parser.add_argument('--label', default='', help='Метка отчёта, например хеш коммита')
+        parser.add_argument('--output', help='Файл для отчёта в JSON, по умолчанию stdout')
+        parser.add_argument('--baseline', help='Отчёт, с которым сравнивать результаты')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Допустимый относительный рост задержки p95 и памяти')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_suite(options['endpoints'], options['iterations'], options['warmup'],
+                               options['memory_samples'], not options['warm_cache'], options['label'],
+                               log=self.stderr.write)
+        except ValueError as e:
+            raise CommandError(e)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if not options['baseline']:
+            return
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)
+        if (baseline['employees'], baseline['tasks']) != (report['employees'], report['tasks']):
+            self.stderr.write(self.style.WARNING(
+                f"Baseline was measured on {baseline['employees']} employees and {baseline['tasks']} tasks, "
+                f"current run on {report['employees']} and {report['tasks']}."
+            ))
+        regressions = compare(baseline, report, options['threshold'])
+        for regression in regressions:
+            self.stderr.write(self.style.ERROR(
+                f"{regression['endpoint']}: {regression['metric']} "
+                f"{regression['baseline']} -> {regression['current']}"
+            ))
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+        self.stderr.write(self.style.SUCCESS('No regressions.'))
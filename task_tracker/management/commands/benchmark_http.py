@@ -0,0 +1,37 @@
+import json
+
+from django.core.management import BaseCommand
+
+from task_tracker.benchmark import run_http_load
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест запущенного сервера: запросы в секунду и задержки p50/p90/p99 для каждого URL. '
+            'Например, сравнение WSGI и ASGI: gunicorn config.wsgi и uvicorn config.asgi:application '
+            'с одинаковым числом воркеров, URL /tasks/ и /async/tasks/.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Полные URL, например http://127.0.0.1:8000/async/tasks/')
+        parser.add_argument('--concurrency', type=int, default=500, help='Число одновременных соединений')
+        parser.add_argument('--requests', type=int, default=10000, help='Число запросов на каждый URL')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--label', default='', help='Метка прогона в результатах, например wsgi или asgi')
+        parser.add_argument('--output', help='Файл для результатов в JSON, по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        results = []
+        for url in options['urls']:
+            result = run_http_load(url, options['concurrency'], options['requests'], options['timeout'])
+            result['label'] = options['label']
+            results.append(result)
+            self.stderr.write(
+                f"{url}: {result['requests_per_s']} req/s, p50 {result['p50_ms']} ms, "
+                f"p99 {result['p99_ms']} ms, errors {result['errors']}"
+            )
+
+        report = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
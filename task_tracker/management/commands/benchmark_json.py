@@ -0,0 +1,35 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from task_tracker.api_benchmark import benchmark_json_rendering, benchmark_list_serializers
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время рендеринга списка задач (формат /tasks/) JSONRenderer из DRF и кодировщиками '
+            'FastJSONRenderer, а также пропускную способность списков задач и сотрудников row-сериализаторов '
+            'и сериализаторов DRF на данных текущей базы (seed_data). Завершается ошибкой, если row-сериализаторы '
+            'быстрее DRF меньше чем в --min-speedup раз.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=50000, help='Число задач в списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Число повторов, берётся лучшее время')
+        parser.add_argument('--page-size', type=int, default=1000,
+                            help='Число строк на странице для сравнения сериализаторов')
+        parser.add_argument('--min-speedup', type=float, default=5.0,
+                            help='Минимальное ускорение row-сериализаторов относительно DRF')
+
+    def handle(self, *args, **options):
+        report = benchmark_json_rendering(options['tasks'], options['repeat'])
+        for name, result in report['renderers'].items():
+            self.stderr.write(f"{name}: {result['ms']} ms, {result['bytes']} bytes, x{result['speedup']}")
+        report['serializers'] = benchmark_list_serializers(options['page_size'], options['repeat'])
+        for name, result in report['serializers'].items():
+            self.stderr.write(f"{name}: DRF {result['drf']['rows_per_sec']} rows/sec, row serializer "
+                              f"{result['rows_serializer']['rows_per_sec']} rows/sec, x{result['speedup']}")
+        self.stdout.write(json.dumps(report, indent=2))
+
+        slow = [name for name, result in report['serializers'].items() if result['speedup'] < options['min_speedup']]
+        if slow:
+            raise CommandError(f"Row serializers are less than {options['min_speedup']}x faster than DRF "
+                               f"for: {', '.join(slow)}")
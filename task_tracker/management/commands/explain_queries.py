@@ -0,0 +1,44 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from task_tracker.explain import PRODUCTION_TASKS, explain_hot_queries
+from task_tracker.models import Task
+
+
+class Command(BaseCommand):
+    help = ('Выводит планы горячих запросов (task_tracker.explain.HOT_QUERIES) на текущей базе '
+            'и завершается ошибкой, если какой-либо из них читает таблицу полным просмотром. '
+            'Проверка объёма данных: seed_data --tasks 1000000, затем explain_queries --no-force.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Обновить статистику планировщика (ANALYZE)')
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--force-index', action='store_true',
+                          help='Запретить полный просмотр в PostgreSQL (enable_seqscan = off): '
+                               'проверяет только наличие индексов')
+        mode.add_argument('--no-force', action='store_true',
+                          help='Проверка на засеянной базе: без подсказок планировщику, с ANALYZE '
+                               'и не меньше --min-tasks задач')
+        parser.add_argument('--min-tasks', type=int, default=PRODUCTION_TASKS,
+                            help='Минимальное число задач для --no-force')
+
+    def handle(self, *args, **options):
+        if options['no_force']:
+            # На маленькой таблице полный просмотр дешевле индекса, и отсутствие Seq Scan ничего не доказывает
+            count = Task.objects.count()
+            if count < options['min_tasks']:
+                raise CommandError(f"--no-force needs at least {options['min_tasks']} tasks, found {count}: "
+                                   f"run seed_data --tasks {options['min_tasks']} first")
+        if options['analyze'] or options['no_force']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        failed = []
+        for name, (plan, scans) in explain_hot_queries(options['force_index']).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if scans:
+                failed.append(name)
+        if failed:
+            raise CommandError(f"Full table scans in: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('All hot queries use indexes.'))
@@ -0,0 +1,45 @@
+from django.core.management import BaseCommand, CommandError
+
+from task_tracker.export import EXPORT_FORMATS, EMPLOYEE_EXPORT_FIELDS, TASK_EXPORT_FIELDS, DEFAULT_CHUNK_SIZE, \
+    get_employee_export_queryset, iter_export
+from task_tracker.filters import TaskFilter
+from task_tracker.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка задач или сотрудников в NDJSON/CSV. Фильтры задач: --filter status="In Progress".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['tasks', 'employees'])
+        parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='Файл для записи, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--filter', action='append', default=[], metavar='FIELD=VALUE',
+                            help='Фильтр задач, как в параметрах /tasks/')
+
+    def handle(self, *args, **options):
+        if options['model'] == 'tasks':
+            queryset, fields = self._get_task_queryset(options['filter']), TASK_EXPORT_FIELDS
+        else:
+            queryset, fields = get_employee_export_queryset(), EMPLOYEE_EXPORT_FIELDS
+
+        lines = iter_export(queryset, fields, options['export_format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            self.stdout.ending = ''
+            for line in lines:
+                self.stdout.write(line)
+
+    def _get_task_queryset(self, filters):
+        params = {}
+        for item in filters:
+            field, separator, value = item.partition('=')
+            if not separator:
+                raise CommandError(f"Фильтр должен иметь вид FIELD=VALUE: {item}")
+            params[field] = value
+        filterset = TaskFilter(params, queryset=Task.objects.order_by('id'))
+        if not filterset.is_valid():
+            raise CommandError(f"Некорректные фильтры: {dict(filterset.errors)}")
+        return filterset.qs
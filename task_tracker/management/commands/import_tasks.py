@@ -0,0 +1,40 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from task_tracker.importer import Importer, iter_json_objects
+from task_tracker.models import Employee, Task
+
+
+class Command(BaseCommand):
+    help = ('Потоковый импорт сотрудников и задач из JSON-фикстуры или NDJSON. '
+            'На PostgreSQL строки загружаются через COPY.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Файлы в порядке загрузки (например, yourdata.json t.json)')
+        parser.add_argument('--model', choices=['tasks', 'employees'],
+                            help='Модель для строк без поля "model" (формат export_data)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-copy', action='store_true', help='Не использовать COPY даже на PostgreSQL')
+
+    def handle(self, *args, **options):
+        default_model = {'tasks': Task, 'employees': Employee}.get(options['model'])
+        importer = Importer(batch_size=options['batch_size'], use_copy=False if options['no_copy'] else None)
+
+        def objects():
+            for path in options['paths']:
+                with open(path, encoding='utf-8') as stream:
+                    yield from iter_json_objects(stream)
+
+        started = time.monotonic()
+        try:
+            counts = importer.run(objects(), default_model)
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts[Employee]} employees and {counts[Task]} tasks "
+            f"in {elapsed:.2f}s ({total / elapsed:.0f} rows/sec)."
+        ))
@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+
+from task_tracker.models import DeletionLog
+from task_tracker.sync import get_tombstone_horizon
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из журнала удалений записи старше срока хранения (TASK_TRACKER_SYNC_TOMBSTONE_DAYS).'
+
+    def handle(self, *args, **options):
+        count = DeletionLog.prune(get_tombstone_horizon())
+        self.stdout.write(self.style.SUCCESS(f"Pruned {count} deletion log entries."))
@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from task_tracker.cache import invalidate_all
+from task_tracker.hierarchy import rebuild_task_paths
+from task_tracker.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает материализованные пути (Task.path, Task.depth) и разрывает циклы parent_task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count, broken = rebuild_task_paths(Task, batch_size=options['batch_size'])
+        invalidate_all()
+        if broken:
+            self.stdout.write(self.style.WARNING(
+                f"Cycles broken, parent_task reset for tasks: {', '.join(map(str, broken))}"))
+        self.stdout.write(self.style.SUCCESS(f"Paths rebuilt for {count} tasks."))
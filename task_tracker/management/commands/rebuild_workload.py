@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from task_tracker.cache import invalidate_all
+from task_tracker.models import EmployeeWorkload
+from task_tracker.snapshots import schedule_refresh
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицу нагрузки сотрудников (EmployeeWorkload) по текущим задачам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = EmployeeWorkload.rebuild(batch_size=options['batch_size'])
+        invalidate_all()
+        schedule_refresh()
+        self.stdout.write(self.style.SUCCESS(f"Workload rebuilt for {count} employees."))
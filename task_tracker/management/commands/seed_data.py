@@ -0,0 +1,25 @@
+from django.core.management import BaseCommand
+
+from task_tracker.cache import invalidate_all
+from task_tracker.datagen import seed
+from task_tracker.snapshots import schedule_refresh
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими сотрудниками и задачами (иерархия подзадач, смесь статусов) '
+            'для проверки планов запросов и нагрузочных замеров.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help='Начальное значение генератора для воспроизводимых данных')
+
+    def handle(self, *args, **options):
+        first, last = seed(options['employees'], options['tasks'], batch_size=options['batch_size'],
+                           random_seed=options['seed'])
+        invalidate_all()
+        schedule_refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['employees']} employees and {options['tasks']} tasks (ids {first}-{last})."
+        ))
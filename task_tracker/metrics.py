@@ -0,0 +1,273 @@
+"""
+Метрики в текстовом формате Prometheus: задержка и количество HTTP-запросов, число SQL-запросов и время
+в базе, время сериализации ответа — с меткой view (имя URL, например task_tracker:task-list).
+
+Значения копятся в памяти процесса. При нескольких воркерах gunicorn задаётся TASK_TRACKER_METRICS_DIR:
+каждый процесс не чаще раза в FLUSH_INTERVAL секунд записывает свои значения в <pid>.json этого каталога
+(атомарной заменой файла), а /metrics суммирует файлы всех процессов. Файлы завершившихся воркеров
+остаются, поэтому счётчики не уменьшаются; процесс, получивший pid прежнего воркера, продолжает его значения.
+"""
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from .profiling import request_profile
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 1.0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.registry.lock:
+            values = self.registry.values.setdefault(self.name, {})
+            values[key] = values.get(key, 0) + amount
+
+    def merge(self, total, values):
+        for key, value in values.items():
+            total[key] = total.get(key, 0) + value
+
+    def samples(self, values):
+        for key, value in sorted(values.items()):
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Histogram(Counter):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.registry.lock:
+            values = self.registry.values.setdefault(self.name, {})
+            # Счётчики по корзинам (не накопительные), затем сумма и количество наблюдений
+            state = values.get(key)
+            if state is None:
+                state = values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def merge(self, total, values):
+        for key, state in values.items():
+            current = total.get(key)
+            total[key] = list(state) if current is None else [a + b for a, b in zip(current, state)]
+
+    def samples(self, values):
+        for key, state in sorted(values.items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f'{self.name}_bucket', labels + (('le', repr(bound)),), cumulative
+            yield f'{self.name}_bucket', labels + (('le', '+Inf'),), state[-1]
+            yield f'{self.name}_sum', labels, state[-2]
+            yield f'{self.name}_count', labels, state[-1]
+
+
+class MetricsRegistry:
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.metrics = {}
+        self.flushed_at = 0.0
+        self._reset()
+        # Воркер gunicorn начинает с собственных значений, а не с копии значений мастера
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        # Файл с тем же pid остался от завершившегося процесса: продолжаем его значения
+        self.values = self._read(self._path(self.pid)) if self.directory else {}
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.metrics.setdefault(name, Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(self, name, documentation, labelnames, buckets))
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    @staticmethod
+    def _encode(values):
+        return {name: [[list(key), state] for key, state in samples.items()] for name, samples in values.items()}
+
+    @staticmethod
+    def _decode(data):
+        return {name: {tuple(key): state for key, state in samples} for name, samples in data.items()}
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                return self._decode(json.load(file))
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed_at < FLUSH_INTERVAL:
+            return
+        with self.lock:
+            data = json.dumps(self._encode(self.values))
+            self.flushed_at = now
+        path = self._path(self.pid)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Значения всех процессов (или только текущего без каталога): {имя метрики: {метки: значение}}."""
+        if not self.directory:
+            with self.lock:
+                return self._decode(self._encode(self.values))
+        self.flush(force=True)
+        total = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            for name, values in self._read(os.path.join(self.directory, filename)).items():
+                if name in self.metrics:
+                    self.metrics[name].merge(total.setdefault(name, {}), values)
+        return total
+
+    def render(self):
+        values = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for sample, labels, value in metric.samples(values.get(name, {})):
+                lines.append(f'{sample}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry(getattr(settings, 'TASK_TRACKER_METRICS_DIR', None))
+
+REQUESTS = REGISTRY.counter('task_tracker_http_requests_total', 'HTTP requests.', ['view', 'method', 'status'])
+REQUEST_DURATION = REGISTRY.histogram('task_tracker_http_request_duration_seconds', 'HTTP request latency.',
+                                      ['view', 'method'])
+DB_QUERIES = REGISTRY.counter('task_tracker_db_queries_total', 'SQL queries executed.', ['view'])
+DB_DURATION = REGISTRY.counter('task_tracker_db_query_duration_seconds_total', 'Time spent in SQL queries.',
+                               ['view'])
+SERIALIZER_DURATION = REGISTRY.histogram('task_tracker_serializer_duration_seconds',
+                                         'Time spent building response data in serializers.', ['view'])
+
+
+def metrics_enabled():
+    return getattr(settings, 'TASK_TRACKER_METRICS_ENABLED', True)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+def time_serializer(serializer, request):
+    """
+    Учитывает время to_representation сериализатора верхнего уровня. Метод подменяется у экземпляра,
+    поэтому вложенные сериализаторы и сериализаторы вне представлений не затрагиваются.
+    """
+    if not metrics_enabled():
+        return serializer
+    to_representation = serializer.to_representation
+
+    @wraps(to_representation)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return to_representation(*args, **kwargs)
+        finally:
+            SERIALIZER_DURATION.observe(time.perf_counter() - start, view=view_label(request))
+
+    serializer.to_representation = timed
+    return serializer
+
+
+class SerializerTimingMixin:
+    """Для GenericAPIView: сериализаторы из get_serializer попадают в task_tracker_serializer_duration_seconds."""
+
+    def get_serializer(self, *args, **kwargs):
+        return time_serializer(super().get_serializer(*args, **kwargs), self.request)
+
+
+class MetricsMiddleware:
+    """Включается настройкой TASK_TRACKER_METRICS_ENABLED; ставится после QueryProfilingMiddleware."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with request_profile() as profile:
+            response = self.get_response(request)
+        self.record(request, response, profile, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with request_profile() as profile:
+            response = await self.get_response(request)
+        self.record(request, response, profile, start)
+        return response
+
+    def record(self, request, response, profile, start):
+        view = view_label(request)
+        REQUEST_DURATION.observe(time.perf_counter() - start, view=view, method=request.method)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        DB_QUERIES.inc(profile.count, view=view)
+        DB_DURATION.inc(profile.duration, view=view)
+        REGISTRY.flush()
+
+
+def metrics_view(request):
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
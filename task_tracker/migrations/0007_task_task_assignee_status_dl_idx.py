@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_tracker', '0006_alter_employee_full_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status', 'deadline'], name='task_assignee_status_dl_idx'),
+        ),
+    ]
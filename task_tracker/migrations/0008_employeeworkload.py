@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Q
+
+
+def fill_workload(apps, schema_editor):
+    Employee = apps.get_model('task_tracker', 'Employee')
+    EmployeeWorkload = apps.get_model('task_tracker', 'EmployeeWorkload')
+    active = Q(task__status__in=['New Task', 'In Progress'])
+    employees = Employee.objects.annotate(
+        active_count=Count('task', filter=active),
+        earliest_active_deadline=Min('task__deadline', filter=active),
+        total_count=Count('task'),
+    )
+    EmployeeWorkload.objects.bulk_create([
+        EmployeeWorkload(
+            employee_id=employee.id,
+            active_count=employee.active_count,
+            earliest_active_deadline=employee.earliest_active_deadline,
+            total_count=employee.total_count,
+        )
+        for employee in employees.iterator(chunk_size=1000)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_tracker', '0007_task_task_assignee_status_dl_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeWorkload',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='workload', serialize=False, to='task_tracker.employee')),
+                ('active_count', models.PositiveIntegerField(default=0)),
+                ('earliest_active_deadline', models.DateField(blank=True, null=True)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-active_count', 'earliest_active_deadline'], name='workload_active_idx')],
+            },
+        ),
+        migrations.RunPython(fill_workload, migrations.RunPython.noop),
+    ]
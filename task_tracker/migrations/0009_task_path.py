@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+from task_tracker.hierarchy import rebuild_task_paths
+
+
+def fill_task_paths(apps, schema_editor):
+    rebuild_task_paths(apps.get_model('task_tracker', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_tracker', '0008_employeeworkload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.RunPython(fill_task_paths, migrations.RunPython.noop),
+    ]
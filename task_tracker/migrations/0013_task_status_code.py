@@ -0,0 +1,87 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+import task_tracker.statuses
+from task_tracker.statuses import STATUS_CODES, TaskStatus
+
+
+def fill_status_codes(apps, schema_editor):
+    Task = apps.get_model('task_tracker', 'Task')
+    for status, code in STATUS_CODES.items():
+        Task.objects.filter(status=status).update(status_code=code)
+    # Строки с неизвестным статусом (CharField его не ограничивал) считаем новыми задачами
+    Task.objects.filter(status_code__isnull=True).update(status_code=STATUS_CODES[TaskStatus.NEW])
+
+
+def fill_status_labels(apps, schema_editor):
+    Task = apps.get_model('task_tracker', 'Task')
+    for status, code in STATUS_CODES.items():
+        Task.objects.filter(status_code=code).update(status=status.value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_tracker', '0012_task_partial_covering_indexes'),
+    ]
+
+    operations = [
+        # Индексы со статусом пересоздаются по новой колонке
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_workload_cover_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_active_assignee_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_in_progress_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # Старая колонка временно допускает NULL, чтобы миграция откатывалась на заполненной таблице
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('New Task', 'New Task'), ('Not Started', 'Not Started'),
+                                            ('In Progress', 'In Progress'), ('Completed', 'Completed')],
+                                   max_length=50, null=True),
+        ),
+        migrations.RunPython(fill_status_codes, fill_status_labels),
+        migrations.RemoveField(
+            model_name='task',
+            name='status',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='status_code',
+            new_name='status',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=task_tracker.statuses.StatusField(choices=[('New Task', 'New Task'), ('Not Started', 'Not Started'),
+                                                             ('In Progress', 'In Progress'),
+                                                             ('Completed', 'Completed')]),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status', 'deadline', 'id'], name='task_workload_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['New Task', 'In Progress'])),
+                               fields=['assignee', 'deadline'], name='task_active_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'In Progress')), fields=['id'],
+                               name='task_in_progress_idx'),
+        ),
+    ]
@@ -1,42 +1,270 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Min, Q, Value
+from django.db.models.functions import Concat, Substr
 from prompt_toolkit.validation import ValidationError
 
+from .hierarchy import build_path, path_contains, path_depth, path_to_ids
+from .statuses import ACTIVE_STATUSES, StatusField, TaskStatus
+
 
 class Employee(models.Model):
     full_name = models.CharField(max_length=100)
     position = models.CharField(max_length=100)
     additional_info = models.TextField(blank=True, null=True, default='')
     created_at = models.DateTimeField(auto_now_add=True, null=True)
-    updated_at = models.DateTimeField(auto_now=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return self.full_name
 
 
 class Task(models.Model):
-    STATUS_CHOICES = [
-        ('New Task', 'New Task'),
-        ('Not Started', 'Not Started'),
-        ('In Progress', 'In Progress'),
-        ('Completed', 'Completed'),
-    ]
+    # Ограничение глубины обхода дерева подзадач, если глубина не указана явно
+    MAX_TREE_DEPTH = 50
+
+    STATUS_CHOICES = TaskStatus.choices
 
     name = models.CharField(max_length=200)
     parent_task = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='sub_tasks')
     assignee = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True)
     deadline = models.DateField()
-    status = models.CharField(max_length=50, choices=STATUS_CHOICES)
+    status = StatusField()
     additional_info = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
-    updated_at = models.DateTimeField(auto_now=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
+    # Материализованный путь "/<id корня>/.../<id задачи>/" и глубина, поддерживаются в save/delete
+    path = models.CharField(max_length=1000, db_index=True, blank=True, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Агрегат нагрузки (EmployeeWorkload._aggregate): в PostgreSQL выполняется только по индексу
+            models.Index(fields=['assignee', 'status', 'deadline', 'id'], name='task_workload_cover_idx'),
+            # Активные задачи сотрудника (сериализаторы сотрудников, предзагрузка в списке сотрудников)
+            models.Index(fields=['assignee', 'deadline'], condition=Q(status__in=ACTIVE_STATUSES),
+                         name='task_active_assignee_idx'),
+            # Задачи без исполнителя: список важных задач и auto_assign
+            models.Index(fields=['deadline'], condition=Q(assignee__isnull=True), name='task_unassigned_idx'),
+            # Родители в работе для списка важных задач
+            models.Index(fields=['id'], condition=Q(status=TaskStatus.IN_PROGRESS), name='task_in_progress_idx'),
+            models.Index(fields=['deadline'], name='task_deadline_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении понять, изменилась ли нагрузка сотрудников
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _get_workload_employee_ids(self):
+        # Сотрудники, чья нагрузка могла измениться: прежний и текущий исполнитель
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return {self.assignee_id} - {None}
+        if all(loaded.get(field, object()) == value for field, value in (
+                ('assignee_id', self.assignee_id), ('status', self.status), ('deadline', self.deadline))):
+            return set()
+        return {self.assignee_id, loaded.get('assignee_id')} - {None}
+
+    @classmethod
+    def get_subtree(cls, root_id, max_depth=None):
+        """
+        Возвращает задачу root_id и всех её потомков одним рекурсивным запросом (WITH RECURSIVE
+        поддерживается и PostgreSQL, и SQLite). У каждой задачи есть атрибут depth, корень имеет depth=0.
+        """
+        if max_depth is None or max_depth > cls.MAX_TREE_DEPTH:
+            max_depth = cls.MAX_TREE_DEPTH
+        table = connection.ops.quote_name(cls._meta.db_table)
+        # Условие t.id <> корень не даёт зациклиться, если задача указана родителем самой себе
+        query = f'''
+            WITH RECURSIVE subtree (id, depth) AS (
+                SELECT id, 0 FROM {table} WHERE id = %s
+                UNION ALL
+                SELECT t.id, s.depth + 1 FROM {table} t JOIN subtree s ON t.parent_task_id = s.id
+                WHERE s.depth < %s AND t.id <> %s
+            )
+            SELECT t.*, s.depth AS subtree_depth FROM {table} t JOIN subtree s ON t.id = s.id
+            ORDER BY s.depth, t.id
+        '''
+        return cls.objects.raw(query, [root_id, max_depth, root_id])
+
+    def get_ancestors(self):
+        # Предки от корня к родителю одним запросом по id из материализованного пути
+        return Task.objects.filter(id__in=path_to_ids(self.path)[:-1]).order_by('depth')
+
+    def get_descendants(self):
+        # Все потомки одним запросом по префиксу пути (индекс path)
+        return Task.objects.filter(path__startswith=self.path).exclude(pk=self.pk)
+
+    def is_descendant_of(self, task):
+        return self.pk != task.pk and path_contains(self.path, task.pk)
+
+    def _parent_changed(self):
+        loaded = getattr(self, '_loaded_values', None)
+        return loaded is None or loaded.get('parent_task_id', object()) != self.parent_task_id
+
+    def _update_path(self):
+        """Перестраивает путь задачи и, при переносе, всех её потомков двумя UPDATE."""
+        old_path, old_depth = self.path, self.depth
+        new_path = build_path(self.parent_task.path if self.parent_task_id else None, self.pk)
+        if new_path == old_path:
+            return
+        new_depth = path_depth(new_path)
+        Task.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        if old_path:
+            Task.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (new_depth - old_depth),
+            )
+        self.path, self.depth = new_path, new_depth
+
     def clean(self):
+        if self.parent_task_id and self.pk and (
+                self.parent_task_id == self.pk or path_contains(self.parent_task.path, self.pk)):
+            raise ValidationError('Task cannot be its own ancestor.')
         if self.parent_task and self.deadline > self.parent_task.deadline:
             raise ValidationError('Task deadline cannot be earlier than parent task deadline.')
 
     def save(self, *args, **kwargs):
         self.clean()
-        super(Task, self).save(*args, **kwargs)
+        employee_ids = self._get_workload_employee_ids()
+        parent_changed = self._parent_changed()
+        with transaction.atomic():
+            super(Task, self).save(*args, **kwargs)
+            if parent_changed or not self.path:
+                self._update_path()
+            EmployeeWorkload.refresh_for(employee_ids)
+        self._loaded_values = {
+            'assignee_id': self.assignee_id,
+            'status': self.status,
+            'deadline': self.deadline,
+            'parent_task_id': self.parent_task_id,
+        }
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            # Подзадачи становятся корнями (parent_task SET_NULL), поэтому отрезаем префикс пути
+            if self.path:
+                Task.objects.filter(path__startswith=self.path).exclude(pk=self.pk).update(
+                    path=Concat(Value('/'), Substr('path', len(self.path) + 1)),
+                    depth=F('depth') - (self.depth + 1),
+                )
+            result = super(Task, self).delete(*args, **kwargs)
+            EmployeeWorkload.refresh_for({self.assignee_id} - {None})
+        return result
+
+
+class EmployeeWorkload(models.Model):
+    """
+    Денормализованная нагрузка сотрудника. Обновляется в Task.save/Task.delete,
+    полностью пересчитывается командой rebuild_workload (например, после loaddata или QuerySet.update).
+    """
+    ACTIVE_STATUSES = ACTIVE_STATUSES
+
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name='workload')
+    active_count = models.PositiveIntegerField(default=0)
+    earliest_active_deadline = models.DateField(null=True, blank=True)
+    total_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-active_count', 'earliest_active_deadline'], name='workload_active_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.employee_id}: {self.active_count}/{self.total_count}'
+
+    @classmethod
+    def _aggregate(cls, tasks):
+        # Нагрузка по исполнителям одним агрегирующим запросом по индексу (assignee, status, deadline)
+        active = Q(status__in=cls.ACTIVE_STATUSES)
+        return tasks.values('assignee').annotate(
+            active_count=Count('id', filter=active),
+            earliest_active_deadline=Min('deadline', filter=active),
+            total_count=Count('id'),
+        ).order_by()
+
+    @classmethod
+    def _from_row(cls, employee_id, row):
+        return cls(
+            employee_id=employee_id,
+            active_count=row.get('active_count', 0),
+            earliest_active_deadline=row.get('earliest_active_deadline'),
+            total_count=row.get('total_count', 0),
+        )
+
+    @classmethod
+    def refresh_for(cls, employee_ids):
+        """Пересчитывает нагрузку указанных сотрудников. Должен вызываться внутри транзакции."""
+        if not employee_ids:
+            return
+        # Блокируем сотрудников, чтобы параллельные записи задач пересчитывали нагрузку последовательно
+        locked_ids = list(
+            Employee.objects.select_for_update(no_key=True).filter(id__in=employee_ids)
+            .order_by('id').values_list('id', flat=True)
+        )
+        rows = {row['assignee']: row for row in cls._aggregate(Task.objects.filter(assignee_id__in=locked_ids))}
+        # Один upsert на все затронутые записи
+        cls.objects.bulk_create(
+            [cls._from_row(employee_id, rows.get(employee_id, {})) for employee_id in locked_ids],
+            update_conflicts=True,
+            unique_fields=['employee'],
+            update_fields=['active_count', 'earliest_active_deadline', 'total_count', 'updated_at'],
+        )
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """Полностью пересобирает таблицу нагрузки из задач. Возвращает количество записей."""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            rows = {row['assignee']: row for row in cls._aggregate(Task.objects.filter(assignee__isnull=False))}
+            workloads = [
+                cls._from_row(employee_id, rows.get(employee_id, {}))
+                for employee_id in Employee.objects.values_list('id', flat=True).iterator(chunk_size=batch_size)
+            ]
+            cls.objects.bulk_create(workloads, batch_size=batch_size)
+        return len(workloads)
+
+
+class DeletionLog(models.Model):
+    """
+    Журнал удалений (tombstones) для дельта-синхронизации: клиент, запросивший изменения
+    после момента since, получает id удалённых с тех пор задач и сотрудников. Пишется в сигналах post_delete
+    и в bulk_delete_tasks, старые записи удаляются командой prune_deletion_log.
+    """
+    MODEL_CHOICES = [
+        ('task', 'Task'),
+        ('employee', 'Employee'),
+    ]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.model}:{self.object_id}'
+
+    @classmethod
+    def prune(cls, before):
+        """Удаляет записи старше before. Возвращает количество удалённых записей."""
+        deleted, _ = cls.objects.filter(deleted_at__lt=before).delete()
+        return deleted
+
+
+class Snapshot(models.Model):
+    """
+    Предвычисленные ответы тяжёлых списков (рейтинг занятых сотрудников, важные задачи).
+    Пересчитываются задачами Celery по расписанию и с задержкой после записей, см. snapshots.py.
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,136 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) пагинация: следующая страница выбирается условием по ключу сортировки
+    последней строки, а не OFFSET, поэтому глубокие страницы отдаются так же быстро, как первая.
+    Ключ сортировки должен быть уникальным и не содержать NULL, поэтому последним полем всегда идёт id.
+    """
+    orderings = {'id': ('id',)}
+    default_ordering = 'id'
+    ordering_query_param = 'ordering'
+    cursor_query_param = 'cursor'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Вариант для асинхронных представлений: страница читается через async-итерацию QuerySet
+        return self.set_page([obj async for obj in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        key = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        if key not in self.orderings:
+            # Как и неизвестный фильтр, неизвестная сортировка — ошибка запроса, а не тихий откат к id
+            raise ValidationError({self.ordering_query_param: [
+                f"Сортировка по {key} невозможна. Доступные варианты сортировки: {', '.join(self.orderings)}"
+            ]})
+        return self.orderings[key]
+
+    def get_position_filter(self, position):
+        # (a, b) > (x, y)  ->  a > x OR (a = x AND b > y)
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            equal = {name: value for name, value in zip(self.ordering[:index], position[:index])}
+            conditions.append(Q(**equal, **{f'{field}__gt': position[index]}))
+        return reduce(or_, conditions)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self._to_json(getattr(last, field)) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    def encode_cursor(self, position):
+        raw = json.dumps({'o': list(self.ordering), 'p': position}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if cursor['o'] != list(self.ordering) or len(cursor['p']) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, cursor['p'])
+            ]
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _to_json(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class EmployeeKeysetPagination(KeysetPagination):
+    orderings = {'id': ('id',)}
+
+
+class TaskKeysetPagination(KeysetPagination):
+    orderings = {
+        'id': ('id',),
+        'deadline': ('deadline', 'id'),
+    }
@@ -0,0 +1,176 @@
+"""
+Профилирование SQL по HTTP-запросам: количество запросов, время в базе, повторяющиеся запросы
+(одинаковый SQL без учёта параметров) и место в коде task_tracker, откуда они выполнены
+(например, serializers.py:EmployeeSerializer._get_active_tasks). Итоги отдаются в заголовках
+Server-Timing, X-DB-Queries и X-DB-Duplicate-Queries, медленные запросы пишутся в лог одной JSON-строкой.
+
+Обёртка выполнения ставится на каждое соединение один раз (сигнал connection_created) и пишет в профиль
+текущего запроса из ContextVar, поэтому учитываются и запросы из sync_to_async в асинхронных представлениях.
+Без активного профиля обёртка только читает ContextVar. Запросы, выполненные во время отдачи потокового
+ответа (SSE, выгрузки), в заголовки не попадают: они уже отправлены.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('task_tracker.profiling')
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# Списки IN (%s, %s, ...) разной длины дают один отпечаток
+IN_LIST_PATTERN = re.compile(r'\((?:%s, )+%s\)')
+# Сколько повторяющихся запросов попадает в лог медленного запроса
+LOGGED_DUPLICATES = 5
+
+_current_profile = ContextVar('task_tracker_query_profile', default=None)
+
+
+def fingerprint(sql):
+    return IN_LIST_PATTERN.sub('(%s, ...)', sql)
+
+
+def query_origin(frame):
+    """Ближайшая к запросу функция task_tracker в стеке вызовов: "serializers.py:Class.method"."""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(PACKAGE_DIR) and code.co_filename != __file__:
+            return f'{code.co_filename[len(PACKAGE_DIR):]}:{code.co_qualname}'
+        frame = frame.f_back
+    return None
+
+
+class QueryProfile:
+    __slots__ = ('count', 'duration', 'fingerprints', 'origins')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.origins = {}
+
+    def record(self, sql, duration, origin=None):
+        key = fingerprint(sql)
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[key] += 1
+        if origin is not None:
+            self.origins.setdefault(key, Counter())[origin] += 1
+
+    @property
+    def duplicate_count(self):
+        # Лишние выполнения: каждый отпечаток сверх первого раза
+        return sum(count - 1 for count in self.fingerprints.values())
+
+    def duplicates(self, limit=None):
+        return [
+            {'sql': sql, 'count': count, 'origins': dict(self.origins.get(sql, {}))}
+            for sql, count in self.fingerprints.most_common(limit) if count > 1
+        ]
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record(sql, time.perf_counter() - start, query_origin(sys._getframe(1)))
+
+
+@receiver(connection_created)
+def install_execute_wrapper(sender, connection, **kwargs):
+    # Сигнал приходит при каждом переподключении, а список обёрток живёт в объекте соединения
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@contextmanager
+def profile_queries():
+    """Собирает запросы блока в QueryProfile (для тестов и замеров вне HTTP)."""
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def request_profile():
+    """Профиль текущего HTTP-запроса: уже собираемый внешним middleware или новый."""
+    profile = _current_profile.get()
+    if profile is not None:
+        yield profile
+        return
+    with profile_queries() as profile:
+        yield profile
+
+
+class QueryProfilingMiddleware:
+    """
+    Включается настройкой TASK_TRACKER_SQL_PROFILING. Должен стоять первым в MIDDLEWARE,
+    чтобы учитывать запросы всех остальных middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TASK_TRACKER_SQL_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'TASK_TRACKER_SQL_PROFILING_SLOW_MS', 500)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with request_profile() as profile:
+            response = self.get_response(request)
+        return self.process_profile(request, response, profile, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with request_profile() as profile:
+            response = await self.get_response(request)
+        return self.process_profile(request, response, profile, start)
+
+    def process_profile(self, request, response, profile, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = profile.duration * 1000
+        timing = f'db;dur={db_ms:.1f};desc="{profile.count} queries", app;dur={total_ms:.1f}'
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+        response['X-DB-Queries'] = str(profile.count)
+        response['X-DB-Duplicate-Queries'] = str(profile.duplicate_count)
+
+        if total_ms >= self.slow_ms:
+            match = request.resolver_match
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'duration_ms': round(total_ms, 1),
+                'db_ms': round(db_ms, 1),
+                'queries': profile.count,
+                'duplicate_queries': profile.duplicate_count,
+                'duplicates': profile.duplicates(LOGGED_DUPLICATES),
+            }))
+        return response
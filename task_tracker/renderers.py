@@ -0,0 +1,96 @@
+"""
+JSON-рендерер ответов API с выбором кодировщика: orjson, если он установлен, иначе stdlib json
+(настройка TASK_TRACKER_JSON_BACKEND: auto, orjson или json). Ответ совпадает с JSONRenderer из DRF:
+компактные разделители, UTF-8 без \\u-экранирования, экранированные U+2028/U+2029, даты и время в ISO 8601
+с Z для UTC. orjson пишет результат сразу в bytes и кодирует даты сам; для stdlib строковое представление
+даты берётся из кеша — в списках задач одни и те же сроки повторяются тысячи раз.
+
+Расхождения orjson с DRF: NaN и Infinity кодируются как null, а не вызывают ошибку, и показатель степени
+у float пишется без знака (1e16 вместо 1e+16).
+"""
+import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATE_CACHE_SIZE = 4096
+
+# Для значений, которые orjson не кодирует сам (Decimal, ленивые строки, QuerySet и т. п.)
+_fallback_encoder = JSONEncoder()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def encode_date(value):
+    return value.isoformat()
+
+
+class CachedDateJSONEncoder(JSONEncoder):
+    """Кодировщик DRF с быстрым путём для дат (кеш) и времени (без цепочки isinstance)."""
+
+    def default(self, obj):
+        obj_type = type(obj)
+        if obj_type is datetime.date:
+            return encode_date(obj)
+        if obj_type is datetime.datetime:
+            representation = obj.isoformat()
+            return representation[:-6] + 'Z' if representation.endswith('+00:00') else representation
+        return super().default(obj)
+
+
+_stdlib_encoder = CachedDateJSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def dumps_json(data):
+    return (_stdlib_encoder.encode(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+            .encode())
+
+
+def dumps_orjson(data):
+    content = orjson.dumps(data, default=_fallback_encoder.default,
+                           option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    # \u2028 и \u2029 (в UTF-8 начинаются с E2 80) допустимы в JSON, но не в строковых литералах старого
+    # JavaScript. Один просмотр ответа по общему префиксу, замена — только если он встретился
+    if b'\xe2\x80' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return content
+
+
+JSON_BACKENDS = {
+    'json': dumps_json,
+    'orjson': dumps_orjson,
+}
+
+
+def get_json_backend(name=None):
+    name = name or getattr(settings, 'TASK_TRACKER_JSON_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'json' if orjson is None else 'orjson'
+    if name == 'orjson' and orjson is None:
+        raise ImproperlyConfigured('TASK_TRACKER_JSON_BACKEND = "orjson" requires the orjson package.')
+    try:
+        return JSON_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f'Unknown TASK_TRACKER_JSON_BACKEND: {name!r}.') from None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer с кодировщиком из get_json_backend. Форматированный вывод (indent, browsable API)
+    и отличные от умолчаний UNICODE_JSON/COMPACT_JSON/STRICT_JSON отдаются обычному JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return get_json_backend()(data)
@@ -0,0 +1,112 @@
+"""
+Сериализация списков задач и сотрудников только для чтения: строки ответа собираются прямо из кортежей
+values_list, без экземпляров моделей, полей DRF и SerializerMethodField. Результат совпадает с
+TaskSerializer/EmployeeSerializer до байта в JSON (проверяется тестами), поэтому при изменении полей
+этих сериализаторов row-сериализаторы меняются вместе с ними.
+
+Связанные задачи (подзадачи, активные задачи сотрудника) читаются одним запросом на страницу, как при
+prefetch_related, и упорядочены по id.
+"""
+from rest_framework.response import Response
+
+from .metrics import time_serializer
+from .models import Task
+from .statuses import ACTIVE_STATUSES
+
+
+class RowSerializer:
+    """Принимает строки из get_rows; data строится в to_representation, как у сериализаторов DRF."""
+    columns = ()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_rows(cls, queryset):
+        # Связанные строки читает сам сериализатор; named=True нужен keyset-пагинации (getattr по ключу сортировки)
+        return queryset.prefetch_related(None).values_list(*cls.columns, named=True)
+
+    @property
+    def data(self):
+        return self.to_representation(self.rows)
+
+    def to_representation(self, rows):
+        raise NotImplementedError
+
+
+class TaskRowSerializer(RowSerializer):
+    """Формат TaskSerializer, подзадачи — в формате TaskSummarySerializer."""
+    columns = ('id', 'name', 'parent_task_id', 'assignee_id', 'deadline', 'status')
+
+    def get_sub_tasks(self, rows):
+        parents = {task_id: {'id': task_id, 'name': name, 'deadline': deadline}
+                   for task_id, name, _, _, deadline, _ in rows}
+        sub_tasks = {}
+        if not parents:
+            return sub_tasks
+        queryset = (Task.objects.filter(parent_task_id__in=list(parents)).order_by('id')
+                    .values_list('parent_task_id', 'id', 'name', 'deadline', 'status'))
+        for parent_id, task_id, name, deadline, status in queryset:
+            sub_tasks.setdefault(parent_id, []).append({
+                'id': task_id, 'name': name, 'deadline': deadline.isoformat(), 'status': status,
+                'parent_task': parents[parent_id],
+            })
+        return sub_tasks
+
+    def to_representation(self, rows):
+        sub_tasks = self.get_sub_tasks(rows)
+        return [
+            {
+                'id': task_id, 'name': name, 'parent_task': parent_id, 'assignee': assignee_id,
+                'deadline': deadline.isoformat(), 'status': status, 'sub_tasks': sub_tasks.get(task_id, []),
+            }
+            for task_id, name, parent_id, assignee_id, deadline, status in rows
+        ]
+
+
+class EmployeeRowSerializer(RowSerializer):
+    """Формат EmployeeSerializer: активные задачи с родительской задачей, как TaskSummarySerializer."""
+    columns = ('id', 'full_name', 'position')
+    task_columns = ('assignee_id', 'id', 'name', 'deadline', 'status',
+                    'parent_task_id', 'parent_task__name', 'parent_task__deadline')
+
+    def get_active_tasks(self, rows):
+        tasks = {}
+        if not rows:
+            return tasks
+        queryset = (Task.objects.filter(status__in=ACTIVE_STATUSES, assignee_id__in=[row[0] for row in rows])
+                    .order_by('id').values_list(*self.task_columns))
+        for assignee_id, task_id, name, deadline, status, parent_id, parent_name, parent_deadline in queryset:
+            tasks.setdefault(assignee_id, []).append({
+                'id': task_id, 'name': name, 'deadline': deadline.isoformat(), 'status': status,
+                'parent_task': None if parent_id is None else
+                {'id': parent_id, 'name': parent_name, 'deadline': parent_deadline},
+            })
+        return tasks
+
+    def to_representation(self, rows):
+        active_tasks = self.get_active_tasks(rows)
+        data = []
+        for employee_id, full_name, position in rows:
+            tasks = active_tasks.get(employee_id, [])
+            data.append({'id': employee_id, 'full_name': full_name, 'position': position,
+                         'active_task_count': len(tasks), 'tasks': tasks})
+        return data
+
+
+class RowListMixin:
+    """
+    Для ListAPIView: list отдаёт данные через row_serializer_class, serializer_class остаётся
+    для схемы API и остальных методов. Ставится перед ListAPIView, после миксинов кеша и ETag.
+    """
+    row_serializer_class = None
+
+    def get_row_serializer(self, rows):
+        return time_serializer(self.row_serializer_class(rows), self.request)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.row_serializer_class.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_row_serializer(page).data)
+        return Response(self.get_row_serializer(list(rows)).data)
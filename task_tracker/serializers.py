@@ -1,25 +1,33 @@
 import re
 
-from django.db.models import Count, Min, Q
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import SerializerMethodField
 from rest_framework.serializers import ModelSerializer
 
+from .assignment import AssignmentEngine, task_related_assignees
 from .models import Employee, Task
+from .statuses import ACTIVE_STATUSES, OPEN_STATUSES, TaskStatus
 
 
 class EmployeeSerializer(ModelSerializer):
     active_task_count = SerializerMethodField()
     tasks = SerializerMethodField()
 
+    def _get_active_tasks(self, employee):
+        # Используем задачи, предзагруженные во view через Prefetch, чтобы не делать запрос на каждого сотрудника
+        if hasattr(employee, 'active_tasks'):
+            return employee.active_tasks
+        return list(Task.objects.filter(
+            assignee=employee, status__in=ACTIVE_STATUSES
+        ).select_related('parent_task'))
+
     def get_tasks(self, employee):
-        tasks = Task.objects.filter(assignee=employee, status__in=['New Task', 'In Progress'])
-        return TaskSummarySerializer(tasks, many=True).data
+        return TaskSummarySerializer(self._get_active_tasks(employee), many=True).data
 
     def get_active_task_count(self, employee):
-        return Task.objects.filter(assignee=employee, status__in=['New Task', 'In Progress']).count()
+        return len(self._get_active_tasks(employee))
 
     def validate_full_name(self, value):
         if not re.match(r'^[A-Za-z\s]+$', value):
@@ -57,27 +65,44 @@ class BusyEmployeeSerializer(ModelSerializer):
     tasks = SerializerMethodField()
     active_task_count = SerializerMethodField()
 
+    def _get_all_tasks(self, employee):
+        # Используем задачи, предзагруженные во view через Prefetch, чтобы не делать запрос на каждого сотрудника
+        if hasattr(employee, 'all_tasks'):
+            return employee.all_tasks
+        return list(Task.objects.filter(assignee=employee).select_related('parent_task'))
+
     def get_tasks(self, employee):
         # Возвращаем все задачи, назначенные сотруднику
-        tasks = Task.objects.filter(assignee=employee)
-        return TaskSummarySerializer(tasks, many=True).data
+        return TaskSummarySerializer(self._get_all_tasks(employee), many=True).data
 
     def get_active_task_count(self, employee):
-        # Считаем только задачи со статусом 'New Task' и 'In Progress'
-        return Task.objects.filter(assignee=employee, status__in=['New Task', 'In Progress', 'Not Started']).count()
+        # Считаем в памяти только незавершённые задачи
+        return sum(
+            1 for task in self._get_all_tasks(employee)
+            if task.status in OPEN_STATUSES
+        )
 
     class Meta:
         model = Employee
         fields = ['id', 'full_name', 'position', 'active_task_count', 'tasks']
 
 
+class BusyEmployeeRankingSerializer(ModelSerializer):
+    # Значения берутся из аннотаций BusyEmployeesListAPIView.get_queryset, без дополнительных запросов
+    active_task_count = serializers.IntegerField(read_only=True)
+    earliest_deadline = serializers.DateField(read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ['id', 'full_name', 'position', 'active_task_count', 'earliest_deadline']
+
+
 class TaskSerializer(ModelSerializer):
     sub_tasks = SerializerMethodField()
 
     def get_sub_tasks(self, task):
-        if task.sub_tasks.exists():
-            return TaskSummarySerializer(task.sub_tasks.all(), many=True).data
-        return []
+        # sub_tasks.all() берёт данные из кэша prefetch_related, если view его подготовила
+        return TaskSummarySerializer(task.sub_tasks.all(), many=True).data
 
     def validate_deadline(self, value):
         if value < timezone.now().date():
@@ -88,13 +113,55 @@ class TaskSerializer(ModelSerializer):
         model = Task
         fields = ['id', 'name', 'parent_task', 'assignee', 'deadline', 'status', 'sub_tasks']
 
-    # Проверяет, что статус задачи является одним из допустимых значений ('Not Started', 'In Progress', 'Completed').
+    # Проверяет, что статус задачи является одним из значений TaskStatus.
     def validate(self, data):
-        if data['status'] not in ['New Task', 'In Progress', 'Not Started', 'Completed']:
+        if data['status'] not in TaskStatus.values:
             raise serializers.ValidationError("Invalid status.")
+        # Проверка на цикл по материализованному пути родителя, без обхода цепочки предков
+        parent_task = data.get('parent_task')
+        if self.instance and parent_task and (
+                parent_task.pk == self.instance.pk or parent_task.is_descendant_of(self.instance)):
+            raise serializers.ValidationError("Task cannot be its own ancestor.")
         return data
 
 
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    Элемент массовой операции. Связи передаются как id и проверяются для всей пачки сразу
+    в task_tracker.bulk, а не отдельным запросом на каждый элемент.
+    """
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=200)
+    parent_task = serializers.IntegerField(source='parent_task_id', required=False, allow_null=True)
+    assignee = serializers.IntegerField(source='assignee_id', required=False, allow_null=True)
+    deadline = serializers.DateField()
+    status = serializers.ChoiceField(choices=TaskStatus.choices)
+    additional_info = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+    def validate_deadline(self, value):
+        if value < timezone.now().date():
+            raise serializers.ValidationError("Deadline cannot be in the past.")
+        return value
+
+
+class AssigneeSuggestionRequestSerializer(serializers.Serializer):
+    tasks = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    limit = serializers.IntegerField(default=3, min_value=1, max_value=20)
+
+
+class AutoAssignRequestSerializer(serializers.Serializer):
+    dry_run = serializers.BooleanField(default=False)
+
+
+class TaskTreeNodeSerializer(ModelSerializer):
+    # Глубина относительно корня поддерева приходит из рекурсивного запроса Task.get_subtree
+    depth = serializers.IntegerField(source='subtree_depth', read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'parent_task', 'assignee', 'deadline', 'status', 'depth']
+
+
 class PotentialEmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
@@ -103,23 +170,22 @@ class PotentialEmployeeSerializer(serializers.ModelSerializer):
 
 class TaskWithPotentialEmployeesSerializer(serializers.ModelSerializer):
     potential_employees = serializers.SerializerMethodField()
+    # Сколько кандидатов предлагать на задачу
+    potential_employees_limit = 5
 
-    def get_potential_employees(self, task):
-        # Получение всех сотрудников с количеством задач
-        employees = Employee.objects.annotate(
-            task_count=Count('task', filter=Q(task__status__in=['New Task', 'In Progress']))
-        )
-
-        # Находим минимальное количество задач у сотрудников
-        min_task_count = employees.aggregate(min_task_count=Min('task_count'))['min_task_count']
+    def _get_engine(self):
+        # Движок подбора приходит из контекста view; если его нет, создаём один раз и кешируем в контексте
+        engine = self.context.get('assignment_engine')
+        if engine is None:
+            engine = AssignmentEngine.from_db()
+            self.context['assignment_engine'] = engine
+        return engine
 
-        # Получаем сотрудников, которые могут взять задачу
-        suitable_employees = employees.filter(
-            Q(task_count__lte=min_task_count + 2) |
-            Q(id__in=task.sub_tasks.values('assignee'))
-        )
-
-        return PotentialEmployeeSerializer(suitable_employees, many=True).data
+    def get_potential_employees(self, task):
+        # Исполнители подзадач и соседних задач берутся из sub_tasks и parent_task, предзагруженных во view
+        candidates = self._get_engine().potential_employees(
+            self.potential_employees_limit, task_related_assignees(task))
+        return PotentialEmployeeSerializer(candidates, many=True).data
 
     class Meta:
         model = Task
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import events, snapshots
+from .cache import LISTS_SCOPE, employee_scope, invalidate, task_scope
+from .models import DeletionLog, Employee, Task
+
+_in_batch = ContextVar('task_tracker_in_batch', default=False)
+
+
+@contextmanager
+def batch_operation():
+    """
+    Обработчики ниже пропускают сигналы по строкам внутри блока: массовая операция (bulk.py) сама
+    обновляет кеш, журнал удалений, события и снимки один раз на пачку.
+    """
+    token = _in_batch.set(True)
+    try:
+        yield
+    finally:
+        _in_batch.reset(token)
+
+
+def per_row(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _in_batch.get():
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+@receiver(post_save, sender=Task)
+@per_row
+def invalidate_task_cache(sender, instance, **kwargs):
+    # Прежние значения берутся из Task._loaded_values: они обновляются только после post_save
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    scopes = [LISTS_SCOPE, task_scope(instance.pk)]
+    for parent_id in {instance.parent_task_id, loaded.get('parent_task_id')} - {None}:
+        scopes.append(task_scope(parent_id))
+    for employee_id in {instance.assignee_id, loaded.get('assignee_id')} - {None}:
+        scopes.append(employee_scope(employee_id))
+    # Название и срок задачи показываются у исполнителей её подзадач
+    if not kwargs.get('created'):
+        for employee_id in set(instance.sub_tasks.exclude(assignee=None).values_list('assignee_id', flat=True)):
+            scopes.append(employee_scope(employee_id))
+    invalidate(*scopes)
+
+
+@receiver(pre_delete, sender=Task)
+@per_row
+def invalidate_deleted_task_cache(sender, instance, **kwargs):
+    # У подзадач родитель будет сброшен в NULL без сигналов, поэтому сбрасываем их кеш заранее
+    sub_tasks = list(instance.sub_tasks.values_list('id', 'assignee_id'))
+    # Сдвигаем updated_at подзадач, чтобы изменились их ETag
+    instance.sub_tasks.update(updated_at=timezone.now())
+    scopes = [task_scope(task_id) for task_id, _ in sub_tasks]
+    scopes += [employee_scope(employee_id) for _, employee_id in sub_tasks if employee_id is not None]
+    invalidate(*scopes)
+
+
+@receiver(post_delete, sender=Task)
+@per_row
+def invalidate_task_cache_after_delete(sender, instance, **kwargs):
+    scopes = [LISTS_SCOPE, task_scope(instance.pk)]
+    if instance.parent_task_id is not None:
+        scopes.append(task_scope(instance.parent_task_id))
+    if instance.assignee_id is not None:
+        scopes.append(employee_scope(instance.assignee_id))
+    invalidate(*scopes)
+
+
+@receiver(post_save, sender=Employee)
+@per_row
+def invalidate_employee_cache(sender, instance, **kwargs):
+    invalidate(LISTS_SCOPE, employee_scope(instance.pk))
+
+
+@receiver(pre_delete, sender=Employee)
+@per_row
+def invalidate_deleted_employee_cache(sender, instance, **kwargs):
+    # Исполнитель задач будет сброшен в NULL без сигналов
+    task_ids = list(Task.objects.filter(assignee=instance).values_list('id', flat=True))
+    Task.objects.filter(id__in=task_ids).update(updated_at=timezone.now())
+    invalidate(LISTS_SCOPE, employee_scope(instance.pk), *(task_scope(task_id) for task_id in task_ids))
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Employee)
+@per_row
+def record_deletion(sender, instance, **kwargs):
+    # Tombstone для дельта-синхронизации клиентов
+    DeletionLog.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_save, sender=Task)
+@per_row
+def publish_task_saved(sender, instance, created, **kwargs):
+    events.publish(events.build_task_events(instance, getattr(instance, '_loaded_values', None), created))
+
+
+@receiver(post_delete, sender=Task)
+@per_row
+def publish_task_deleted(sender, instance, **kwargs):
+    events.publish([events.build_deleted_event(instance)])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@per_row
+def schedule_snapshot_refresh(sender, **kwargs):
+    snapshots.schedule_refresh()
@@ -0,0 +1,173 @@
+"""
+Снимки тяжёлых списков: рейтинг занятых сотрудников и важные задачи с подходящими исполнителями.
+Данные сериализуются задачей Celery в таблицу Snapshot по расписанию (CELERY_BEAT_SCHEDULE)
+и после записей задач и сотрудников с задержкой TASK_TRACKER_SNAPSHOT_DEBOUNCE: все записи за это
+время дают один пересчёт. Без брокера (CELERY_TASK_ALWAYS_EAGER) задержка не работает, поэтому запись
+только помечает снимки устаревшими, а пересчитывает их первый запрос к снимку не раньше чем через
+TASK_TRACKER_SNAPSHOT_DEBOUNCE секунд после прошлого пересчёта (refresh_if_due). API отдаёт снимок одним
+запросом с заголовком X-Snapshot-Age (возраст в секундах).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Min, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .assignment import AssignmentEngine
+from .cache import LISTS_SCOPE, invalidate
+from .models import Employee, Snapshot, Task
+from .serializers import BusyEmployeeRankingSerializer, TaskWithPotentialEmployeesSerializer
+from .statuses import TaskStatus
+
+BUSY_EMPLOYEES = 'busy_employees'
+IMPORTANT_TASKS = 'important_tasks'
+
+DEBOUNCE_KEY = 'task_tracker:snapshots:scheduled'
+
+
+def busy_employees_queryset():
+    # Нагрузка берётся из материализованной таблицы EmployeeWorkload, без агрегации по всем задачам
+    return Employee.objects.annotate(
+        active_task_count=Coalesce('workload__active_count', 0),
+        earliest_deadline=F('workload__earliest_active_deadline'),
+    ).order_by('-active_task_count', 'earliest_deadline', 'id')
+
+
+def important_tasks_queryset():
+    # Задачи без назначений
+    tasks_without_assignee = Task.objects.filter(
+        assignee__isnull=True
+    )
+
+    # Задачи с родительской задачей в статусе 'In Progress'
+    parent_tasks_in_progress = Task.objects.filter(
+        Q(parent_task__isnull=False) &
+        Q(parent_task__status=TaskStatus.IN_PROGRESS)
+    )
+
+    # Используем Q-объекты для объединения запросов
+    return Task.objects.filter(
+        Q(id__in=tasks_without_assignee.values('id')) |
+        Q(id__in=parent_tasks_in_progress.values('id'))
+    ).distinct().prefetch_related(
+        # Исполнители подзадач и соседних задач всех задач страницы — по запросу на уровень
+        Prefetch('sub_tasks', queryset=Task.objects.only('id', 'parent_task', 'assignee')),
+        Prefetch('parent_task', queryset=Task.objects.only('id')),
+        Prefetch('parent_task__sub_tasks', queryset=Task.objects.only('id', 'parent_task', 'assignee')),
+    )
+
+
+def build_busy_employees():
+    return BusyEmployeeRankingSerializer(busy_employees_queryset(), many=True).data
+
+
+def build_important_tasks():
+    return TaskWithPotentialEmployeesSerializer(
+        important_tasks_queryset(), many=True, context={'assignment_engine': AssignmentEngine.from_db()}
+    ).data
+
+
+SNAPSHOT_BUILDERS = {
+    BUSY_EMPLOYEES: build_busy_employees,
+    IMPORTANT_TASKS: build_important_tasks,
+}
+
+
+def snapshots_enabled():
+    return getattr(settings, 'TASK_TRACKER_SNAPSHOTS_ENABLED', True)
+
+
+def refresh_snapshot(key):
+    snapshot, _ = Snapshot.objects.update_or_create(key=key, defaults={'data': SNAPSHOT_BUILDERS[key]()})
+    # Закешированные ответы и ETag списков вычислены по прежнему снимку
+    invalidate(LISTS_SCOPE)
+    return snapshot
+
+
+def snapshot_debounce():
+    return getattr(settings, 'TASK_TRACKER_SNAPSHOT_DEBOUNCE', 10)
+
+
+def refresh_in_process():
+    # Без брокера задачи Celery выполняются сразу в вызывающем процессе, countdown игнорируется
+    from .tasks import refresh_snapshots
+
+    return refresh_snapshots.app.conf.task_always_eager
+
+
+def get_snapshot(key):
+    # Снимка ещё нет (первый запуск) — считаем его сразу
+    snapshot = Snapshot.objects.filter(key=key).first()
+    return snapshot if snapshot is not None else refresh_snapshot(key)
+
+
+def snapshot_age(snapshot):
+    # Значение заголовка X-Snapshot-Age: сколько секунд назад снимок был пересчитан
+    return str(max(0, int((timezone.now() - snapshot.updated_at).total_seconds())))
+
+
+def schedule_refresh():
+    """Ставит пересчёт снимков после коммита; повторные вызовы до начала пересчёта ничего не делают."""
+    if snapshots_enabled():
+        transaction.on_commit(_enqueue_refresh, robust=True)
+
+
+def _enqueue_refresh():
+    from .tasks import refresh_snapshots
+
+    if refresh_in_process():
+        # Иначе каждый коммит синхронно пересчитывал бы оба снимка; пересчёт сделает refresh_if_due
+        cache.set(DEBOUNCE_KEY, True, timeout=None)
+        return
+    debounce = snapshot_debounce()
+    # Ключ снимает сама задача в начале пересчёта; таймаут — страховка, если задача потерялась
+    if cache.add(DEBOUNCE_KEY, True, timeout=debounce * 2 + 60):
+        refresh_snapshots.apply_async(countdown=debounce)
+
+
+def refresh_all():
+    # Записи после снятия ключа поставят следующий пересчёт, поэтому они не потеряются
+    cache.delete(DEBOUNCE_KEY)
+    for key in SNAPSHOT_BUILDERS:
+        refresh_snapshot(key)
+
+
+def refresh_if_due():
+    """
+    Без брокера: пересчитывает снимки, помеченные устаревшими, если с прошлого пересчёта прошло
+    не меньше TASK_TRACKER_SNAPSHOT_DEBOUNCE секунд. Пока метки нет, стоит одного обращения к кешу.
+    """
+    if not refresh_in_process() or not cache.get(DEBOUNCE_KEY):
+        return
+    refreshed_at = Snapshot.objects.aggregate(oldest=Min('updated_at'))['oldest']
+    if refreshed_at is not None and timezone.now() - refreshed_at < timedelta(seconds=snapshot_debounce()):
+        return
+    # Метку снимает только один из одновременных запросов
+    if cache.delete(DEBOUNCE_KEY):
+        refresh_all()
+
+
+class SnapshotResponseMixin:
+    """Отдаёт список из снимка snapshot_key, если снимки включены (TASK_TRACKER_SNAPSHOTS_ENABLED)."""
+    snapshot_key = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # До проверки ETag, чтобы условный запрос сравнивался уже с пересчитанным снимком
+        if snapshots_enabled():
+            refresh_if_due()
+
+    def list(self, request, *args, **kwargs):
+        if not snapshots_enabled():
+            return super().list(request, *args, **kwargs)
+        snapshot = get_snapshot(self.snapshot_key)
+        response = Response(snapshot.data)
+        response['X-Snapshot-Age'] = snapshot_age(snapshot)
+        return response
+
+    def get_snapshot_etag_querysets(self):
+        return [Snapshot.objects.filter(key=self.snapshot_key)]
@@ -0,0 +1,76 @@
+"""
+Статусы задач. В базе статус хранится кодом smallint (StatusField), в Python, фильтрах, выгрузках и API —
+строковым значением TaskStatus ('In Progress'), поэтому формат запросов и ответов не зависит от хранения.
+"""
+from django.core import exceptions
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class TaskStatus(models.TextChoices):
+    NEW = 'New Task', 'New Task'
+    NOT_STARTED = 'Not Started', 'Not Started'
+    IN_PROGRESS = 'In Progress', 'In Progress'
+    COMPLETED = 'Completed', 'Completed'
+
+
+# Коды в базе. Существующие коды менять нельзя, новый статус получает следующий свободный код
+STATUS_CODES = {
+    TaskStatus.NEW: 1,
+    TaskStatus.NOT_STARTED: 2,
+    TaskStatus.IN_PROGRESS: 3,
+    TaskStatus.COMPLETED: 4,
+}
+STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+
+# Задачи в этих статусах считаются нагрузкой исполнителя
+ACTIVE_STATUSES = [TaskStatus.NEW, TaskStatus.IN_PROGRESS]
+# Незавершённые задачи
+OPEN_STATUSES = [TaskStatus.NEW, TaskStatus.NOT_STARTED, TaskStatus.IN_PROGRESS]
+
+
+def status_code(value):
+    """Код статуса для записи в базу в обход ORM (COPY, многострочные INSERT)."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return STATUS_CODES[value]
+    except KeyError:
+        raise ValueError(f'Unknown task status: {value!r}') from None
+
+
+class StatusField(models.PositiveSmallIntegerField):
+    """
+    Статус задачи: в базе — код из STATUS_CODES, в Python — TaskStatus. Условия по строкам
+    (status='In Progress', status__in=ACTIVE_STATUSES) переводятся в коды в get_prep_value.
+    """
+    description = 'Task status stored as a small integer code'
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', TaskStatus.choices)
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def validators(self):
+        # Проверки диапазона целого числа к строковому значению не относятся
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else STATUS_BY_CODE[value]
+
+    def to_python(self, value):
+        if value is None or isinstance(value, TaskStatus):
+            return value
+        if isinstance(value, int) and value in STATUS_BY_CODE:
+            return STATUS_BY_CODE[value]
+        if value in STATUS_CODES:
+            return TaskStatus(value)
+        raise exceptions.ValidationError(
+            self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value}
+        )
+
+    def get_prep_value(self, value):
+        try:
+            return status_code(value)
+        except ValueError as e:
+            raise ValueError(f"Field '{self.name}' expected a task status but got {value!r}.") from e
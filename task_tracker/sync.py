@@ -0,0 +1,145 @@
+"""
+Дельта-синхронизация клиентов: строки задач и сотрудников, изменённые после момента since
+(по индексу на updated_at), и id удалённых с тех пор объектов из журнала DeletionLog.
+
+Ответ содержит high_water_mark — значение since для следующего запроса. Он отстаёт от текущего времени
+на TASK_TRACKER_SYNC_LAG_SECONDS: строка, записанная транзакцией, которая закоммитится позже, имеет
+updated_at из момента сохранения и иначе могла бы оказаться раньше выданной метки. Строки из окна
+отставания придут повторно, поэтому клиент применяет изменения как upsert, а затем удаления.
+
+Изменения отдаются страницами: задачи, сотрудники и удаления — не больше page_size строк каждого вида
+в порядке (updated_at, id). При has_more следующая страница запрашивается с cursor из ответа; курсор хранит
+позиции всех трёх видов и high_water_mark первой страницы, который клиент берёт после последней страницы.
+Строка, которую обход пропустил (закоммичена после чтения страницы, но с updated_at до позиции курсора),
+сохранена позже этой метки и придёт в следующей синхронизации.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .export import TASK_EXPORT_FIELDS
+from .models import DeletionLog, Employee, Task
+
+SYNC_TASK_FIELDS = TASK_EXPORT_FIELDS
+
+SYNC_EMPLOYEE_FIELDS = {
+    'id': 'id',
+    'full_name': 'full_name',
+    'position': 'position',
+    'additional_info': 'additional_info',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+def get_tombstone_horizon(now=None):
+    # Раньше этого момента журнал удалений может быть уже очищен
+    days = getattr(settings, 'TASK_TRACKER_SYNC_TOMBSTONE_DAYS', 30)
+    return (now or timezone.now()) - datetime.timedelta(days=days)
+
+
+def get_high_water_mark(since, now=None):
+    lag = getattr(settings, 'TASK_TRACKER_SYNC_LAG_SECONDS', 5)
+    return max(since, (now or timezone.now()) - datetime.timedelta(seconds=lag))
+
+
+# Позиции курсора: по одной на каждый вид изменений
+CURSOR_KEYS = ('tasks', 'employees', 'deleted')
+
+
+def get_page_size(requested=None):
+    page_size = getattr(settings, 'TASK_TRACKER_SYNC_PAGE_SIZE', 1000)
+    if requested is None or requested <= 0:
+        return page_size
+    return min(requested, getattr(settings, 'TASK_TRACKER_SYNC_MAX_PAGE_SIZE', 5000))
+
+
+def encode_cursor(since, high_water_mark, positions):
+    raw = json.dumps({
+        's': since.isoformat(),
+        'h': high_water_mark.isoformat(),
+        'p': {key: None if position is None else [position[0].isoformat(), position[1]]
+              for key, position in positions.items()},
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(encoded):
+    """Возвращает (since, high_water_mark, позиции); ValueError, если курсор повреждён."""
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        since, high_water_mark = parse_datetime(cursor['s']), parse_datetime(cursor['h'])
+        positions = {key: None if cursor['p'][key] is None else _parse_position(*cursor['p'][key])
+                     for key in CURSOR_KEYS}
+    except (TypeError, KeyError, AttributeError):
+        # Остальные ошибки разбора (base64, JSON, дата) уже ValueError
+        raise ValueError('Invalid cursor') from None
+    if since is None or high_water_mark is None:
+        raise ValueError('Invalid cursor')
+    return since, high_water_mark, positions
+
+
+def _parse_position(moment, pk):
+    moment = parse_datetime(moment)
+    if moment is None or not isinstance(pk, int):
+        raise ValueError('Invalid cursor')
+    return moment, pk
+
+
+def _page(queryset, time_field, since, position, page_size):
+    # (time, id) > позиции курсора  ->  time > t OR (time = t AND id > i)
+    queryset = queryset.filter(**{f'{time_field}__gt': since})
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, 'id__gt': pk}))
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    rows = list(queryset.order_by(time_field, 'id')[:page_size + 1])
+    return rows[:page_size], len(rows) > page_size
+
+
+def _changed_rows(queryset, fields, since, position, page_size):
+    rows, has_more = _page(queryset.values_list(*fields.values()), 'updated_at', since, position, page_size)
+    header = list(fields)
+    rows = [dict(zip(header, row)) for row in rows]
+    return rows, has_more, (rows[-1]['updated_at'], rows[-1]['id']) if rows else position
+
+
+def _deleted_rows(since, position, page_size):
+    queryset = DeletionLog.objects.values_list('model', 'object_id', 'deleted_at', 'id')
+    rows, has_more = _page(queryset, 'deleted_at', since, position, page_size)
+    deleted = {'tasks': [], 'employees': []}
+    for model, object_id, _, _ in rows:
+        deleted[f'{model}s'].append(object_id)
+    return deleted, has_more, tuple(rows[-1][2:]) if rows else position
+
+
+def get_changes(since, now=None, page_size=None, cursor=None):
+    """
+    Возвращает страницу изменений после since и метку для следующего запроса. cursor — результат
+    decode_cursor для продолжения обхода: since и high_water_mark тогда берутся из него.
+    """
+    page_size = page_size or get_page_size()
+    if cursor is None:
+        high_water_mark, positions = get_high_water_mark(since, now), dict.fromkeys(CURSOR_KEYS)
+    else:
+        since, high_water_mark, positions = cursor
+    tasks, tasks_more, positions['tasks'] = _changed_rows(
+        Task.objects.all(), SYNC_TASK_FIELDS, since, positions['tasks'], page_size)
+    employees, employees_more, positions['employees'] = _changed_rows(
+        Employee.objects.all(), SYNC_EMPLOYEE_FIELDS, since, positions['employees'], page_size)
+    deleted, deleted_more, positions['deleted'] = _deleted_rows(since, positions['deleted'], page_size)
+    has_more = tasks_more or employees_more or deleted_more
+    return {
+        'since': since,
+        'high_water_mark': high_water_mark,
+        'tasks': tasks,
+        'employees': employees,
+        'deleted': deleted,
+        'has_more': has_more,
+        'cursor': encode_cursor(since, high_water_mark, positions) if has_more else None,
+    }
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .snapshots import refresh_all
+
+
+@shared_task
+def refresh_snapshots():
+    """Пересчитывает снимки рейтинга занятых сотрудников и важных задач."""
+    refresh_all()
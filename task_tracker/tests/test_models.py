@@ -1,6 +1,23 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from prompt_toolkit.validation import ValidationError as PromptValidationError
 from django.utils import timezone
 from django.test import TestCase
-from task_tracker.models import Employee, Task
+from task_tracker.datagen import MAX_DEPTH, seed
+from task_tracker.explain import explain, explain_hot_queries, full_scans
+from task_tracker.importer import iter_json_objects
+from task_tracker.models import Employee, Task, EmployeeWorkload
+from task_tracker.statuses import STATUS_CODES, TaskStatus
 
 
 class EmployeeModelTest(TestCase):
@@ -88,3 +105,246 @@ class TaskModelTest(TestCase):
         # Проверяем допустимые значения для статуса
         for status in Task.STATUS_CHOICES:
             self.assertIn(status[0], [choice[0] for choice in Task.STATUS_CHOICES])  # Проверяем наличие статусов
+
+
+class StatusFieldTest(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(name="Task 1", deadline=timezone.now().date(), status='In Progress')
+
+    def test_status_stored_as_code(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT status FROM {Task._meta.db_table} WHERE id = %s', [self.task.pk])
+            self.assertEqual(cursor.fetchone()[0], STATUS_CODES[TaskStatus.IN_PROGRESS])
+
+    def test_string_labels_in_python_and_lookups(self):
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertIs(task.status, TaskStatus.IN_PROGRESS)
+        self.assertEqual(task.status, 'In Progress')
+        self.assertEqual(task.get_status_display(), 'In Progress')
+        self.assertEqual(list(Task.objects.values_list('status', flat=True)), ['In Progress'])
+        self.assertTrue(Task.objects.filter(status__in=['New Task', 'In Progress']).exists())
+        self.assertFalse(Task.objects.filter(status=TaskStatus.COMPLETED).exists())
+
+    def test_invalid_status_rejected(self):
+        with self.assertRaises(ValueError):
+            Task.objects.filter(status='Done').exists()
+        self.task.status = 'Done'
+        with self.assertRaises(DjangoValidationError):
+            self.task.full_clean()
+
+
+class EmployeeWorkloadTest(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name="John Doe", position="Software Engineer")
+        self.other = Employee.objects.create(full_name="Jane Smith", position="Project Manager")
+        self.today = timezone.now().date()
+
+    def test_workload_updated_on_create(self):
+        Task.objects.create(name="Task 1", assignee=self.employee, deadline=self.today + timedelta(days=2),
+                            status='New Task')
+        Task.objects.create(name="Task 2", assignee=self.employee, deadline=self.today + timedelta(days=1),
+                            status='In Progress')
+        Task.objects.create(name="Task 3", assignee=self.employee, deadline=self.today, status='Completed')
+
+        workload = EmployeeWorkload.objects.get(employee=self.employee)
+        self.assertEqual(workload.active_count, 2)
+        self.assertEqual(workload.total_count, 3)
+        self.assertEqual(workload.earliest_active_deadline, self.today + timedelta(days=1))
+
+    def test_workload_updated_on_status_change_and_reassign(self):
+        task = Task.objects.create(name="Task 1", assignee=self.employee, deadline=self.today, status='New Task')
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = 'Completed'
+        task.save()
+        self.assertEqual(self.employee.workload.active_count, 0)
+
+        task.assignee = self.other
+        task.save()
+        self.assertEqual(EmployeeWorkload.objects.get(employee=self.employee).total_count, 0)
+        self.assertEqual(EmployeeWorkload.objects.get(employee=self.other).total_count, 1)
+
+    def test_unchanged_save_skips_refresh(self):
+        task = Task.objects.create(name="Task 1", assignee=self.employee, deadline=self.today, status='New Task')
+        task = Task.objects.get(pk=task.pk)
+        task.name = "Renamed"
+        with CaptureQueriesContext(connection) as context:
+            task.save()
+        self.assertFalse([q for q in context.captured_queries if 'workload' in q['sql']])
+
+    def test_workload_updated_on_delete(self):
+        task = Task.objects.create(name="Task 1", assignee=self.employee, deadline=self.today, status='New Task')
+        task.delete()
+        workload = EmployeeWorkload.objects.get(employee=self.employee)
+        self.assertEqual(workload.active_count, 0)
+        self.assertIsNone(workload.earliest_active_deadline)
+
+    def test_rebuild_workload_command(self):
+        Task.objects.create(name="Task 1", assignee=self.employee, deadline=self.today, status='In Progress')
+        Task.objects.filter(assignee=self.employee).update(status='New Task', assignee=self.other)
+        EmployeeWorkload.objects.all().delete()
+
+        call_command('rebuild_workload', stdout=StringIO())
+
+        self.assertEqual(EmployeeWorkload.objects.count(), 2)
+        self.assertEqual(EmployeeWorkload.objects.get(employee=self.employee).active_count, 0)
+        self.assertEqual(EmployeeWorkload.objects.get(employee=self.other).active_count, 1)
+
+
+class TaskPathTest(TestCase):
+    def setUp(self):
+        self.deadline = timezone.now().date() + timedelta(days=10)
+        self.root = Task.objects.create(name="Root", deadline=self.deadline, status='New Task')
+        self.child = Task.objects.create(name="Child", parent_task=self.root, deadline=self.deadline,
+                                         status='New Task')
+        self.grandchild = Task.objects.create(name="Grandchild", parent_task=self.child, deadline=self.deadline,
+                                              status='New Task')
+
+    def test_path_and_depth_on_create(self):
+        self.assertEqual(self.root.path, f'/{self.root.pk}/')
+        self.assertEqual(self.grandchild.path, f'/{self.root.pk}/{self.child.pk}/{self.grandchild.pk}/')
+        self.assertEqual(self.grandchild.depth, 2)
+
+    def test_ancestors_and_descendants(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.grandchild.get_ancestors()), [self.root, self.child])
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.root.get_descendants()), {self.child, self.grandchild})
+
+    def test_reparent_moves_subtree(self):
+        other = Task.objects.create(name="Other", deadline=self.deadline, status='New Task')
+        self.child.parent_task = other
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f'/{other.pk}/{self.child.pk}/{self.grandchild.pk}/')
+        self.assertEqual(list(self.root.get_descendants()), [])
+
+    def test_cycle_rejected(self):
+        self.root.parent_task = self.grandchild
+        with self.assertRaises(PromptValidationError):
+            self.root.save()
+
+    def test_delete_rebases_sub_tasks(self):
+        self.root.delete()
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f'/{self.child.pk}/{self.grandchild.pk}/')
+        self.assertEqual(self.grandchild.depth, 1)
+
+    def test_rebuild_task_paths_breaks_cycles(self):
+        Task.objects.filter(pk=self.root.pk).update(parent_task=self.root, path='')
+        Task.objects.filter(pk=self.grandchild.pk).update(path='')
+
+        call_command('rebuild_task_paths', stdout=StringIO())
+
+        self.root.refresh_from_db()
+        self.grandchild.refresh_from_db()
+        self.assertIsNone(self.root.parent_task)
+        self.assertEqual(self.grandchild.path, f'/{self.root.pk}/{self.child.pk}/{self.grandchild.pk}/')
+
+
+class ImportTasksCommandTest(TestCase):
+    def test_iter_json_objects_small_chunks(self):
+        stream = StringIO('[\n {"a": 1, "b": "x,]"},\n {"a": [2, 3]}\n]')
+        self.assertEqual(list(iter_json_objects(stream, chunk_size=3)), [{'a': 1, 'b': 'x,]'}, {'a': [2, 3]}])
+        stream = StringIO('{"a": 1}\n{"a": 2}\n')
+        self.assertEqual(list(iter_json_objects(stream, chunk_size=4)), [{'a': 1}, {'a': 2}])
+
+    def test_import_fixture_files(self):
+        output = StringIO()
+        call_command('import_tasks', str(settings.BASE_DIR / 'yourdata.json'), '--batch-size', '2', stdout=output)
+
+        self.assertIn('rows/sec', output.getvalue())
+        self.assertEqual(Employee.objects.count(), 3)
+        self.assertEqual(EmployeeWorkload.objects.count(), 3)
+
+    def test_import_rejects_parent_cycles(self):
+        # Задачи в t.json указаны родителями самих себя: импорт отменяется целиком, ссылки не исправляются
+        with self.assertRaisesMessage(CommandError, 'form a cycle'):
+            call_command('import_tasks', str(settings.BASE_DIR / 'yourdata.json'),
+                         str(settings.BASE_DIR / 't.json'), stdout=StringIO())
+        self.assertEqual(Employee.objects.count(), 0)
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_import_export_rows(self):
+        employee = Employee.objects.create(full_name="John Doe", position="Software Engineer")
+        other = Employee.objects.create(full_name="Jane Roe", position="Software Engineer")
+        existing = Task.objects.create(name='Existing', assignee=other, deadline='2030-03-01', status='New Task')
+        lines = [
+            {'id': 10, 'name': 'Child', 'parent_task': 11, 'assignee': employee.id, 'deadline': '2030-01-01',
+             'status': 'New Task'},
+            {'id': 11, 'name': 'Parent', 'parent_task': existing.id, 'assignee': None, 'deadline': '2030-02-01',
+             'status': 'In Progress'},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            file.write('\n'.join(json.dumps(line) for line in lines))
+        self.addCleanup(os.remove, file.name)
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_tasks', file.name, '--model', 'tasks', stdout=StringIO())
+
+        child = Task.objects.get(pk=10)
+        self.assertEqual(child.parent_task_id, 11)
+        self.assertEqual(child.path, f'/{existing.id}/11/10/')
+        self.assertEqual(child.depth, 2)
+        self.assertEqual(EmployeeWorkload.objects.get(employee=employee).active_count, 1)
+        # Нагрузка пересчитывается только для исполнителей загруженных задач, без пересборки таблицы
+        self.assertFalse(any(query['sql'].startswith('DELETE') for query in context.captured_queries))
+        self.assertEqual(list(EmployeeWorkload.objects.filter(employee=other).values_list('total_count', flat=True)),
+                         [1])
+        self.assertGreater(Task.objects.create(name='New', deadline='2030-01-01', status='New Task').pk, 11)
+
+
+class SeedDataTest(TestCase):
+    def test_seed_builds_consistent_hierarchy(self):
+        first, last = seed(5, 300, batch_size=50, random_seed=1)
+
+        self.assertEqual(Task.objects.count(), 300)
+        self.assertEqual((first, last), (1, 300))
+        for task in Task.objects.select_related('parent_task'):
+            parent = task.parent_task
+            self.assertEqual(task.path, f'{parent.path}{task.pk}/' if parent else f'/{task.pk}/')
+            self.assertLessEqual(task.depth, MAX_DEPTH)
+            if parent:
+                self.assertLessEqual(task.deadline, parent.deadline)
+        self.assertEqual(EmployeeWorkload.objects.count(), 5)
+        # Последовательность id продолжается после заданных явно
+        self.assertGreater(Employee.objects.create(full_name='New', position='Developer').pk, 5)
+
+
+class HotQueryPlansTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(20, 2000, random_seed=1)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_hot_queries_use_indexes(self):
+        # В PostgreSQL на маленьких таблицах полный просмотр дешевле, поэтому проверяем наличие индекса
+        for name, (plan, scans) in explain_hot_queries(force_index=True).items():
+            with self.subTest(query=name):
+                self.assertEqual(scans, [], plan)
+
+    def test_full_scan_detected(self):
+        plan = explain(Task.objects.filter(name='Task 1'))
+        self.assertTrue(full_scans(plan))
+
+    def test_explain_queries_command(self):
+        output = StringIO()
+        call_command('explain_queries', stdout=output)
+        self.assertIn('All hot queries use indexes.', output.getvalue())
+
+    def test_explain_queries_no_force(self):
+        # Без подсказок планировщику проверка требует засеянной базы
+        with self.assertRaisesMessage(CommandError, '--no-force needs at least 1000000 tasks, found 2000'):
+            call_command('explain_queries', '--no-force', stdout=StringIO())
+
+        output = StringIO()
+        call_command('explain_queries', '--no-force', '--min-tasks', '1000', stdout=output)
+        self.assertIn('important_tasks', output.getvalue())
+        self.assertIn('All hot queries use indexes.', output.getvalue())
+
+        queries = {'by_name': lambda p: Task.objects.filter(name='Task 1')}
+        with mock.patch.dict('task_tracker.explain.HOT_QUERIES', queries, clear=True):
+            with self.assertRaisesMessage(CommandError, 'Full table scans in: by_name'):
+                call_command('explain_queries', '--no-force', '--min-tasks', '1000', stdout=StringIO())
@@ -1,11 +1,17 @@
 from django.utils import timezone
 from datetime import timedelta
 from django.test import TestCase
-from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from task_tracker.assignment import AssignmentEngine, Candidate
+from task_tracker.datagen import seed
 from task_tracker.models import Employee, Task
+from task_tracker.row_serializers import EmployeeRowSerializer, TaskRowSerializer
+from task_tracker.views import prefetch_active_tasks
 from task_tracker.serializers import EmployeeSerializer, TaskSerializer, TaskSummarySerializer, \
-    PotentialEmployeeSerializer, TaskWithPotentialEmployeesSerializer, BusyEmployeeSerializer
+    PotentialEmployeeSerializer, TaskWithPotentialEmployeesSerializer, BusyEmployeeSerializer, \
+    BusyEmployeeRankingSerializer
 
 
 class EmployeeSerializerTest(TestCase):
@@ -70,6 +76,19 @@ class TaskSerializerTest(TestCase):
         with self.assertRaises(ValidationError):
             serializer.is_valid(raise_exception=True)
 
+    def test_parent_cycle_validation(self):
+        sub_task = Task.objects.create(name="Sub Task", parent_task=self.task, assignee=self.employee,
+                                       deadline=self.task.deadline, status="New Task")
+        data = {
+            'name': 'Parent Task',
+            'parent_task': sub_task.id,
+            'deadline': timezone.now().date() + timezone.timedelta(days=1),
+            'status': 'New Task'
+        }
+        serializer = TaskSerializer(self.task, data=data)
+        with self.assertRaises(ValidationError):
+            serializer.is_valid(raise_exception=True)
+
     def test_status_validation(self):
         data = {
             'name': 'Task',
@@ -106,6 +125,53 @@ class TaskWithPotentialEmployeesSerializerTest(TestCase):
         data = serializer.data
         self.assertIn('potential_employees', data)  # Проверяем, что поле потенциальных сотрудников присутствует
 
+    def test_overloaded_employee_excluded_unless_sub_task_assignee(self):
+        for i in range(4):
+            Task.objects.create(name=f"Load {i}", assignee=self.employee1, deadline=timezone.now().date(),
+                                status="In Progress")
+        data = TaskWithPotentialEmployeesSerializer(self.task).data
+        self.assertEqual([e['id'] for e in data['potential_employees']], [self.employee2.id])
+
+        Task.objects.create(name="Sub Task", parent_task=self.task, assignee=self.employee1,
+                            deadline=timezone.now().date(), status="Completed")
+        data = TaskWithPotentialEmployeesSerializer(self.task).data
+        # Исполнитель подзадачи предлагается, но после менее загруженного сотрудника
+        self.assertEqual([e['id'] for e in data['potential_employees']], [self.employee2.id, self.employee1.id])
+
+    def test_assignment_engine_from_context(self):
+        other_task = Task.objects.create(name="Other Task", deadline=timezone.now().date(), status="New Task")
+        engine = AssignmentEngine([Candidate(self.employee2.id, 'Bob Johnson')])
+        serializer = TaskWithPotentialEmployeesSerializer([self.task, other_task], many=True,
+                                                          context={'assignment_engine': engine})
+        # Нагрузка передана через контекст, поэтому остаются только запросы подзадач
+        with self.assertNumQueries(2):
+            data = serializer.data
+        self.assertEqual(data[1]['potential_employees'], [{'id': self.employee2.id, 'full_name': 'Bob Johnson'}])
+
+
+class AssignmentEngineTest(TestCase):
+
+    def setUp(self):
+        self.today = timezone.now().date()
+
+    def test_deadline_pressure_and_related_bonus(self):
+        engine = AssignmentEngine([
+            Candidate(1, 'Idle'),
+            Candidate(2, 'Due tomorrow', earliest_deadline=self.today + timedelta(days=1)),
+            Candidate(3, 'Busy', active_count=2),
+        ], today=self.today)
+        self.assertEqual([candidate.id for candidate, _ in engine.top_k(3)], [1, 2, 3])
+        # Сотрудник, ведущий подзадачи, поднимается в рейтинге
+        self.assertEqual([candidate.id for candidate, _ in engine.top_k(2, related_ids={3})], [1, 3])
+
+    def test_batch_suggestions_are_balanced(self):
+        engine = AssignmentEngine([Candidate(1, 'A'), Candidate(2, 'B', active_count=1)], today=self.today)
+        tasks = [Task(id=task_id, deadline=self.today + timedelta(days=30)) for task_id in (10, 11, 12)]
+        suggestions = engine.suggest(tasks, k=1)
+        # При равных оценках выбирается меньший id; каждое назначение увеличивает нагрузку
+        self.assertEqual([suggestions[task.id][0][0].id for task in tasks], [1, 1, 2])
+        self.assertEqual(engine.candidates[1].active_count, 2)
+
 
 class BusyEmployeeSerializerTest(TestCase):
 
@@ -143,3 +209,45 @@ class BusyEmployeeSerializerTest(TestCase):
         self.assertEqual(data3['position'], "Tester")
         self.assertEqual(data3['active_task_count'], 0)
         self.assertEqual(len(data3['tasks']), 0)
+
+
+class BusyEmployeeRankingSerializerTest(TestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name="Alice Smith", position="Designer")
+
+    def test_reads_annotations(self):
+        self.employee.active_task_count = 3
+        self.employee.earliest_deadline = timezone.now().date()
+        data = BusyEmployeeRankingSerializer(self.employee).data
+        self.assertEqual(data['active_task_count'], 3)
+        self.assertEqual(data['earliest_deadline'], timezone.now().date().isoformat())
+        self.assertNotIn('tasks', data)
+
+
+class RowSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(10, 500, random_seed=1)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_task_rows_match_task_serializer(self):
+        sub_tasks = Prefetch('sub_tasks', queryset=Task.objects.order_by('id'))
+        tasks = Task.objects.prefetch_related(sub_tasks).order_by('id')
+        rows = list(TaskRowSerializer.get_rows(tasks))
+        self.assertEqual(self.render(TaskRowSerializer(rows).data), self.render(TaskSerializer(tasks, many=True).data))
+
+    def test_employee_rows_match_employee_serializer(self):
+        employees = Employee.objects.prefetch_related(prefetch_active_tasks()).order_by('id')
+        rows = list(EmployeeRowSerializer.get_rows(employees))
+        self.assertEqual(self.render(EmployeeRowSerializer(rows).data),
+                         self.render(EmployeeSerializer(employees, many=True).data))
+
+    def test_related_rows_read_in_one_query(self):
+        rows = list(TaskRowSerializer.get_rows(Task.objects.order_by('id')))
+        with self.assertNumQueries(1):
+            TaskRowSerializer(rows).data
+        with self.assertNumQueries(0):
+            self.assertEqual(TaskRowSerializer([]).data, [])
@@ -1,9 +1,39 @@
-from datetime import date
+import csv
+import io
+import json
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
+from asgiref.sync import async_to_sync, sync_to_async
+from config.celery import app as celery_app
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
-from task_tracker.models import Employee, Task
+from task_tracker.api_benchmark import SKIPPED_ENDPOINTS, compare, endpoint_names, run_suite
+from task_tracker.bulk import auto_assign
+from task_tracker.datagen import seed
+from task_tracker.events import TASK_REASSIGNED, TASK_STATUS_CHANGED, TASK_UPDATED, get_broker
+from task_tracker.metrics import REGISTRY, MetricsRegistry
+from task_tracker.models import DeletionLog, Employee, Snapshot, Task
+from task_tracker.profiling import profile_queries
+from task_tracker.renderers import JSON_BACKENDS, FastJSONRenderer, get_json_backend, orjson
+from task_tracker.serializers import EmployeeSerializer, TaskSerializer
+from task_tracker.snapshots import BUSY_EMPLOYEES, DEBOUNCE_KEY, refresh_all
+from task_tracker.statuses import TaskStatus
+from task_tracker.views import prefetch_active_tasks
 
 
 class EmployeeCreateAPIViewTestCase(APITestCase):
@@ -32,8 +62,9 @@ class EmployeeListAPIViewTestCase(APITestCase):
     def test_list_employees(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['full_name'], 'John Doe')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['full_name'], 'John Doe')
+        self.assertIsNone(response.data['next'])
 
 
 class EmployeeRetrieveAPIViewTestCase(APITestCase):
@@ -132,8 +163,21 @@ class TaskListAPIViewTestCase(APITestCase):
     def test_list_tasks(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Task 1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Task 1')
+
+    def test_unknown_filter_rejected(self):
+        response = self.client.get(self.url, {'color': 'red'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = async_to_sync(self.async_client.get)(reverse('task_tracker:async-task-list'), {'color': 'red'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_format_override_is_not_a_filter(self):
+        response = self.client.get(self.url, {'format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(reverse('task_tracker:task-export'), {'format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
 class TaskRetrieveAPIViewTestCase(APITestCase):
@@ -234,9 +278,846 @@ class TaskFilterAPIViewTestCase(APITestCase):
     def test_filter_tasks_by_status(self):
         response = self.client.get(self.url, {'status': 'In Progress'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Task 2')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Task 2')
+
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResponseCacheTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.task = Task.objects.create(name='Task 1', assignee=self.employee, status='New Task',
+                                        deadline='2030-12-31')
+
+    def test_list_served_from_cache_until_write(self):
+        url = reverse('task_tracker:task-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['name'], 'Task 1')
+
+        Task.objects.create(name='Task 2', status='New Task', deadline='2030-12-31')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_detail_invalidated_precisely(self):
+        task_url = reverse('task_tracker:task-detail', kwargs={'pk': self.task.pk})
+        employee_url = reverse('task_tracker:employee-detail', kwargs={'pk': self.employee.pk})
+        other = Task.objects.create(name='Other', status='New Task', deadline='2030-12-31')
+        other_url = reverse('task_tracker:task-detail', kwargs={'pk': other.pk})
+        for url in (task_url, employee_url, other_url):
+            self.client.get(url)
+
+        self.task.status = 'Completed'
+        self.task.save()
+
+        self.assertEqual(self.client.get(task_url).data['status'], 'Completed')
+        self.assertEqual(self.client.get(employee_url).data['tasks'][0]['status'], 'Completed')
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+    def test_bulk_write_invalidates_everything(self):
+        task_url = reverse('task_tracker:task-detail', kwargs={'pk': self.task.pk})
+        self.client.get(task_url)
+        self.client.patch(reverse('task_tracker:task-bulk'), [{'id': self.task.pk, 'name': 'Renamed'}],
+                          format='json')
+        self.assertEqual(self.client.get(task_url).data['name'], 'Renamed')
+
+
+@override_settings(TASK_TRACKER_CACHE_ENABLED=False)
+class ConditionalGetTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.task = Task.objects.create(name='Task 1', assignee=self.employee, status='New Task',
+                                        deadline='2030-12-31')
+        self.task_url = reverse('task_tracker:task-detail', kwargs={'pk': self.task.pk})
+
+    def test_detail_not_modified_until_write(self):
+        response = self.client.get(self.task_url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('Last-Modified', response)
+
+        # Одна агрегация, без запроса самой задачи и сериализации
+        with self.assertNumQueries(1):
+            response = self.client.get(self.task_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        Task.objects.create(name='Sub', parent_task=self.task, status='New Task', deadline='2030-12-30')
+        response = self.client.get(self.task_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_weak_etag_changes_on_delete(self):
+        url = reverse('task_tracker:task-list')
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        Task.objects.create(name='Task 2', status='New Task', deadline='2030-12-31')
+        etag = self.client.get(url)['ETag']
+        self.task.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_employee_delete_changes_task_etag(self):
+        etag = self.client.get(self.task_url)['ETag']
+        self.employee.delete()
+        response = self.client.get(self.task_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['assignee'])
+
+    @override_settings(TASK_TRACKER_CACHE_ENABLED=True)
+    def test_not_modified_from_cache_without_queries(self):
+        cache.clear()
+        etag = self.client.get(self.task_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.task_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class SyncAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:sync')
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.task = Task.objects.create(name='Task 1', assignee=self.employee, status='New Task',
+                                        deadline='2030-12-31')
+        self.since = timezone.now()
+
+    def sync(self, since):
+        return self.client.get(self.url, {'since': since.isoformat()})
+
+    def test_returns_only_changes_and_tombstones(self):
+        self.assertEqual(self.sync(self.since).data['tasks'], [])
+
+        self.task.name = 'Renamed'
+        self.task.save()
+        removed = Task.objects.create(name='Removed', status='New Task', deadline='2030-12-31')
+        removed_id = removed.pk
+        removed.delete()
+
+        response = self.sync(self.since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['name'] for row in response.data['tasks']], ['Renamed'])
+        self.assertEqual(response.data['employees'], [])
+        self.assertEqual(response.data['deleted'], {'tasks': [removed_id], 'employees': []})
+
+    def test_high_water_mark_lags_behind_now(self):
+        with override_settings(TASK_TRACKER_SYNC_LAG_SECONDS=60):
+            response = self.sync(self.since - timedelta(minutes=5))
+        self.assertLess(response.data['high_water_mark'], timezone.now() - timedelta(seconds=59))
+        self.assertEqual(len(response.data['tasks']), 1)
+
+    def test_employee_delete_reports_task_change(self):
+        employee_id = self.employee.pk
+        self.employee.delete()
+        response = self.sync(self.since)
+        self.assertEqual(response.data['tasks'][0]['assignee'], None)
+        self.assertEqual(response.data['deleted']['employees'], [employee_id])
+
+    def test_invalid_and_expired_since(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.sync(self.since - timedelta(days=365)).status_code, status.HTTP_410_GONE)
+
+    def test_pages_follow_cursor(self):
+        Task.objects.bulk_create([Task(name=f'Task {i}', status='New Task', deadline='2030-12-31')
+                                  for i in range(2, 6)])
+        # Одинаковый updated_at: страницы разделяются по id
+        Task.objects.update(updated_at=timezone.now())
+        removed = Task.objects.create(name='Removed', status='New Task', deadline='2030-12-31')
+        removed_id = removed.pk
+        removed.delete()
+
+        names, deleted, pages = [], [], []
+        params = {'since': (self.since - timedelta(minutes=5)).isoformat(), 'page_size': 2}
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            names += [row['name'] for row in response.data['tasks']]
+            deleted += response.data['deleted']['tasks']
+            self.assertLessEqual(len(response.data['tasks']), 2)
+            if not response.data['has_more']:
+                break
+            params = {'cursor': response.data['cursor'], 'page_size': 2}
+
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[-1]['cursor'])
+        self.assertEqual(sorted(names), ['Task 1', 'Task 2', 'Task 3', 'Task 4', 'Task 5'])
+        self.assertEqual(deleted, [removed_id])
+        self.assertEqual({page['high_water_mark'] for page in pages}, {pages[0]['high_water_mark']})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskEventsTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.other = Employee.objects.create(full_name='Jane Roe', position='Developer')
+        self.task = Task.objects.create(name='Task 1', assignee=self.employee, status='New Task',
+                                        deadline='2030-12-31')
+
+    def _reassign(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = 'In Progress'
+        task.assignee = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+
+    def test_save_publishes_status_and_reassignment(self):
+        async def scenario():
+            async with get_broker().subscribe() as subscription:
+                await sync_to_async(self._reassign)()
+                return [await subscription.get(timeout=1) for _ in range(2)]
+
+        status_event, reassigned_event = async_to_sync(scenario)()
+        self.assertEqual(status_event['type'], TASK_STATUS_CHANGED)
+        self.assertEqual(reassigned_event['type'], TASK_REASSIGNED)
+        self.assertEqual(reassigned_event['task']['assignee'], self.other.pk)
+        self.assertEqual(reassigned_event['previous'], {'status': 'New Task', 'assignee': self.employee.pk})
 
+    async def test_stream_filters_by_assignee(self):
+        response = await self.async_client.get(reverse('task_tracker:task-events'), {'assignee': self.employee.pk})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertIn(b': connected', await anext(stream))
+
+        payload = {'id': 1, 'name': 'Task', 'status': 'New Task', 'parent_task': None}
+        get_broker().publish_many([
+            {'type': TASK_UPDATED, 'task': dict(payload, assignee=self.other.pk)},
+            {'type': TASK_UPDATED, 'task': dict(payload, assignee=self.employee.pk, name='Mine')},
+        ])
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith(b'event: task.updated\n'))
+        self.assertIn(b'"Mine"', chunk)
+        await stream.aclose()
+
+
+class AsyncReadViewsTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.parent = Task.objects.create(name='Parent', assignee=self.employee, status='In Progress',
+                                          deadline='2030-12-31')
+        for i in range(3):
+            Task.objects.create(name=f'Child {i}', parent_task=self.parent, assignee=self.employee,
+                                status='New Task', deadline='2030-12-30')
+
+    def assertSameResponse(self, url_name, async_url_name, kwargs=None, params=None):
+        expected = self.client.get(reverse(f'task_tracker:{url_name}', kwargs=kwargs), params)
+        async_url = reverse(f'task_tracker:{async_url_name}', kwargs=kwargs)
+        actual = async_to_sync(self.async_client.get)(async_url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        # Ссылки next отличаются только префиксом пути
+        self.assertEqual(json.loads(actual.content.replace(b'/async/', b'/')), json.loads(expected.content))
+
+    def test_async_views_match_sync_views(self):
+        self.assertSameResponse('task-list', 'async-task-list', params={'page_size': 2, 'ordering': 'deadline'})
+        self.assertSameResponse('task-list', 'async-task-list', params={'assignee': self.employee.pk})
+        self.assertSameResponse('task-detail', 'async-task-detail', kwargs={'pk': self.parent.pk})
+        self.assertSameResponse('employee-list', 'async-employee-list')
+        self.assertSameResponse('employee-detail', 'async-employee-detail', kwargs={'pk': self.employee.pk})
+        self.assertSameResponse('busy-employees', 'async-busy-employees')
+        self.assertSameResponse('task-detail', 'async-task-detail', kwargs={'pk': 999})
+
+    def test_async_task_list_rejects_unknown_filters(self):
+        response = async_to_sync(self.async_client.get)(reverse('task_tracker:async-task-list'), {'color': 'red'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(TASK_TRACKER_SQL_PROFILING=True, TASK_TRACKER_SQL_PROFILING_SLOW_MS=60000)
+class QueryProfilingMiddlewareTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        Task.objects.create(name='Task 1', assignee=self.employee, status='New Task', deadline='2030-12-31')
+
+    def test_headers(self):
+        url = reverse('task_tracker:employee-detail', kwargs={'pk': self.employee.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response['X-DB-Queries'], str(len(context.captured_queries)))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+        self.assertIn('X-DB-Duplicate-Queries', response)
+
+    def test_async_view_queries_counted(self):
+        response = async_to_sync(self.async_client.get)(reverse('task_tracker:async-employee-list'))
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+
+    def test_duplicates_reported_with_origin(self):
+        # Без предзагрузки EmployeeSerializer читает активные задачи дважды: для tasks и для active_task_count
+        with profile_queries() as profile:
+            EmployeeSerializer(Employee.objects.get(pk=self.employee.pk)).data
+        self.assertEqual(profile.count, 3)
+        self.assertEqual(profile.duplicate_count, 1)
+        [duplicate] = profile.duplicates()
+        self.assertEqual(duplicate['origins'], {'serializers.py:EmployeeSerializer._get_active_tasks': 2})
+
+    @override_settings(TASK_TRACKER_SQL_PROFILING_SLOW_MS=0)
+    def test_slow_request_logged_as_json(self):
+        with self.assertLogs('task_tracker.profiling', 'WARNING') as logs:
+            self.client.get(reverse('task_tracker:employee-list'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'task_tracker:employee-list')
+        self.assertEqual(record['status'], 200)
+        self.assertIn('db_ms', record)
+
+    @override_settings(TASK_TRACKER_SQL_PROFILING=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('task_tracker:employee-list'))
+        self.assertNotIn('X-DB-Queries', response)
+
+
+class MetricsTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        Task.objects.create(name='Task 1', assignee=self.employee, status='New Task', deadline='2030-12-31')
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('task_tracker:employee-list'))
+        response = self.client.get(reverse('task_tracker:metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE task_tracker_http_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'task_tracker_http_requests_total\{view="task_tracker:employee-list",'
+                               r'method="GET",status="200"\} \d+')
+        self.assertIn('task_tracker_http_request_duration_seconds_bucket{view="task_tracker:employee-list",'
+                      'method="GET",le="+Inf"}', body)
+        self.assertRegex(body, r'task_tracker_db_queries_total\{view="task_tracker:employee-list"\} [1-9]')
+        self.assertRegex(body, r'task_tracker_serializer_duration_seconds_count'
+                               r'\{view="task_tracker:employee-list"\} [1-9]')
+
+    def test_workers_aggregated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            workers = [MetricsRegistry(directory) for _ in range(2)]
+            for pid, registry in enumerate(workers, start=1):
+                # Разные pid, как у воркеров gunicorn
+                registry.pid = pid
+                registry.counter('requests_total', 'Requests.', ['view']).inc(pid, view='a')
+                registry.histogram('duration_seconds', 'Duration.', buckets=(0.1, 1.0)).observe(0.75 * pid)
+                registry.flush(force=True)
+            reader = MetricsRegistry(directory)
+            reader.counter('requests_total', 'Requests.', ['view'])
+            reader.histogram('duration_seconds', 'Duration.', buckets=(0.1, 1.0))
+            lines = reader.render().splitlines()
+        self.assertIn('requests_total{view="a"} 3', lines)
+        self.assertIn('duration_seconds_bucket{le="1.0"} 1', lines)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn('duration_seconds_sum 2.25', lines)
+        self.assertIn('duration_seconds_count 2', lines)
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'Requests.', ['view']).inc(view='a"b\\c\nd')
+        self.assertIn('requests_total{view="a\\"b\\\\c\\nd"} 1', registry.render())
+
+    @override_settings(TASK_TRACKER_METRICS_ENABLED=False)
+    def test_disabled(self):
+        before = REGISTRY.collect().get('task_tracker_http_requests_total', {})
+        self.client.get(reverse('task_tracker:employee-list'))
+        self.assertEqual(REGISTRY.collect().get('task_tracker_http_requests_total', {}), before)
+
+
+class ApiBenchmarkTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(5, 200, random_seed=1)
+
+    def test_suite_covers_all_endpoints_without_changes(self):
+        tasks = list(Task.objects.values_list('id', 'name', 'assignee_id', 'status'))
+        report = run_suite(iterations=2, warmup=0, memory_samples=1)
+
+        self.assertEqual(set(report['endpoints']), set(endpoint_names()) - set(SKIPPED_ENDPOINTS))
+        for name, result in report['endpoints'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertIsNotNone(result['p99_ms'], name)
+            self.assertGreaterEqual(result['queries'], 1 if name != 'metrics' else 0, name)
+            self.assertGreater(result['memory_peak_kb'], 0, name)
+        # Пишущие запросы откатываются
+        self.assertEqual(list(Task.objects.values_list('id', 'name', 'assignee_id', 'status')), tasks)
+        self.assertEqual(json.loads(json.dumps(report))['tasks'], 200)
+
+    def test_compare_reports_regressions(self):
+        baseline = run_suite(['task-detail'], iterations=2, warmup=0, memory_samples=1)
+        self.assertEqual(compare(baseline, baseline), [])
+
+        current = json.loads(json.dumps(baseline))
+        result = current['endpoints']['task-detail']
+        result['queries'] += 1
+        result['p95_ms'] = baseline['endpoints']['task-detail']['p95_ms'] * 2 + 10
+        self.assertEqual({regression['metric'] for regression in compare(baseline, current)}, {'queries', 'p95_ms'})
+
+
+class RowSerializerListTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(5, 200, random_seed=1)
+
+    def test_lists_match_model_serializers(self):
+        tasks = Task.objects.prefetch_related(Prefetch('sub_tasks', queryset=Task.objects.order_by('id')))
+        employees = Employee.objects.prefetch_related(prefetch_active_tasks())
+        cases = [
+            ('task_tracker:task-list', TaskSerializer(tasks.order_by('id')[:50], many=True)),
+            ('task_tracker:async-task-list', TaskSerializer(tasks.order_by('id')[:50], many=True)),
+            ('task_tracker:employee-list', EmployeeSerializer(employees.order_by('id'), many=True)),
+            ('task_tracker:async-employee-list', EmployeeSerializer(employees.order_by('id'), many=True)),
+        ]
+        for name, serializer in cases:
+            response = async_to_sync(self.async_client.get)(reverse(name), {'page_size': 50})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+            expected = json.loads(JSONRenderer().render(serializer.data))
+            self.assertEqual(response.json()['results'], expected, name)
+
+    def test_benchmark_compares_serializer_throughput(self):
+        output = io.StringIO()
+        call_command('benchmark_json', '--tasks', '50', '--repeat', '1', '--page-size', '100', '--min-speedup', '1',
+                     stdout=output, stderr=io.StringIO())
+        serializers = json.loads(output.getvalue())['serializers']
+        self.assertEqual(serializers['tasks']['rows'], 100)
+        self.assertEqual(serializers['employees']['rows'], 5)
+        for name, result in serializers.items():
+            self.assertGreater(result['rows_serializer']['rows_per_sec'], result['drf']['rows_per_sec'], name)
+
+        with self.assertRaisesMessage(CommandError, 'less than 1000.0x faster'):
+            call_command('benchmark_json', '--tasks', '50', '--repeat', '1', '--min-speedup', '1000',
+                         stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class FastJSONRendererTestCase(APITestCase):
+    backends = [name for name in JSON_BACKENDS if name != 'orjson' or orjson is not None]
+
+    def test_payload_matches_drf_renderer(self):
+        payload = {
+            'date': date(2030, 12, 31),
+            'dates': [date(2030, 12, 31)] * 3,
+            'utc': datetime(2030, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'naive': datetime(2030, 1, 2, 3, 4, 5),
+            'offset': datetime(2030, 1, 2, 3, 4, 5, tzinfo=dt_timezone(timedelta(hours=3))),
+            'time': time(3, 4, 5),
+            'decimal': Decimal('1.5'),
+            'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Not found.'),
+            'status': TaskStatus.IN_PROGRESS,
+            'text': 'Задача "1"\n\u2028\u2029\\ é 😀',
+            'numbers': [0, -1, 2 ** 53, 0.5, 1.25, True, False, None],
+            'nested': {'list': [], 'dict': {}, 'tuple': (1, 2)},
+        }
+        expected = JSONRenderer().render(payload)
+        for name in self.backends:
+            self.assertEqual(JSON_BACKENDS[name](payload), expected, name)
+        self.assertIn(b'\\u2028', expected)
+
+    def test_task_list_payload(self):
+        seed(5, 300, random_seed=1)
+        response = self.client.get(reverse('task_tracker:task-list'), {'page_size': 300})
+        expected = JSONRenderer().render(response.data)
+        self.assertEqual(response.content, expected)
+        for name in self.backends:
+            self.assertEqual(JSON_BACKENDS[name](response.data), expected, name)
+
+    def test_backend_selection(self):
+        with override_settings(TASK_TRACKER_JSON_BACKEND='json'):
+            self.assertIs(get_json_backend(), JSON_BACKENDS['json'])
+        with mock.patch('task_tracker.renderers.orjson', None):
+            self.assertIs(get_json_backend('auto'), JSON_BACKENDS['json'])
+            with self.assertRaises(ImproperlyConfigured):
+                get_json_backend('orjson')
+        with self.assertRaises(ImproperlyConfigured):
+            get_json_backend('yaml')
+
+    def test_indent_uses_drf_renderer(self):
+        content = FastJSONRenderer().render({'a': [1]}, 'application/json; indent=2')
+        self.assertEqual(content, JSONRenderer().render({'a': [1]}, 'application/json; indent=2'))
+
+
+class SnapshotTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('task_tracker:busy-employees')
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+
+    def test_tasks_run_eagerly_without_broker(self):
+        self.assertTrue(celery_app.conf.task_always_eager)
+
+    @override_settings(TASK_TRACKER_SNAPSHOT_DEBOUNCE=0)
+    def test_snapshot_served_until_refresh(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Snapshot-Age'], '0')
+        self.assertEqual(response.data[0]['active_task_count'], 0)
+
+        # Без коммита пересчёт не запускается: отдаётся прежний снимок
+        Task.objects.create(name='Task 1', assignee=self.employee, status='New Task', deadline='2030-12-31')
+        self.assertEqual(self.client.get(self.url).data[0]['active_task_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(name='Task 2', assignee=self.employee, status='New Task', deadline='2030-12-31')
+        self.assertEqual(self.client.get(self.url).data[0]['active_task_count'], 2)
+
+    def test_commit_does_not_refresh_without_broker(self):
+        refresh_all()
+        refreshed_at = Snapshot.objects.get(key=BUSY_EMPLOYEES).updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(name='Task 1', assignee=self.employee, status='New Task', deadline='2030-12-31')
+        self.assertEqual(Snapshot.objects.get(key=BUSY_EMPLOYEES).updated_at, refreshed_at)
+        self.assertTrue(cache.get(DEBOUNCE_KEY))
+
+        # Пока не прошла задержка, отдаётся прежний снимок
+        self.assertEqual(self.client.get(self.url).data[0]['active_task_count'], 0)
+
+        # Все записи за время задержки дают один пересчёт при следующем запросе
+        Snapshot.objects.update(updated_at=timezone.now() - timedelta(seconds=60))
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(name='Task 2', assignee=self.employee, status='New Task', deadline='2030-12-31')
+        self.assertEqual(self.client.get(self.url).data[0]['active_task_count'], 2)
+        self.assertIsNone(cache.get(DEBOUNCE_KEY))
+
+    def test_refresh_is_debounced_with_broker(self):
+        with mock.patch('task_tracker.snapshots.refresh_in_process', return_value=False), \
+                mock.patch('task_tracker.tasks.refresh_snapshots.apply_async') as apply_async:
+            for name in ('Task 1', 'Task 2'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    Task.objects.create(name=name, assignee=self.employee, status='New Task', deadline='2030-12-31')
+        # Пока предыдущий пересчёт не начался, новые записи не ставят ещё один
+        apply_async.assert_called_once_with(countdown=10)
+
+    def test_refresh_changes_etag(self):
+        refresh_all()
+        etag = self.client.get(self.url)['ETag']
+
+        # Запись без пересчёта снимка: ETag по-прежнему совпадает
+        Task.objects.create(name='Task 1', assignee=self.employee, status='New Task', deadline='2030-12-31')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        refresh_all()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['active_task_count'], 1)
+
+
+class TaskSuggestAssigneesAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:task-suggest-assignees')
+        self.alice = Employee.objects.create(full_name='Alice', position='Developer')
+        self.bob = Employee.objects.create(full_name='Bob', position='Developer')
+        self.parent = Task.objects.create(name='Parent', status='In Progress', deadline='2030-12-31')
+        Task.objects.create(name='Done', parent_task=self.parent, assignee=self.bob, status='Completed',
+                            deadline='2030-12-30')
+        self.tasks = [Task.objects.create(name=f'Task {i}', parent_task=self.parent, status='New Task',
+                                          deadline='2030-12-30') for i in range(3)]
+
+    def test_suggestions_balance_load_across_batch(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {'tasks': [task.pk for task in self.tasks], 'limit': 2},
+                                        format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Боб ведёт соседнюю задачу, поэтому берёт две задачи, пока его нагрузка не перевесит бонус
+        self.assertEqual([item['suggested'] for item in response.data], [self.bob.pk, self.bob.pk, self.alice.pk])
+        self.assertEqual(len(response.data[0]['candidates']), 2)
+
+    def test_missing_tasks(self):
+        response = self.client.post(self.url, {'tasks': [self.tasks[0].pk, 999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('999', str(response.data['tasks']))
+
+
+class TaskAutoAssignAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:task-auto-assign')
+        self.alice = Employee.objects.create(full_name='Alice', position='Developer')
+        self.bob = Employee.objects.create(full_name='Bob', position='Developer')
+        Task.objects.create(name='Busy', assignee=self.alice, status='In Progress', deadline='2030-12-31')
+        self.tasks = [Task.objects.create(name=f'Task {i}', status='New Task', deadline='2030-12-30')
+                      for i in range(3)]
+        self.completed = Task.objects.create(name='Done', status='Completed', deadline='2030-12-30')
+
+    def test_dry_run_does_not_write(self):
+        response = self.client.post(self.url, {'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assigned'], 3)
+        self.assertEqual(len(response.data['assignments']), 3)
+        self.assertFalse(Task.objects.filter(id__in=[task.pk for task in self.tasks], assignee__isnull=False).exists())
+
+    def test_assigns_with_balancing(self):
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assigned'], 3)
+        self.assertNotIn('assignments', response.data)
+        # У Алисы уже есть задача, поэтому Боб получает две из трёх
+        self.assertEqual(response.data['employees'], {str(self.bob.pk): 2, str(self.alice.pk): 1})
+        self.assertFalse(Task.objects.filter(id__in=[task.pk for task in self.tasks], assignee__isnull=True).exists())
+        self.assertIsNone(Task.objects.get(pk=self.completed.pk).assignee_id)
+        self.assertEqual(self.bob.workload.active_count, 2)
+
+    def test_writes_one_update_per_batch(self):
+        Employee.objects.create(full_name='Carol', position='Developer')
+        before = Task.objects.get(pk=self.tasks[0].pk).updated_at
+        with CaptureQueriesContext(connection) as context:
+            assignments = auto_assign(batch_size=2)
+        self.assertEqual(len(assignments), 3)
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE') and 'assignee_id' in query['sql']]
+        # Три задачи у трёх сотрудников при пачке по 2: два запроса, а не по одному на сотрудника
+        self.assertEqual(len(updates), 2)
+        for task_id, employee_id in assignments.items():
+            task = Task.objects.get(pk=task_id)
+            self.assertEqual(task.assignee_id, employee_id)
+            self.assertGreater(task.updated_at, before)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('auto_assign', '--dry-run', stdout=out)
+        self.assertIn('Would assign 3 tasks to 2 employees.', out.getvalue())
+        self.assertEqual(Task.objects.filter(assignee__isnull=True).count(), 4)
+
+        call_command('auto_assign', stdout=io.StringIO())
+        self.assertEqual(Task.objects.filter(assignee__isnull=True).count(), 1)
+
+
+class TaskBulkAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:task-bulk')
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.parent = Task.objects.create(name='Sprint', status='In Progress', deadline='2030-12-31')
+
+    def test_bulk_create(self):
+        items = [
+            {'name': f'Task {i}', 'parent_task': self.parent.id, 'assignee': self.employee.id,
+             'status': 'New Task', 'deadline': '2030-12-01'}
+            for i in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 20)
+        self.assertLess(len(context.captured_queries), 20)
+        task = Task.objects.get(name='Task 7')
+        self.assertEqual(task.path, f'/{self.parent.id}/{task.id}/')
+        self.assertEqual(self.employee.workload.active_count, 20)
+
+    def test_bulk_create_reports_item_errors(self):
+        items = [
+            {'name': 'Valid', 'status': 'New Task', 'deadline': '2030-12-01'},
+            {'name': 'Late', 'parent_task': self.parent.id, 'status': 'New Task', 'deadline': '2031-01-01'},
+            {'name': 'Orphan', 'parent_task': 999, 'status': 'Bad', 'deadline': '2030-12-01'},
+        ]
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('deadline', errors[1])
+        self.assertIn('status', errors[2])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_bulk_update_checks_parent_deadline_from_batch(self):
+        child = Task.objects.create(name='Child', parent_task=self.parent, status='New Task', deadline='2030-12-01')
+
+        # Родитель переносится раньше нового срока подзадачи: по отдельности оба изменения допустимы
+        response = self.client.patch(self.url, [
+            {'id': self.parent.id, 'deadline': '2030-11-01'},
+            {'id': child.id, 'deadline': '2030-11-15'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('deadline', response.data['errors'][1])
+
+        # Родитель отодвигается позже, и подзадача вместе с ним
+        response = self.client.patch(self.url, [
+            {'id': self.parent.id, 'deadline': '2031-06-30'},
+            {'id': child.id, 'deadline': '2031-06-01'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        child.refresh_from_db()
+        self.assertEqual(child.deadline, date(2031, 6, 1))
+
+    def test_bulk_update_and_cycle_check(self):
+        child = Task.objects.create(name='Child', parent_task=self.parent, status='New Task', deadline='2030-12-01')
+        other = Task.objects.create(name='Other', status='New Task', deadline='2030-12-31')
+
+        response = self.client.patch(self.url, [{'id': self.parent.id, 'parent_task': child.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent_task', response.data['errors'][0])
+
+        response = self.client.patch(self.url, [
+            {'id': self.parent.id, 'parent_task': other.id},
+            {'id': child.id, 'status': 'Completed'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        child.refresh_from_db()
+        self.assertEqual(child.status, 'Completed')
+        self.assertEqual(child.path, f'/{other.id}/{self.parent.id}/{child.id}/')
+
+    def test_bulk_delete(self):
+        child = Task.objects.create(name='Child', parent_task=self.parent, status='New Task', deadline='2030-12-01')
+        grandchild = Task.objects.create(name='Grandchild', parent_task=child, assignee=self.employee,
+                                         status='New Task', deadline='2030-11-01')
+        tasks = [Task.objects.create(name=f'Task {i}', parent_task=self.parent, assignee=self.employee,
+                                     status='New Task', deadline='2030-12-01') for i in range(20)]
+        ids = [self.parent.id] + [task.id for task in tasks]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(self.url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], 21)
+        self.assertLess(len(context.captured_queries), 20)
+        child.refresh_from_db()
+        self.assertIsNone(child.parent_task)
+        self.assertEqual(child.path, f'/{child.id}/')
+        self.assertEqual(child.depth, 0)
+        grandchild.refresh_from_db()
+        self.assertEqual(grandchild.path, f'/{child.id}/{grandchild.id}/')
+        self.assertEqual(grandchild.depth, 1)
+        self.assertEqual(DeletionLog.objects.filter(model='task', object_id__in=ids).count(), 21)
+        self.assertEqual(self.employee.workload.active_count, 1)
+
+
+class ExportAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(full_name='John Doe', position='Developer')
+        self.task1 = Task.objects.create(name='Task 1', assignee=self.employee, status='New Task',
+                                         deadline='2030-12-31')
+        self.task2 = Task.objects.create(name='Task 2', status='Completed', deadline='2030-11-30')
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_tasks_ndjson_with_filter(self):
+        response = self.client.get(reverse('task_tracker:task-export'), {'status': 'New Task'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self._content(response).splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['name'], 'Task 1')
+        self.assertEqual(row['assignee'], self.employee.id)
+        self.assertEqual(row['deadline'], '2030-12-31')
+
+    def test_export_tasks_csv(self):
+        response = self.client.get(reverse('task_tracker:task-export'), {'output': 'csv', 'has_parent': 'false'})
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][:2], ['id', 'name'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Task 1', 'Task 2'])
+
+    def test_export_employees(self):
+        response = self.client.get(reverse('task_tracker:employee-export'))
+        row = json.loads(self._content(response))
+        self.assertEqual(row['full_name'], 'John Doe')
+        self.assertEqual(row['active_task_count'], 1)
+
+    def test_export_streams_asynchronously_under_asgi(self):
+        async def read(response):
+            return [chunk async for chunk in response.streaming_content]
+
+        url = reverse('task_tracker:task-export')
+        response = async_to_sync(self.async_client.get)(url, {'output': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b''.join(async_to_sync(read)(response)).decode()
+        self.assertEqual(content, self._content(self.client.get(url, {'output': 'csv'})))
+
+    def test_export_data_command(self):
+        output = io.StringIO()
+        call_command('export_data', 'tasks', '--format', 'csv', '--filter', 'status=Completed', stdout=output)
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual([row[1] for row in rows[1:]], ['Task 2'])
+
+
+class TaskTreeAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.root = Task.objects.create(name='Root', status='In Progress', deadline='2030-12-31')
+        self.child = Task.objects.create(name='Child', parent_task=self.root, status='Completed',
+                                         deadline='2030-12-30')
+        self.grandchild = Task.objects.create(name='Grandchild', parent_task=self.child, status='New Task',
+                                              deadline='2030-12-29')
+        self.sibling = Task.objects.create(name='Sibling', parent_task=self.root, status='New Task',
+                                           deadline='2030-12-30')
+        self.url = reverse('task_tracker:task-tree', kwargs={'pk': self.root.pk})
+
+    def test_nested_tree_single_query(self):
+        # Дерево одним запросом плюс агрегация для ETag
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([node['name'] for node in response.data['sub_tasks']], ['Child', 'Sibling'])
+        self.assertEqual(response.data['sub_tasks'][0]['sub_tasks'][0]['name'], 'Grandchild')
+        self.assertEqual(response.data['sub_tasks'][0]['sub_tasks'][0]['depth'], 2)
+
+    def test_flat_tree_with_depth_limit(self):
+        response = self.client.get(self.url, {'output': 'flat', 'depth': 1})
+        self.assertEqual([node['name'] for node in response.data], ['Root', 'Child', 'Sibling'])
+
+    def test_status_filter_reattaches_to_nearest_ancestor(self):
+        response = self.client.get(self.url, {'status': 'New Task'})
+        self.assertEqual([node['name'] for node in response.data['sub_tasks']], ['Sibling', 'Grandchild'])
+
+    def test_self_parent_does_not_loop(self):
+        Task.objects.filter(pk=self.root.pk).update(parent_task=self.root)
+        response = self.client.get(self.url, {'output': 'flat'})
+        self.assertEqual(len(response.data), 4)
+
+    def test_missing_task(self):
+        response = self.client.get(reverse('task_tracker:task-tree', kwargs={'pk': 999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskKeysetPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:task-list')
+        for i, deadline in enumerate(['2030-12-31', '2030-01-01', '2030-06-30', '2030-01-01', '2030-03-31']):
+            Task.objects.create(name=f'Task {i}', status='New Task', deadline=deadline)
+
+    def _collect(self, params):
+        names, url = [], self.url
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            names.extend(task['name'] for task in response.data['results'])
+            url, params = response.data['next'], None
+        return names
+
+    def test_paginate_by_id(self):
+        self.assertEqual(self._collect({'page_size': 2}), [f'Task {i}' for i in range(5)])
+
+    def test_paginate_by_deadline(self):
+        self.assertEqual(self._collect({'page_size': 2, 'ordering': 'deadline'}),
+                         ['Task 1', 'Task 3', 'Task 4', 'Task 2', 'Task 0'])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 10 ** 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unknown_ordering_rejected(self):
+        response = self.client.get(self.url, {'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data)
+        response = async_to_sync(self.async_client.get)(reverse('task_tracker:async-task-list'), {'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
 class ImportantTasksListAPIViewTestCase(APITestCase):
@@ -265,3 +1146,68 @@ class ImportantTasksListAPIViewTestCase(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
+
+
+@override_settings(TASK_TRACKER_SNAPSHOTS_ENABLED=False)
+class BusyEmployeesListAPIViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('task_tracker:busy-employees')
+        self.idle = Employee.objects.create(full_name='Idle Employee', position='Developer')
+        self.busy = Employee.objects.create(full_name='Busy Employee', position='Developer')
+        Task.objects.create(name='Task 1', assignee=self.busy, status='New Task', deadline='2030-12-31')
+        Task.objects.create(name='Task 2', assignee=self.busy, status='In Progress', deadline='2030-11-30')
+        Task.objects.create(name='Task 3', assignee=self.idle, status='Not Started', deadline='2030-10-31')
+
+    def test_busy_employees_ranking(self):
+        # Рейтинг одним запросом плюс две агрегации для ETag
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['id'], self.busy.id)
+        self.assertEqual(response.data[0]['active_task_count'], 2)
+        self.assertEqual(response.data[0]['earliest_deadline'], '2030-11-30')
+        self.assertEqual(response.data[1]['active_task_count'], 0)
+
+
+@override_settings(TASK_TRACKER_SNAPSHOTS_ENABLED=False)
+class ListEndpointsQueryCountTestCase(APITestCase):
+    """
+    Регрессионный тест на N+1: количество запросов списочных эндпоинтов
+    не должно зависеть от количества сотрудников и задач.
+    """
+
+    def _seed(self, employees_count):
+        for i in range(employees_count):
+            employee = Employee.objects.create(full_name=f'Employee {i}', position='Developer')
+            parent = Task.objects.create(name=f'Parent {i}', assignee=employee, status='In Progress',
+                                         deadline='2030-12-31')
+            Task.objects.create(name=f'Child {i}', parent_task=parent, assignee=employee, status='New Task',
+                                deadline='2030-12-30')
+            Task.objects.create(name=f'Done {i}', assignee=employee, status='Completed', deadline='2030-12-30')
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url_name):
+        url = reverse(url_name)
+        self._seed(2)
+        small = self._count_queries(url)
+        self._seed(10)
+        large = self._count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_employee_list_queries(self):
+        self.assertConstantQueries('task_tracker:employee-list')
+
+    def test_busy_employees_queries(self):
+        self.assertConstantQueries('task_tracker:busy-employees')
+
+    def test_task_list_queries(self):
+        self.assertConstantQueries('task_tracker:task-list')
+
+    def test_important_tasks_queries(self):
+        self.assertConstantQueries('task_tracker:important-tasks')
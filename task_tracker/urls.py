@@ -2,10 +2,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
 from task_tracker.apps import TaskConfig
+from .async_views import AsyncTaskListView, AsyncTaskDetailView, AsyncEmployeeListView, \
+    AsyncEmployeeDetailView, AsyncBusyEmployeesView
+from .metrics import metrics_view
 from .views import ImportantTasksListAPIView, TaskListAPIView, \
     TaskCreateAPIView, TaskRetrieveAPIView, TaskUpdateAPIView, TaskDestroyAPIView, EmployeeListAPIView, \
     EmployeeCreateAPIView, EmployeeRetrieveAPIView, EmployeeUpdateAPIView, EmployeeDestroyAPIView, \
-    BusyEmployeesListAPIView
+    BusyEmployeesListAPIView, TaskTreeAPIView, TaskBulkAPIView, TaskExportAPIView, EmployeeExportAPIView, \
+    SyncAPIView, TaskEventStreamView, TaskSuggestAssigneesAPIView, TaskAutoAssignAPIView
 
 app_name = TaskConfig.name
 
@@ -16,6 +20,7 @@ urlpatterns = [
     path('', include(router.urls)),
     path('employees/', EmployeeListAPIView.as_view(), name='employee-list'),
     path('employees/create/', EmployeeCreateAPIView.as_view(), name='employee-create'),
+    path('employees/export/', EmployeeExportAPIView.as_view(), name='employee-export'),
     path('employees/<int:pk>/', EmployeeRetrieveAPIView.as_view(), name='employee-detail'),
     path('employees/<int:pk>/update/', EmployeeUpdateAPIView.as_view(), name='employee-update'),
     path('employees/<int:pk>/delete/', EmployeeDestroyAPIView.as_view(), name='employee-delete'),
@@ -24,10 +29,26 @@ urlpatterns = [
 
     path('tasks/', TaskListAPIView.as_view(), name='task-list'),
     path('tasks/create/', TaskCreateAPIView.as_view(), name='task-create'),
+    path('tasks/auto-assign/', TaskAutoAssignAPIView.as_view(), name='task-auto-assign'),
+    path('tasks/bulk/', TaskBulkAPIView.as_view(), name='task-bulk'),
+    path('tasks/export/', TaskExportAPIView.as_view(), name='task-export'),
+    path('tasks/suggest-assignees/', TaskSuggestAssigneesAPIView.as_view(), name='task-suggest-assignees'),
     path('tasks/<int:pk>/', TaskRetrieveAPIView.as_view(), name='task-detail'),
+    path('tasks/<int:pk>/tree/', TaskTreeAPIView.as_view(), name='task-tree'),
     path('tasks/<int:pk>/update/', TaskUpdateAPIView.as_view(), name='task-update'),
     path('tasks/<int:pk>/delete/', TaskDestroyAPIView.as_view(), name='task-delete'),
     path('tasks/important/', ImportantTasksListAPIView.as_view(), name='important-tasks'),
+    path('tasks/events/', TaskEventStreamView.as_view(), name='task-events'),
+
+    path('sync/', SyncAPIView.as_view(), name='sync'),
+    path('metrics', metrics_view, name='metrics'),
+
+    # Асинхронные варианты read-эндпоинтов (ASGI)
+    path('async/employees/', AsyncEmployeeListView.as_view(), name='async-employee-list'),
+    path('async/employees/busy/', AsyncBusyEmployeesView.as_view(), name='async-busy-employees'),
+    path('async/employees/<int:pk>/', AsyncEmployeeDetailView.as_view(), name='async-employee-detail'),
+    path('async/tasks/', AsyncTaskListView.as_view(), name='async-task-list'),
+    path('async/tasks/<int:pk>/', AsyncTaskDetailView.as_view(), name='async-task-detail'),
 ]
 
 
@@ -1,85 +1,160 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from prompt_toolkit.validation import ValidationError
-from rest_framework import viewsets, generics
-from rest_framework.generics import ListAPIView, RetrieveAPIView, UpdateAPIView, DestroyAPIView, CreateAPIView
+from rest_framework import viewsets, generics, status
+from rest_framework.exceptions import NotFound, ParseError, ValidationError as APIValidationError
+from rest_framework.generics import ListAPIView, RetrieveAPIView, UpdateAPIView, DestroyAPIView, CreateAPIView, \
+    GenericAPIView
 from rest_framework.permissions import AllowAny
-
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .assignment import AssignmentEngine, suggest_assignees
+from .bulk import bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks, auto_assign
+from .cache import CachedResponseMixin, employee_scope, task_scope
+from .conditional import ConditionalGetMixin
+from .events import stream_task_events
+from .export import EXPORT_FORMATS, EMPLOYEE_EXPORT_FIELDS, TASK_EXPORT_FIELDS, get_employee_export_queryset, \
+    aiter_export, iter_export
+from .filters import TaskFilter
+from .hierarchy import build_path
+from .metrics import SerializerTimingMixin
+from .row_serializers import EmployeeRowSerializer, RowListMixin, TaskRowSerializer
 from .models import Employee, Task
+from .paginators import EmployeeKeysetPagination, TaskKeysetPagination
 from .serializers import EmployeeSerializer, TaskSerializer, BusyEmployeeSerializer, \
-    TaskWithPotentialEmployeesSerializer
+    TaskWithPotentialEmployeesSerializer, BusyEmployeeRankingSerializer, TaskTreeNodeSerializer, \
+    TaskBulkItemSerializer, AssigneeSuggestionRequestSerializer, AutoAssignRequestSerializer
+from .snapshots import BUSY_EMPLOYEES, IMPORTANT_TASKS, SnapshotResponseMixin, busy_employees_queryset, \
+    important_tasks_queryset, snapshots_enabled
+from .statuses import ACTIVE_STATUSES
+from .sync import decode_cursor, get_changes, get_page_size, get_tombstone_horizon
+
+from collections import Counter
+from functools import partial
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q, Prefetch
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views import View
+
+
+def prefetch_active_tasks():
+    # Активные задачи сотрудников одним запросом вместе с родительскими задачами (для EmployeeSerializer),
+    # в том же порядке, что и в EmployeeRowSerializer
+    return Prefetch(
+        'task_set',
+        queryset=Task.objects.filter(status__in=ACTIVE_STATUSES).select_related('parent_task').order_by('id'),
+        to_attr='active_tasks',
+    )
 
-from django.db.models import Count, Q, Min
 
+def prefetch_all_tasks():
+    # Все задачи сотрудников одним запросом вместе с родительскими задачами (для BusyEmployeeSerializer)
+    return Prefetch(
+        'task_set',
+        queryset=Task.objects.select_related('parent_task'),
+        to_attr='all_tasks',
+    )
 
-class EmployeeCreateAPIView(generics.CreateAPIView):
+
+class EmployeeCreateAPIView(SerializerTimingMixin, generics.CreateAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [AllowAny]
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
 
 
-class EmployeeListAPIView(ListAPIView):
-    queryset = Employee.objects.all()
+class EmployeeListAPIView(SerializerTimingMixin, ConditionalGetMixin, CachedResponseMixin, RowListMixin, ListAPIView):
+    queryset = Employee.objects.prefetch_related(prefetch_active_tasks())
     serializer_class = EmployeeSerializer
+    row_serializer_class = EmployeeRowSerializer
     permission_classes = [AllowAny]
+    pagination_class = EmployeeKeysetPagination
     filter_backends = [DjangoFilterBackend]
+    weak_etag = True
 
+    def get_etag_querysets(self):
+        return [Employee.objects.all(), Task.objects.all()]
 
-class EmployeeRetrieveAPIView(RetrieveAPIView):
-    queryset = Employee.objects.all()
+
+class EmployeeRetrieveAPIView(SerializerTimingMixin, ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView):
+    queryset = Employee.objects.prefetch_related(prefetch_all_tasks())
     serializer_class = BusyEmployeeSerializer
     permission_classes = [AllowAny]
 
+    def get_cache_scopes(self):
+        return [employee_scope(self.kwargs['pk'])]
+
+    def get_etag_querysets(self):
+        # Сотрудник, его задачи и их родительские задачи (название и срок родителя есть в ответе)
+        pk = self.kwargs['pk']
+        return [
+            Employee.objects.filter(pk=pk),
+            Task.objects.filter(assignee_id=pk),
+            Task.objects.filter(sub_tasks__assignee_id=pk).distinct(),
+        ]
+
 
-class EmployeeUpdateAPIView(UpdateAPIView):
+class EmployeeUpdateAPIView(SerializerTimingMixin, UpdateAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [AllowAny]
 
 
-class EmployeeDestroyAPIView(DestroyAPIView):
+class EmployeeDestroyAPIView(SerializerTimingMixin, DestroyAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [AllowAny]
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
 
-class BusyEmployeesListAPIView(ListAPIView):
-    serializer_class = BusyEmployeeSerializer
+class BusyEmployeesListAPIView(SerializerTimingMixin, ConditionalGetMixin, SnapshotResponseMixin, CachedResponseMixin,
+                               ListAPIView):
+    serializer_class = BusyEmployeeRankingSerializer
     permission_classes = [AllowAny]
+    weak_etag = True
+    snapshot_key = BUSY_EMPLOYEES
 
-    def get_queryset(self):
-        # Агрегируем данные о задачах для каждого сотрудника
-        employees = Employee.objects.annotate(
-            active_task_count=Count('task', filter=Q(task__status__in=['New Task', 'In Progress'])),
-            earliest_deadline=Min('task__deadline', filter=Q(task__status__in=['New Task', 'In Progress']))
-        ).order_by('-active_task_count', 'earliest_deadline')
+    def get_etag_querysets(self):
+        if snapshots_enabled():
+            return self.get_snapshot_etag_querysets()
+        # Нагрузка меняется только вместе с задачами
+        return [Employee.objects.all(), Task.objects.all()]
 
-        return employees
+    def get_queryset(self):
+        return busy_employees_queryset()
 
 
-class TaskCreateAPIView(CreateAPIView):
+class TaskCreateAPIView(SerializerTimingMixin, CreateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [AllowAny]
 
 
-class TaskListAPIView(ListAPIView):
-    queryset = Task.objects.all().order_by('id')
+class TaskListAPIView(SerializerTimingMixin, ConditionalGetMixin, CachedResponseMixin, RowListMixin, ListAPIView):
+    queryset = Task.objects.prefetch_related('sub_tasks').order_by('id')
     serializer_class = TaskSerializer
+    row_serializer_class = TaskRowSerializer
     permission_classes = [AllowAny]
+    pagination_class = TaskKeysetPagination
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['assignee', 'status', 'parent_task', 'deadline']
+    filterset_class = TaskFilter
+    weak_etag = True
+
+    def get_etag_querysets(self):
+        # Вся таблица, а не отфильтрованная выборка: в ответе есть подзадачи, которые могут не проходить фильтр
+        return [Task.objects.all()]
 
     @swagger_auto_schema(
         operation_description="Получение списка задач с возможностью фильтрации по параметрам",
@@ -95,80 +170,361 @@ class TaskListAPIView(ListAPIView):
             openapi.Parameter('has_parent', openapi.IN_QUERY,
                               description="Фильтрация задач по наличию родительской задачи",
                               type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Курсор следующей страницы",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Размер страницы",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('ordering', openapi.IN_QUERY, description="Сортировка: id или deadline",
+                              type=openapi.TYPE_STRING, enum=list(TaskKeysetPagination.orderings)),
         ]
     )
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def get_non_filter_params(self):
+        # Параметры запроса, которые не являются фильтрами (?format=json — выбор рендерера DRF)
+        return {
+            api_settings.URL_FORMAT_OVERRIDE,
+            self.paginator.cursor_query_param,
+            self.paginator.page_size_query_param,
+            self.paginator.ordering_query_param,
+        }
+
     def get_queryset(self):
         queryset = super().get_queryset()
 
         # Проверка на допустимость фильтров
-        allowed_filters = set(self.filterset_fields)
-        requested_filters = set(self.request.query_params.keys()) - {'sub_tasks', 'has_task'}
+        allowed_filters = set(self.filterset_class.base_filters)
+        requested_filters = set(self.request.query_params.keys()) - self.get_non_filter_params()
         invalid_filters = requested_filters - allowed_filters
 
         if invalid_filters:
-            raise ValidationError(f"Фильтрация по полю(-ям) {', '.join(invalid_filters)} невозможна."
-                                  f"Доступные поля для фильтрации: {', '.join(allowed_filters)}")
-
-        # Фильтрация по наличию подзадач
-        subtasks_param = self.request.query_params.get('sub_tasks')
-        if subtasks_param is not None:
-            if subtasks_param.lower() in ('true', '1'):
-                queryset = queryset.filter(subtasks__isnull=False).distinct()
-            elif subtasks_param.lower() in ('false', '0'):
-                queryset = queryset.filter(subtasks__isnull=True).distinct()
-
-        # Фильтрация по наличию родительской задачи
-        has_parent_param = self.request.query_params.get('has_parent')
-        if has_parent_param is not None:
-            if has_parent_param.lower() in ('true', '1'):
-                queryset = queryset.filter(parent_task__isnull=False)
-            elif has_parent_param.lower() in ('false', '0'):
-                queryset = queryset.filter(parent_task__isnull=True)
+            raise APIValidationError(f"Фильтрация по полю(-ям) {', '.join(invalid_filters)} невозможна."
+                                     f"Доступные поля для фильтрации: {', '.join(allowed_filters)}")
 
+        # Фильтрация по полям, наличию подзадач (sub_tasks) и родительской задачи (has_parent) — в TaskFilter
         return queryset
 
 
-class TaskRetrieveAPIView(RetrieveAPIView):
+def get_export_format(request):
+    export_format = request.query_params.get('output', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise ParseError(f"Параметр output должен быть одним из: {', '.join(EXPORT_FORMATS)}.")
+    return export_format
+
+
+def streaming_export_response(request, queryset, fields, export_format, filename):
+    # Ответ формируется по мере чтения курсора, без сборки всего списка в памяти
+    iter_content = aiter_export if isinstance(request._request, ASGIRequest) else iter_export
+    response = StreamingHttpResponse(iter_content(queryset, fields, export_format),
+                                     content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+class TaskExportAPIView(TaskListAPIView):
+    """Потоковая выгрузка задач в NDJSON или CSV с теми же фильтрами, что и у списка задач."""
+    queryset = Task.objects.order_by('id')
+    pagination_class = None
+
+    @swagger_auto_schema(
+        operation_description="Потоковая выгрузка задач в NDJSON или CSV с фильтрами списка задач",
+        manual_parameters=[
+            openapi.Parameter('output', openapi.IN_QUERY, description="Формат выгрузки",
+                              type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        export_format = get_export_format(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_export_response(request, queryset, TASK_EXPORT_FIELDS, export_format, 'tasks')
+
+    def get_non_filter_params(self):
+        return {api_settings.URL_FORMAT_OVERRIDE, 'output'}
+
+
+class EmployeeExportAPIView(SerializerTimingMixin, GenericAPIView):
+    """Потоковая выгрузка сотрудников в NDJSON или CSV."""
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        return get_employee_export_queryset()
+
+    @swagger_auto_schema(
+        operation_description="Потоковая выгрузка сотрудников в NDJSON или CSV",
+        manual_parameters=[
+            openapi.Parameter('output', openapi.IN_QUERY, description="Формат выгрузки",
+                              type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        export_format = get_export_format(request)
+        return streaming_export_response(request, self.get_queryset(), EMPLOYEE_EXPORT_FIELDS, export_format,
+                                         'employees')
+
+
+class TaskRetrieveAPIView(SerializerTimingMixin, ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [AllowAny]
 
+    def get_cache_scopes(self):
+        return [task_scope(self.kwargs['pk'])]
+
+    def get_etag_querysets(self):
+        return [Task.objects.filter(Q(pk=self.kwargs['pk']) | Q(parent_task_id=self.kwargs['pk']))]
+
+
+class TaskBulkAPIView(SerializerTimingMixin, GenericAPIView):
+    """
+    Массовые операции с задачами: POST — создание, PATCH — частичное обновление по id,
+    DELETE — удаление по списку id ({"ids": [...]}). Пачка записывается целиком или не записывается вовсе.
+    """
+    serializer_class = TaskBulkItemSerializer
+    permission_classes = [AllowAny]
+    max_items = 5000
+
+    def _get_items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ParseError("Ожидается непустой список задач.")
+        if len(data) > self.max_items:
+            raise ParseError(f"За один запрос можно передать не более {self.max_items} задач.")
+        return data
+
+    def _respond(self, tasks, errors, success_status):
+        if tasks is None:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(tasks, many=True).data, status=success_status)
+
+    @swagger_auto_schema(request_body=TaskBulkItemSerializer(many=True))
+    def post(self, request, *args, **kwargs):
+        tasks, errors = bulk_create_tasks(self._get_items(request.data))
+        return self._respond(tasks, errors, status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(request_body=TaskBulkItemSerializer(many=True))
+    def patch(self, request, *args, **kwargs):
+        tasks, errors = bulk_update_tasks(self._get_items(request.data))
+        return self._respond(tasks, errors, status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(task_id, int) for task_id in ids):
+            raise ParseError("Ожидается список id задач в поле ids.")
+        deleted = bulk_delete_tasks(self._get_items(ids))
+        return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
+
+class TaskSuggestAssigneesAPIView(SerializerTimingMixin, GenericAPIView):
+    """
+    Подбор исполнителей для пачки задач ({"tasks": [id, ...], "limit": 3}). Нагрузка балансируется
+    внутри пачки: лучший кандидат задачи учитывается как занятый ею при подборе следующих. Ничего не записывает.
+    """
+    serializer_class = AssigneeSuggestionRequestSerializer
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(request_body=AssigneeSuggestionRequestSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task_ids = list(dict.fromkeys(serializer.validated_data['tasks']))
+        tasks = Task.objects.only('id', 'deadline', 'parent_task').in_bulk(task_ids)
+        missing = [task_id for task_id in task_ids if task_id not in tasks]
+        if missing:
+            raise APIValidationError({'tasks': [f"Tasks do not exist: {', '.join(map(str, missing))}."]})
+
+        suggestions = suggest_assignees(tasks.values(), serializer.validated_data['limit'])
+        return Response([
+            {
+                'task': task_id,
+                'suggested': suggestions[task_id][0][0].id if suggestions[task_id] else None,
+                'candidates': [
+                    {'id': candidate.id, 'full_name': candidate.full_name, 'score': round(score, 3)}
+                    for candidate, score in suggestions[task_id]
+                ],
+            }
+            for task_id in task_ids
+        ])
+
+
+class TaskAutoAssignAPIView(SerializerTimingMixin, GenericAPIView):
+    """
+    Распределяет все незавершённые задачи без исполнителя по сотрудникам одной транзакцией.
+    С {"dry_run": true} ничего не записывает и возвращает план назначений.
+    """
+    serializer_class = AutoAssignRequestSerializer
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(request_body=AutoAssignRequestSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data['dry_run']
+        assignments = auto_assign(dry_run=dry_run)
+        data = {
+            'dry_run': dry_run,
+            'assigned': len(assignments),
+            'employees': {str(employee_id): count for employee_id, count in Counter(assignments.values()).items()},
+        }
+        if dry_run:
+            data['assignments'] = [{'task': task_id, 'assignee': employee_id}
+                                   for task_id, employee_id in assignments.items()]
+        return Response(data)
+
+
+class TaskTreeAPIView(SerializerTimingMixin, ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView):
+    serializer_class = TaskTreeNodeSerializer
+    permission_classes = [AllowAny]
+
+    def get_etag_querysets(self):
+        # Путь задачи и всех её потомков содержит её id
+        return [Task.objects.filter(path__contains=build_path(None, self.kwargs['pk']))]
+
+    @swagger_auto_schema(
+        operation_description="Получение дерева подзадач задачи одним рекурсивным запросом",
+        manual_parameters=[
+            openapi.Parameter('depth', openapi.IN_QUERY, description="Максимальная глубина обхода",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('status', openapi.IN_QUERY, description="Статусы задач через запятую",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('output', openapi.IN_QUERY, description="Формат ответа: nested или flat",
+                              type=openapi.TYPE_STRING, enum=['nested', 'flat']),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        return self.get_conditional(partial(self.get_cached_response, self.build_tree), request, *args, **kwargs)
+
+    def build_tree(self, request, *args, **kwargs):
+        depth = request.query_params.get('depth')
+        if depth is not None:
+            if not depth.isdigit():
+                raise ParseError("Параметр depth должен быть неотрицательным целым числом.")
+            depth = int(depth)
+        output = request.query_params.get('output', 'nested')
+        if output not in ('nested', 'flat'):
+            raise ParseError("Параметр output должен быть nested или flat.")
+        statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+
+        tasks = list(Task.get_subtree(self.kwargs['pk'], depth))
+        if not tasks:
+            raise NotFound()
+
+        # Корень возвращается всегда, фильтр по статусу применяется к потомкам
+        root = tasks[0]
+        parents = {task.id: task.parent_task_id for task in tasks}
+        if statuses:
+            tasks = [root] + [task for task in tasks[1:] if task.status in statuses]
+        nodes = self.get_serializer(tasks, many=True).data
+
+        if output == 'flat':
+            return Response(nodes)
+        return Response(self._build_nested(nodes, parents, root.id))
+
+    @staticmethod
+    def _build_nested(nodes, parents, root_id):
+        # Задача прикрепляется к ближайшему предку, попавшему в выборку
+        by_id = {node['id']: dict(node, sub_tasks=[]) for node in nodes}
+        for node_id, node in by_id.items():
+            if node_id == root_id:
+                continue
+            parent_id = parents[node_id]
+            while parent_id not in by_id:
+                parent_id = parents[parent_id]
+            by_id[parent_id]['sub_tasks'].append(node)
+        return by_id[root_id]
+
+
+class SyncAPIView(SerializerTimingMixin, GenericAPIView):
+    """
+    Изменения задач и сотрудников после момента since и id удалённых объектов, страницами по page_size.
+    Пока has_more, следующая страница запрашивается с cursor из ответа; после последней страницы
+    значение high_water_mark передаётся как since в следующем запросе.
+    """
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Дельта-синхронизация: изменённые и удалённые задачи и сотрудники после since",
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, description="Момент в формате ISO 8601; "
+                              "не нужен, если передан cursor", type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Курсор следующей страницы из ответа",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Число строк каждого вида на странице",
+                              type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        cursor = None
+        if request.query_params.get('cursor'):
+            try:
+                cursor = decode_cursor(request.query_params['cursor'])
+            except ValueError:
+                raise ParseError("Некорректный параметр cursor.")
+            since = cursor[0]
+        else:
+            since = parse_datetime(request.query_params.get('since', ''))
+            if since is None:
+                raise ParseError("Параметр since должен быть датой и временем в формате ISO 8601.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        if since < get_tombstone_horizon():
+            return Response({'detail': "Журнал удалений за этот период очищен, требуется полная синхронизация."},
+                            status=status.HTTP_410_GONE)
+        page_size = request.query_params.get('page_size', '')
+        page_size = get_page_size(int(page_size) if page_size.isdigit() else None)
+        return Response(get_changes(since, page_size=page_size, cursor=cursor))
+
+
+class TaskEventStreamView(View):
+    """
+    Поток событий задач (server-sent events): создание, изменение, смена статуса и исполнителя, удаление.
+    Асинхронное представление, работает под ASGI (config.asgi). Фильтры: assignee, parent_task.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        filters = {}
+        for param in ('assignee', 'parent_task'):
+            value = request.GET.get(param)
+            if value is not None:
+                if not value.isdigit():
+                    return HttpResponseBadRequest(f"Параметр {param} должен быть id.")
+                filters[param] = int(value)
+        return StreamingHttpResponse(
+            stream_task_events(**filters),
+            content_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
 
-class TaskUpdateAPIView(UpdateAPIView):
+class TaskUpdateAPIView(SerializerTimingMixin, UpdateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [AllowAny]
 
 
-class TaskDestroyAPIView(DestroyAPIView):
+class TaskDestroyAPIView(SerializerTimingMixin, DestroyAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [AllowAny]
 
 
-class ImportantTasksListAPIView(ListAPIView):
+class ImportantTasksListAPIView(SerializerTimingMixin, ConditionalGetMixin, SnapshotResponseMixin, CachedResponseMixin,
+                                ListAPIView):
     serializer_class = TaskWithPotentialEmployeesSerializer
     permission_classes = [AllowAny]
+    weak_etag = True
+    snapshot_key = IMPORTANT_TASKS
 
-    def get_queryset(self):
-        # Задачи без назначений
-        tasks_without_assignee = Task.objects.filter(
-            assignee__isnull=True
-        )
+    def get_etag_querysets(self):
+        if snapshots_enabled():
+            return self.get_snapshot_etag_querysets()
+        return [Employee.objects.all(), Task.objects.all()]
 
-        # Задачи с родительской задачей в статусе 'In Progress'
-        parent_tasks_in_progress = Task.objects.filter(
-            Q(parent_task__isnull=False) &
-            Q(parent_task__status='In Progress')
-        )
-
-        # Используем Q-объекты для объединения запросов
-        queryset = Task.objects.filter(
-            Q(id__in=tasks_without_assignee.values('id')) |
-            Q(id__in=parent_tasks_in_progress.values('id'))
-        ).distinct()
-
-        return queryset
+    def get_queryset(self):
+        return important_tasks_queryset()
+
+    def get_serializer_context(self):
+        # Нагрузка сотрудников читается один раз на запрос и общая для всех задач
+        context = super().get_serializer_context()
+        if not getattr(self, 'swagger_fake_view', False):
+            context['assignment_engine'] = AssignmentEngine.from_db()
+        return context